@@ -18,6 +18,7 @@ from app.ai import llm
 from app.models.sale import Sale, SaleItem
 from app.models.product import Product
 from app.config import get_settings
+from app.services.timebucket import part
 
 settings = get_settings()
 
@@ -56,11 +57,10 @@ def _gather_context(db: Session, days: int = 7) -> str:
         .all()
     )
 
-    # Sales by day of week
-    # SQLite: strftime('%w', date), PostgreSQL: extract(dow from date)
+    # Sales by store-local day of week (0 = Sunday) and hour
     daily_sales = (
         db.query(
-            func.strftime("%w", Sale.created_at).label("dow"),
+            part(db, Sale.created_at, "weekday", cutoff).label("dow"),
             func.count(Sale.id).label("txns"),
             func.sum(Sale.total).label("revenue"),
         )
@@ -72,7 +72,7 @@ def _gather_context(db: Session, days: int = 7) -> str:
     # Sales by hour
     hourly = (
         db.query(
-            func.strftime("%H", Sale.created_at).label("hour"),
+            part(db, Sale.created_at, "hour", cutoff).label("hour"),
             func.count(Sale.id).label("txns"),
         )
         .filter(Sale.status == "completed", Sale.created_at >= cutoff)
@@ -89,8 +89,8 @@ def _gather_context(db: Session, days: int = 7) -> str:
     )
 
     dow_names = {
-        "0": "Domingo", "1": "Lunes", "2": "Martes", "3": "Miércoles",
-        "4": "Jueves", "5": "Viernes", "6": "Sábado",
+        0: "Domingo", 1: "Lunes", 2: "Martes", 3: "Miércoles",
+        4: "Jueves", 5: "Viernes", 6: "Sábado",
     }
 
     lines = [
@@ -111,7 +111,7 @@ def _gather_context(db: Session, days: int = 7) -> str:
 
     lines.append("\nVENTAS POR HORA:")
     for h in hourly:
-        lines.append(f"  - {h.hour}:00 — {h.txns} transacciones")
+        lines.append(f"  - {h.hour:02d}:00 — {h.txns} transacciones")
 
     if low_stock:
         lines.append("\nPRODUCTOS CON BAJO INVENTARIO:")
@@ -17,7 +17,8 @@ from sqlalchemy.orm import Session
 
 from app.ai import llm
 from app.models.sale import Sale, SaleItem
-from app.models.product import Product
+from app.services.inventory import BELOW_MINIMUM, OUT_OF_STOCK, inventory
+from app.services.timebucket import local_now, to_utc
 from app.config import get_settings
 
 settings = get_settings()
@@ -33,22 +34,19 @@ class Alert:
 
 
 def check_low_stock(db: Session) -> list[Alert]:
-    """Products at or below their minimum stock level."""
-    products = (
-        db.query(Product)
-        .filter(Product.is_active == True, Product.stock <= Product.min_stock)
-        .all()
-    )
+    """Products at or below their minimum stock level (from the inventory index)."""
     alerts = []
-    for p in products:
-        severity = "critical" if p.stock == 0 else "warning"
-        alerts.append(Alert(
-            type="low_stock",
-            severity=severity,
-            title=f"{'Sin stock' if p.stock == 0 else 'Bajo stock'}: {p.name}",
-            detail=f"Stock actual: {p.stock}, mínimo: {p.min_stock}",
-            product_id=p.id,
-        ))
+    for status in (OUT_OF_STOCK, BELOW_MINIMUM):
+        _total, rows = inventory.items(db, status)
+        for p in rows:
+            out = status == OUT_OF_STOCK
+            alerts.append(Alert(
+                type="low_stock",
+                severity="critical" if out else "warning",
+                title=f"{'Sin stock' if out else 'Bajo stock'}: {p.name}",
+                detail=f"Stock actual: {p.stock}, mínimo: {p.min_stock}",
+                product_id=p.id,
+            ))
     return alerts
 
 
@@ -57,14 +55,19 @@ def check_sales_anomalies(db: Session, days_baseline: int = 7) -> list[Alert]:
     Compare today's sales velocity against the recent daily average.
     Flag significant spikes (>2x) or drops (<0.3x).
     """
-    now = datetime.utcnow()
+    # Store-local day; created_at is naive UTC
+    now = local_now()
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     baseline_start = today_start - timedelta(days=days_baseline)
 
     # Baseline: average daily revenue over past N days
     baseline = (
         db.query(func.sum(Sale.total))
-        .filter(Sale.status == "completed", Sale.created_at >= baseline_start, Sale.created_at < today_start)
+        .filter(
+            Sale.status == "completed",
+            Sale.created_at >= to_utc(baseline_start),
+            Sale.created_at < to_utc(today_start),
+        )
         .scalar()
     ) or 0
     avg_daily = baseline / days_baseline if days_baseline > 0 else 0
@@ -72,7 +75,7 @@ def check_sales_anomalies(db: Session, days_baseline: int = 7) -> list[Alert]:
     # Today so far
     today_total = (
         db.query(func.sum(Sale.total))
-        .filter(Sale.status == "completed", Sale.created_at >= today_start)
+        .filter(Sale.status == "completed", Sale.created_at >= to_utc(today_start))
         .scalar()
     ) or 0
 
@@ -5,6 +5,10 @@ from functools import lru_cache
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./data/tiendaos.db"
+    # Sale/void/stock writes go through one writer thread that commits
+    # everything arriving within the window in a single transaction
+    group_commit: bool = True
+    group_commit_window_ms: float = 3.0
 
     # Server
     host: str = "0.0.0.0"
@@ -38,6 +38,35 @@ def get_db():
 def init_db():
     Base.metadata.create_all(bind=engine)
     _run_migrations()
+    _seed_stock_ledger()
+    _seed_sales_rollup()
+
+
+def _seed_stock_ledger():
+    """Back any stock not explained by the stock_movements ledger (databases
+    from before the ledger, rows written by import scripts) with an opening
+    movement, so products.stock can always be rebuilt from the ledger."""
+    from app.services.stock import seed_opening_balances  # avoid circular import
+    db = SessionLocal()
+    try:
+        seed_opening_balances(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _seed_sales_rollup():
+    """Build the hourly sales rollup for databases that have sales from
+    before it existed. Afterwards every write keeps it up to date."""
+    from app.models.sale import Sale, SalesHourlyRollup
+    from app.services.rollup import rebuild_rollup  # avoid circular import
+    db = SessionLocal()
+    try:
+        if db.query(SalesHourlyRollup).first() is None and db.query(Sale.id).first() is not None:
+            rebuild_rollup(db)
+            db.commit()
+    finally:
+        db.close()
 
 
 def _run_migrations():
@@ -51,6 +80,10 @@ def _run_migrations():
         ("stores", "sync_api_key", "VARCHAR(64)"),
         ("categories", "favorite_group", "BOOLEAN DEFAULT 0"),
         ("products", "brand", "VARCHAR(100)"),
+        ("sale_items", "unit_cost", "FLOAT"),
+        ("products", "remote_updated_at", "DATETIME"),
+        ("categories", "updated_at", "DATETIME"),
+        ("sync_meta", "cursor", "VARCHAR(500)"),
     ]
     with engine.connect() as conn:
         for table, column, col_def in migrations:
@@ -59,6 +92,37 @@ def _run_migrations():
                 conn.commit()
             except Exception:
                 pass  # Column already exists
+        # Catalog cache / inventory index sweeps and sync pulls filter on
+        # products.updated_at and stock_movements.created_at; reports
+        # range-scan sales by date and join their items
+        for index_sql in (
+            "CREATE INDEX IF NOT EXISTS ix_products_updated_at ON products(updated_at)",
+            "CREATE INDEX IF NOT EXISTS ix_stock_movements_created_at ON stock_movements(created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_sales_created_at ON sales(created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_sale_items_sale_id ON sale_items(sale_id)",
+        ):
+            try:
+                conn.execute(text(index_sql))
+                conn.commit()
+            except Exception:
+                pass
+        # Backfill cost snapshots on sale lines from before unit_cost existed
+        # with the product's current cost (the best estimate available)
+        try:
+            conn.execute(text(
+                "UPDATE sale_items SET unit_cost = "
+                "(SELECT COALESCE(cost, 0) FROM products WHERE products.id = sale_items.product_id) "
+                "WHERE unit_cost IS NULL"
+            ))
+            conn.commit()
+        except Exception:
+            pass
+        # Categories from before the change feed enter it once, as of now
+        try:
+            conn.execute(text("UPDATE categories SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL"))
+            conn.commit()
+        except Exception:
+            pass
         # Unique index for sync_api_key (can't use UNIQUE inline in SQLite ADD COLUMN)
         try:
             conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_stores_sync_api_key ON stores(sync_api_key)"))
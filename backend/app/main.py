@@ -22,6 +22,7 @@ from app.models import Store, User  # noqa: F401 — registers all models with B
 from app.routers import auth, products, sales, stores, ai, admin, pricechecker, reports, finance, chat, tickets, suppliers, sync as sync_router, receipts
 from app.services.auth import hash_password
 from app.services.sync import sync_loop
+from app.services import tombstones  # noqa: F401 — records catalog deletions for the sync feed
 
 settings = get_settings()
 
@@ -1,14 +1,14 @@
 from app.models.store import Store
 from app.models.user import User
 from app.models.supplier import Supplier
-from app.models.product import Category, Product, ProductBarcode, VolumePromo, StockAdjustment, ProductTicketAlias, ProductComponent
-from app.models.sale import Sale, SaleItem
+from app.models.product import Category, Product, ProductBarcode, VolumePromo, StockAdjustment, ProductTicketAlias, ProductComponent, StockMovement
+from app.models.sale import Sale, SaleItem, SalesHourlyRollup
 from app.models.finance import FinanceEntry, VendorMapping
 from app.models.ticket import Ticket
-from app.models.sync import SyncMeta
+from app.models.sync import SyncMeta, CatalogTombstone
 
 __all__ = [
     "Store", "User", "Supplier", "Category", "Product", "ProductBarcode",
-    "VolumePromo", "StockAdjustment", "ProductTicketAlias", "ProductComponent", "Sale", "SaleItem", "FinanceEntry", "VendorMapping",
-    "Ticket", "SyncMeta",
+    "VolumePromo", "StockAdjustment", "ProductTicketAlias", "ProductComponent", "StockMovement", "Sale", "SaleItem", "SalesHourlyRollup", "FinanceEntry", "VendorMapping",
+    "Ticket", "SyncMeta", "CatalogTombstone",
 ]
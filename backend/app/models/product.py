@@ -17,6 +17,8 @@ class Category(Base):
     # When true, this category shows as a single tile in POS Favoritos that opens
     # a picker of its products (e.g. "Bebidas" -> agua mineral, sal y limon, new mix).
     favorite_group: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Position in the catalog change feed (GET /api/sync/products)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     parent: Mapped["Category | None"] = relationship("Category", remote_side="Category.id")
     products: Mapped[list["Product"]] = relationship("Product", back_populates="category")
@@ -42,7 +44,10 @@ class Product(Base):
     is_favorite: Mapped[bool] = mapped_column(Boolean, default=False)
     sell_by_weight: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # Local stores: the cloud's updated_at as of the last catalog pull. Kept
+    # apart from updated_at, which the pull and local edits set to local time.
+    remote_updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     supplier_id: Mapped[str | None] = mapped_column(String(36), ForeignKey("suppliers.id"), nullable=True)
 
@@ -59,6 +64,9 @@ class Product(Base):
         back_populates="parent",
         cascade="all, delete-orphan",
     )
+    stock_movements: Mapped[list["StockMovement"]] = relationship(
+        "StockMovement", back_populates="product", cascade="all, delete-orphan", passive_deletes=True,
+    )
 
 
 class ProductBarcode(Base):
@@ -136,3 +144,25 @@ class StockAdjustment(Base):
     reason: Mapped[str] = mapped_column(String(50), nullable=False)  # restock, damaged, correction, shrinkage
     notes: Mapped[str] = mapped_column(Text, default="")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class StockMovement(Base):
+    """Append-only stock ledger. Product.stock is a cached projection of
+    SUM(quantity) per product and can be rebuilt from these rows.
+
+    kind: opening (initial balance), sale, void, adjustment, sync.
+    Recipe sales draw from their components: those rows carry the component's
+    product_id and the sold recipe in via_product_id.
+    """
+    __tablename__ = "stock_movements"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    product_id: Mapped[str] = mapped_column(String(36), ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)  # signed: negative = stock out
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    via_product_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    ref_id: Mapped[str | None] = mapped_column(String(36), nullable=True, index=True)  # sale / adjustment id
+    user_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+
+    product: Mapped["Product"] = relationship("Product", back_populates="stock_movements")
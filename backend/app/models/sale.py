@@ -20,7 +20,7 @@ class Sale(Base):
     cash_received: Mapped[float] = mapped_column(Float, default=0.0)
     change_given: Mapped[float] = mapped_column(Float, default=0.0)
     status: Mapped[str] = mapped_column(String(20), default="completed")  # completed, voided, pending
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
     synced_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     store: Mapped["Store"] = relationship("Store", back_populates="sales")
@@ -32,7 +32,7 @@ class SaleItem(Base):
     __tablename__ = "sale_items"
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    sale_id: Mapped[str] = mapped_column(String(36), ForeignKey("sales.id"), nullable=False)
+    sale_id: Mapped[str] = mapped_column(String(36), ForeignKey("sales.id"), nullable=False, index=True)
     product_id: Mapped[str] = mapped_column(String(36), ForeignKey("products.id"), nullable=False)
     product_name: Mapped[str] = mapped_column(String(200), nullable=False)  # denormalized for receipts
     quantity: Mapped[float] = mapped_column(Float, default=1)
@@ -40,5 +40,27 @@ class SaleItem(Base):
     discount_percent: Mapped[float] = mapped_column(Float, default=0.0)
     line_total: Mapped[float] = mapped_column(Float, nullable=False)
     pack_units: Mapped[int] = mapped_column(Integer, default=1)
+    # Product cost per base unit at sale time; line cost = unit_cost × quantity × pack_units
+    unit_cost: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     sale: Mapped["Sale"] = relationship("Sale", back_populates="items")
+
+
+class SalesHourlyRollup(Base):
+    """Completed-sale totals per store, store-local hour and payment method.
+
+    Maintained in the same transaction as every sale, void and sync import
+    (app.services.rollup), so dashboards read a few dozen rows instead of
+    every sale. Rebuildable from sales with rebuild_rollup().
+    """
+    __tablename__ = "sales_hourly_rollup"
+
+    store_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    hour: Mapped[datetime] = mapped_column(DateTime, primary_key=True)  # store-local, truncated to the hour
+    payment_method: Mapped[str] = mapped_column(String(20), primary_key=True)
+    sale_count: Mapped[int] = mapped_column(Integer, default=0)
+    subtotal: Mapped[float] = mapped_column(Float, default=0.0)
+    tax: Mapped[float] = mapped_column(Float, default=0.0)
+    total: Mapped[float] = mapped_column(Float, default=0.0)
+    units: Mapped[float] = mapped_column(Float, default=0.0)
+    cost: Mapped[float] = mapped_column(Float, default=0.0)
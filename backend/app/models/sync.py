@@ -12,4 +12,24 @@ class SyncMeta(Base):
     id: Mapped[str] = mapped_column(String(50), primary_key=True)  # e.g. "pull_products", "push_sales"
     last_synced_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     last_result: Mapped[str] = mapped_column(String(500), default="")
+    cursor: Mapped[str | None] = mapped_column(String(500), nullable=True)  # change feed position (pulls)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CatalogTombstone(Base):
+    """A deleted catalog row, kept so the change feed can tell local stores
+    to delete it too (app.services.tombstones records them on flush).
+
+    entity: product, category, barcode (pack), promo, component.
+    key is the row's natural key at the store: the pack barcode, the promo's
+    min_units, the recipe's component_id; the id itself for products and
+    categories.
+    """
+    __tablename__ = "catalog_tombstones"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    entity: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    product_id: Mapped[str | None] = mapped_column(String(36), nullable=True)  # owning product (children)
+    key: Mapped[str] = mapped_column(String(50), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
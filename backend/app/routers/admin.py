@@ -11,6 +11,13 @@ from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.services.auth import get_current_user, require_role, hash_password
+from app.services.catalog import catalog
+from app.services.inventory import inventory
+from app.services.live import dashboard_feed
+from app.services.report_cache import report_cache
+from app.services.stock import rebuild_stock
+from app.services.rollup import rebuild_rollup
+from app.services.writer import coordinator_for, run_write
 
 # Repo root: backend/app/routers/admin.py → go up 3 levels
 REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
@@ -49,6 +56,65 @@ def system_version(_admin: User = Depends(require_role("admin", "manager"))):
     return _git_info()
 
 
+@router.get("/system/catalog-cache")
+def catalog_cache_stats(_admin: User = Depends(require_role("admin", "manager"))):
+    """Hot catalog cache version, size and hit/miss counters."""
+    return catalog.stats()
+
+
+@router.get("/system/write-coordinator")
+def write_coordinator_stats(
+    db: Session = Depends(get_db),
+    _admin: User = Depends(require_role("admin", "manager")),
+):
+    """Group-commit counters: writes, commits and writes per commit."""
+    return coordinator_for(db.get_bind()).stats()
+
+
+@router.get("/system/report-cache")
+def report_cache_stats(_admin: User = Depends(require_role("admin", "manager"))):
+    """Report cache size, day hit/miss counters and invalidations."""
+    return report_cache.stats()
+
+
+@router.get("/system/inventory-index")
+def inventory_index_stats(_admin: User = Depends(require_role("admin", "manager"))):
+    """Inventory index size, list sizes and reload counters."""
+    return inventory.stats()
+
+
+@router.get("/system/dashboard-feed")
+def dashboard_feed_stats(_admin: User = Depends(require_role("admin", "manager"))):
+    """Live dashboard feed position, buffered events and subscribers."""
+    return dashboard_feed.stats()
+
+
+@router.post("/system/rebuild-stock")
+def rebuild_stock_projection(
+    db: Session = Depends(get_db),
+    _admin: User = Depends(require_role("admin")),
+):
+    """Recompute every product's stock from the stock_movements ledger. Runs
+    on the writer so no sale's stock update lands between the ledger read
+    and the rewrite."""
+    drifted = run_write(db, rebuild_stock)
+    catalog.invalidate()
+    inventory.invalidate()
+    return {"ok": True, "products_corrected": drifted}
+
+
+@router.post("/system/rebuild-sales-rollup")
+def rebuild_sales_rollup(
+    db: Session = Depends(get_db),
+    _admin: User = Depends(require_role("admin")),
+):
+    """Recompute the hourly sales rollup from the sales table. Runs on the
+    writer so no sale lands between the read and the rewrite."""
+    rows = run_write(db, rebuild_rollup)
+    report_cache.clear()
+    return {"ok": True, "rollup_rows": rows}
+
+
 @router.post("/system/update")
 async def system_update(
     background_tasks: BackgroundTasks,
@@ -23,6 +23,10 @@ from app.models.finance import FinanceEntry
 from app.models.user import User
 from app.config import get_settings
 from app.services.auth import get_current_user, require_role
+from app.services.catalog import catalog
+from app.services.inventory import inventory
+from app.services.stock import ADJUSTMENT, adjust_product_stock
+from app.services.writer import run_write
 
 settings = get_settings()
 router = APIRouter(prefix="/api/chat", tags=["chat"])
@@ -497,6 +501,8 @@ def execute_pending(user_id: str, db: Session, user: User) -> ChatResponse:
         old = product.price
         product.price = pending["new_value"]
         db.commit()
+        catalog.invalidate([product.id])
+        inventory.invalidate([product.id])
         _action_counts[user_id] = _action_counts.get(user_id, 0) + 1
         return ChatResponse(
             reply=f"Listo! Precio actualizado:\n**{product.name}** — ${old:.2f} → **${pending['new_value']:.2f}**",
@@ -510,6 +516,8 @@ def execute_pending(user_id: str, db: Session, user: User) -> ChatResponse:
         old = product.cost
         product.cost = pending["new_value"]
         db.commit()
+        catalog.invalidate([product.id])
+        inventory.invalidate([product.id])
         _action_counts[user_id] = _action_counts.get(user_id, 0) + 1
         return ChatResponse(
             reply=f"Listo! Costo actualizado:\n**{product.name}** — ${old:.2f} → **${pending['new_value']:.2f}**",
@@ -520,12 +528,19 @@ def execute_pending(user_id: str, db: Session, user: User) -> ChatResponse:
         product = db.query(Product).filter(Product.id == pending["product_id"]).first()
         if not product:
             return ChatResponse(reply="Producto no encontrado.")
-        old = product.stock
-        product.stock = pending["new_value"]
-        db.commit()
+        # Apply the confirmed change as a delta so sales made since the proposal aren't overwritten
+        product_id, qty = product.id, pending["qty"]
+        applied = run_write(
+            db, lambda session: adjust_product_stock(session, product_id, qty, ADJUSTMENT, user_id=user.id)
+        )
+        if applied is None:
+            return ChatResponse(reply="Producto no encontrado.")
+        old, new = applied
+        catalog.invalidate([product.id])
+        inventory.invalidate([product.id])
         _action_counts[user_id] = _action_counts.get(user_id, 0) + 1
         return ChatResponse(
-            reply=f"Listo! Stock actualizado:\n**{product.name}** — {old} → **{pending['new_value']}** uds",
+            reply=f"Listo! Stock actualizado:\n**{product.name}** — {old} → **{new}** uds",
             action="stock_change",
         )
 
@@ -570,6 +585,7 @@ def execute_pending(user_id: str, db: Session, user: User) -> ChatResponse:
             return ChatResponse(reply="Producto no encontrado.")
         product.category_id = pending["category_id"]
         db.commit()
+        catalog.invalidate([product.id])
         _action_counts[user_id] = _action_counts.get(user_id, 0) + 1
         return ChatResponse(
             reply=f"Listo! **{product.name}** ahora esta en **{pending['category_name']}**",
@@ -2,8 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models.product import Product, ProductBarcode, VolumePromo
-from app.schemas.product import ProductResponse, PackInfo
+from app.services.catalog import catalog
 
 router = APIRouter(prefix="/api/price-check", tags=["price-checker"])
 
@@ -11,37 +10,29 @@ router = APIRouter(prefix="/api/price-check", tags=["price-checker"])
 @router.get("/{barcode}")
 def price_check(barcode: str, db: Session = Depends(get_db)):
     """Public endpoint — no auth required. Returns product info for price checker kiosks."""
-    # Check pack barcodes first
-    pack = db.query(ProductBarcode).filter(ProductBarcode.barcode == barcode).first()
-    if pack:
-        product = db.query(Product).filter(Product.id == pack.product_id, Product.is_active == True).first()
-        if product:
-            return {
-                "name": product.name,
-                "price": pack.pack_price,
-                "unit_price": product.price,
-                "image_url": product.image_url,
-                "sell_by_weight": product.sell_by_weight,
-                "pack": {
-                    "barcode": pack.barcode,
-                    "units": pack.units,
-                    "pack_price": pack.pack_price,
-                },
-            }
-
-    # Then check main product barcode
-    product = db.query(Product).filter(Product.barcode == barcode, Product.is_active == True).first()
-    if not product:
+    # Pack barcodes take precedence over main barcodes (resolved in the catalog cache)
+    found = catalog.lookup_barcode(db, barcode)
+    if not found:
         raise HTTPException(status_code=404, detail="Product not found")
+    product, pack = found
 
-    # Include volume promos for bundle pricing display
-    promos = (
-        db.query(VolumePromo)
-        .filter(VolumePromo.product_id == product.id)
-        .order_by(VolumePromo.min_units.asc())
-        .all()
-    )
+    if pack:
+        return {
+            "name": product.name,
+            "price": pack.pack_price,
+            "unit_price": product.price,
+            "image_url": product.image_url,
+            "sell_by_weight": product.sell_by_weight,
+            "pack": {
+                "barcode": pack.barcode,
+                "units": pack.units,
+                "pack_price": pack.pack_price,
+            },
+        }
 
+    # Include volume promos for bundle pricing display. bundle_total is what
+    # checkout charges for min_units, which can beat the tier's own price
+    # when smaller tiers combine better
     return {
         "name": product.name,
         "price": product.price,
@@ -54,7 +45,8 @@ def price_check(barcode: str, db: Session = Depends(get_db)):
                 "min_units": vp.min_units,
                 "bundle_price": vp.promo_price,
                 "unit_price": round(vp.promo_price / vp.min_units, 2),
+                "bundle_total": product.bundle.total(vp.min_units),
             }
-            for vp in promos
+            for vp in product.promos
         ],
     }
@@ -2,8 +2,10 @@ import csv
 import io
 import os
 import uuid as _uuid
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import FileResponse
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
@@ -30,6 +32,11 @@ from app.schemas.product import (
     ComponentResponse,
 )
 from app.services.auth import get_current_user, require_role
+from app.services.catalog import catalog
+from app.services.inventory import inventory
+from app.services.export import YIELD_PER, csv_response, stream_rows
+from app.services.stock import ADJUSTMENT, OPENING, adjust_product_stock, apply_movements, set_product_stock
+from app.services.writer import run_write
 
 router = APIRouter(prefix="/api/products", tags=["products"])
 
@@ -37,38 +44,48 @@ PRODUCT_IMG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(_
 os.makedirs(PRODUCT_IMG_DIR, exist_ok=True)
 
 
+def _touch(db: Session, product_id: str):
+    """Bump a product's updated_at after editing one of its child rows
+    (packs, promos, components, aliases), which don't bump it on their own."""
+    db.query(Product).filter(Product.id == product_id).update(
+        {"updated_at": datetime.utcnow()}, synchronize_session=False
+    )
+
+
 # --- Export / Import ---
 
 @router.get("/export-csv")
 def export_products_csv(
+    gzip: bool = Query(False, description="gzip-compress the download"),
     db: Session = Depends(get_db),
     _admin: User = Depends(require_role("admin", "manager")),
 ):
-    """Export all products as CSV."""
-    products = db.query(Product).order_by(Product.name).all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        "barcode", "name", "description", "category", "price", "cost",
-        "stock", "min_stock", "sell_by_weight", "is_active",
-    ])
-    for p in products:
-        cat_name = ""
-        if p.category_id:
-            cat = db.query(Category).filter(Category.id == p.category_id).first()
-            if cat:
-                cat_name = cat.name
-        writer.writerow([
-            p.barcode, p.name, p.description or "", cat_name,
-            p.price, p.cost, p.stock, p.min_stock,
-            "1" if p.sell_by_weight else "0",
-            "1" if p.is_active else "0",
-        ])
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=productos.csv"},
+    """Export all products as CSV, streamed (category joined, not looked up per row)."""
+    def query(session: Session):
+        rows = session.execute(
+            select(
+                Product.barcode, Product.name, Product.description, Category.name,
+                Product.price, Product.cost, Product.stock, Product.min_stock,
+                Product.sell_by_weight, Product.is_active,
+            )
+            .outerjoin(Category, Category.id == Product.category_id)
+            .order_by(Product.name)
+            .execution_options(yield_per=YIELD_PER)
+        )
+        for barcode, name, description, cat_name, price, cost, stock, min_stock, by_weight, active in rows:
+            yield [
+                barcode, name, description or "", cat_name or "",
+                price, cost, stock, min_stock,
+                "1" if by_weight else "0",
+                "1" if active else "0",
+            ]
+
+    return csv_response(
+        "productos.csv",
+        ["barcode", "name", "description", "category", "price", "cost",
+         "stock", "min_stock", "sell_by_weight", "is_active"],
+        stream_rows(db.get_bind(), query),
+        compress=gzip,
     )
 
 
@@ -86,6 +103,7 @@ async def import_products_csv(
     created = 0
     updated = 0
     errors = []
+    opening = []  # initial stock, applied through the ledger once rows exist
 
     # Cache categories by name
     cat_cache: dict[str, str] = {}
@@ -131,23 +149,30 @@ async def import_products_csv(
             if cat_id:
                 existing.category_id = cat_id
             if stock > 0 and existing.stock == 0:
-                existing.stock = stock
+                opening.append((existing.id, stock, None))
             updated += 1
         else:
             product = Product(
+                id=str(_uuid.uuid4()),
                 barcode=barcode,
                 name=name,
                 price=price,
                 cost=cost,
-                stock=stock,
+                stock=0,
                 min_stock=min_stock,
                 category_id=cat_id,
                 sell_by_weight=sell_by_weight,
             )
             db.add(product)
+            opening.append((product.id, stock, None))
             created += 1
 
+    db.flush()
+    apply_movements(db, OPENING, opening)
+
     db.commit()
+    catalog.invalidate()
+    inventory.invalidate()
     return {"created": created, "updated": updated, "errors": errors[:20]}
 
 
@@ -185,6 +210,7 @@ async def upload_product_image(
 
     product.image_url = f"/api/products/image/{filename}"
     db.commit()
+    catalog.invalidate([product_id])
     return {"image_url": product.image_url}
 
 
@@ -230,6 +256,7 @@ def update_category(
     cat.name = data.name
     cat.color = data.color
     db.commit()
+    catalog.invalidate()
     db.refresh(cat)
     return cat
 
@@ -248,6 +275,7 @@ def delete_category(
     db.query(Product).filter(Product.category_id == category_id).update({"category_id": None})
     db.delete(cat)
     db.commit()
+    catalog.invalidate()
     return {"ok": True}
 
 
@@ -270,7 +298,6 @@ def list_products(
         q = q.filter(Product.is_active == True)
     if updated_since:
         try:
-            from datetime import datetime
             since_dt = datetime.fromisoformat(updated_since.replace("Z", "+00:00"))
             q = q.filter(Product.updated_at >= since_dt)
         except ValueError:
@@ -297,26 +324,23 @@ def list_products(
 
 @router.get("/barcode/{barcode}", response_model=BarcodeLookupResponse)
 def get_by_barcode(barcode: str, db: Session = Depends(get_db), _user: User = Depends(get_current_user)):
-    # Check pack barcodes first
-    pack = db.query(ProductBarcode).filter(ProductBarcode.barcode == barcode).first()
-    if pack:
-        product = db.query(Product).filter(Product.id == pack.product_id, Product.is_active == True).first()
-        if product:
-            return BarcodeLookupResponse(
-                product=ProductResponse.model_validate(product),
-                pack=PackInfo(
-                    barcode_id=pack.id,
-                    barcode=pack.barcode,
-                    units=pack.units,
-                    pack_price=pack.pack_price,
-                ),
-            )
-
-    # Then check main product barcode
-    product = db.query(Product).filter(Product.barcode == barcode, Product.is_active == True).first()
-    if not product:
+    # Pack barcodes take precedence over main barcodes (resolved in the catalog cache)
+    found = catalog.lookup_barcode(db, barcode)
+    if not found:
         raise HTTPException(status_code=404, detail="Product not found")
-    return BarcodeLookupResponse(product=ProductResponse.model_validate(product))
+    entry, pack = found
+    product = catalog.with_live_stock(db, entry)
+    if pack:
+        return BarcodeLookupResponse(
+            product=product,
+            pack=PackInfo(
+                barcode_id=pack.id,
+                barcode=pack.barcode,
+                units=pack.units,
+                pack_price=pack.pack_price,
+            ),
+        )
+    return BarcodeLookupResponse(product=product)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
@@ -335,10 +359,16 @@ def create_product(
 ):
     if db.query(Product).filter(Product.barcode == data.barcode).first():
         raise HTTPException(status_code=400, detail="Barcode already exists")
-    product = Product(**data.model_dump())
+    fields = data.model_dump()
+    stock = fields.pop("stock")
+    product = Product(id=str(_uuid.uuid4()), stock=0, **fields)
     db.add(product)
+    db.flush()
+    apply_movements(db, OPENING, [(product.id, stock, None)], user_id=_admin.id)
     db.commit()
     db.refresh(product)
+    catalog.invalidate([product.id])
+    inventory.invalidate([product.id])
     return product
 
 
@@ -359,10 +389,17 @@ def update_product(
         if existing:
             raise HTTPException(status_code=400, detail="Barcode already exists")
 
+    # A stock edit is a recount: goes through the ledger, not a plain column write
+    new_stock = updates.pop("stock", None)
     for field, value in updates.items():
         setattr(product, field, value)
+    db.flush()
+    if new_stock is not None:
+        set_product_stock(db, product_id, new_stock, user_id=_admin.id)
     db.commit()
     db.refresh(product)
+    catalog.invalidate([product_id])
+    inventory.invalidate([product_id])
     return product
 
 
@@ -378,11 +415,15 @@ def delete_product(
     try:
         db.delete(product)
         db.commit()
+        catalog.invalidate([product_id])
+        inventory.invalidate([product_id])
     except IntegrityError:
         # sale_items FK: products with sales can't be hard-deleted
         db.rollback()
         product.is_active = False
         db.commit()
+        catalog.invalidate([product_id])
+        inventory.invalidate([product_id])
         raise HTTPException(
             status_code=409,
             detail="Este producto tiene ventas registradas y no se puede eliminar. Se desactivó en su lugar.",
@@ -410,6 +451,8 @@ def bulk_delete_products(
             product.is_active = False
             db.commit()
             deactivated += 1
+    catalog.invalidate(ids)
+    inventory.invalidate(ids)
     return {"deleted": deleted, "deactivated": deactivated}
 
 
@@ -427,8 +470,11 @@ def bulk_patch_products(
     filtered = {k: v for k, v in updates.items() if k in allowed}
     if not filtered:
         raise HTTPException(status_code=400, detail="No valid fields to update")
+    filtered["updated_at"] = datetime.utcnow()
     db.query(Product).filter(Product.id.in_(ids)).update(filtered, synchronize_session=False)
     db.commit()
+    catalog.invalidate(ids)
+    inventory.invalidate(ids)
     return {"updated": len(ids)}
 
 
@@ -445,6 +491,7 @@ def toggle_favorite(
         raise HTTPException(status_code=404, detail="Product not found")
     product.is_favorite = not product.is_favorite
     db.commit()
+    catalog.invalidate([product_id])
     return {"id": product.id, "is_favorite": product.is_favorite}
 
 
@@ -455,24 +502,23 @@ def adjust_stock(
     db: Session = Depends(get_db),
     admin: User = Depends(require_role("admin", "manager")),
 ):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-
-    product.stock += data.quantity
-    if product.stock < 0:
-        product.stock = 0
-
-    adjustment = StockAdjustment(
-        product_id=product.id,
-        user_id=admin.id,
-        quantity=data.quantity,
-        reason=data.reason,
-        notes=data.notes,
-    )
-    db.add(adjustment)
-    db.commit()
-    db.refresh(adjustment)
+    def write(session: Session) -> StockAdjustment:
+        adjustment = StockAdjustment(
+            id=str(_uuid.uuid4()),
+            product_id=product_id,
+            user_id=admin.id,
+            quantity=data.quantity,
+            reason=data.reason,
+            notes=data.notes,
+        )
+        # Atomic relative update (never below zero), recorded in the stock ledger
+        if adjust_product_stock(session, product_id, data.quantity, ADJUSTMENT, ref_id=adjustment.id, user_id=admin.id) is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        session.add(adjustment)
+        return adjustment
+
+    adjustment = run_write(db, write)
+    inventory.invalidate([product_id])
     return adjustment
 
 
@@ -513,8 +559,10 @@ def add_barcode(
 
     pack = ProductBarcode(product_id=product_id, **data.model_dump())
     db.add(pack)
+    _touch(db, product_id)
     db.commit()
     db.refresh(pack)
+    catalog.invalidate([product_id])
     return pack
 
 
@@ -531,7 +579,9 @@ def delete_barcode(
     if not pack:
         raise HTTPException(status_code=404, detail="Pack barcode not found")
     db.delete(pack)
+    _touch(db, product_id)
     db.commit()
+    catalog.invalidate([product_id])
     return {"ok": True}
 
 
@@ -567,8 +617,10 @@ def add_ticket_alias(
 
     alias = ProductTicketAlias(product_id=product_id, alias=alias_text, supplier_id=data.supplier_id or None)
     db.add(alias)
+    _touch(db, product_id)
     db.commit()
     db.refresh(alias)
+    catalog.invalidate([product_id])
     return alias
 
 
@@ -585,7 +637,9 @@ def delete_ticket_alias(
     if not alias:
         raise HTTPException(status_code=404, detail="Ticket alias not found")
     db.delete(alias)
+    _touch(db, product_id)
     db.commit()
+    catalog.invalidate([product_id])
     return {"ok": True}
 
 
@@ -621,8 +675,10 @@ def add_component(
 
     comp = ProductComponent(parent_id=product_id, component_id=data.component_id, quantity=data.quantity)
     db.add(comp)
+    _touch(db, product_id)
     db.commit()
     db.refresh(comp)
+    catalog.invalidate([product_id])
     return comp
 
 
@@ -639,7 +695,9 @@ def delete_component(
     if not comp:
         raise HTTPException(status_code=404, detail="Componente no encontrado")
     db.delete(comp)
+    _touch(db, product_id)
     db.commit()
+    catalog.invalidate([product_id])
     return {"ok": True}
 
 
@@ -658,8 +716,10 @@ def add_promo(
 
     promo = VolumePromo(product_id=product_id, **data.model_dump())
     db.add(promo)
+    _touch(db, product_id)
     db.commit()
     db.refresh(promo)
+    catalog.invalidate([product_id])
     return promo
 
 
@@ -676,5 +736,7 @@ def delete_promo(
     if not promo:
         raise HTTPException(status_code=404, detail="Promo not found")
     db.delete(promo)
+    _touch(db, product_id)
     db.commit()
+    catalog.invalidate([product_id])
     return {"ok": True}
@@ -1,25 +1,39 @@
-from datetime import datetime, timedelta
+import heapq
+import os
+from datetime import date, datetime, timedelta
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, case
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
 from app.database import get_db
-from app.models.product import Product, Category
-from app.models.sale import Sale, SaleItem
+from app.models.sale import Sale, SaleItem, SalesHourlyRollup
 from app.models.user import User
+from app.routers.sales import local_day_utc_range
 from app.services.auth import get_current_user, require_role
+from app.services.catalog import catalog
+from app.services.export import YIELD_PER, csv_response, stream_rows
+from app.services.history_export import export_sales_history, load_manifest
+from app.services.inventory import BELOW_MINIMUM, OUT_OF_STOCK, inventory
+from app.services.live import dashboard_feed
+from app.services.report_cache import report_cache
+from app.services.rollup import hourly_rows, top_products
+from app.services.timebucket import bucket, bucket_key, bucket_label, local_today, to_local, utc_bounds
 
 settings = get_settings()
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
+ANALYTICS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "analytics")
 
-def _parse_date_range(start: str | None, end: str | None, default_days: int = 7):
+
+def _parse_date_range(start: str | None, end: str | None, default_days: int = 7) -> tuple[datetime, datetime]:
+    """Store-local days [start, end] as naive local midnights [start, end + 1)."""
     if end:
         end_dt = datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1)
     else:
-        end_dt = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        end_dt = datetime.combine(local_today(), datetime.min.time()) + timedelta(days=1)
     if start:
         start_dt = datetime.strptime(start, "%Y-%m-%d")
     else:
@@ -32,76 +46,71 @@ def dashboard(
     db: Session = Depends(get_db),
     _user: User = Depends(get_current_user),
 ):
-    """Today's KPIs + sales by hour + top products."""
-    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    tomorrow = today + timedelta(days=1)
-    yesterday = today - timedelta(days=1)
-
-    base = db.query(Sale).filter(
-        Sale.store_id == settings.store_id,
-        Sale.status == "completed",
-    )
+    """Today's KPIs + sales by hour + top products (store-local day).
+
+    Totals come from the hourly rollup (at most 2 days × 24 hours × payment
+    methods rows); top products are one GROUP BY over today's items.
+    """
+    day_str, start_utc, end_utc = local_day_utc_range(None)
+    today = datetime.strptime(day_str, "%Y-%m-%d")
+    rows = hourly_rows(db, today - timedelta(days=1), today + timedelta(days=1))
+
+    hours = [{"hour": h, "sales": 0.0, "transactions": 0} for h in range(24)]
+    payments = {"cash": 0.0, "card": 0.0, "mixed": 0.0}
+    today_total = today_cost = yesterday_total = 0.0
+    today_count = 0
+    for r in rows:
+        if r.hour < today:
+            yesterday_total += r.total
+            continue
+        today_total += r.total
+        today_count += r.sale_count
+        today_cost += r.cost
+        slot = hours[r.hour.hour]
+        slot["sales"] += r.total
+        slot["transactions"] += r.sale_count
+        if r.payment_method in payments:
+            payments[r.payment_method] += r.total
+    for slot in hours:
+        slot["sales"] = round(slot["sales"], 2)
 
-    # Today's sales
-    today_sales = base.filter(Sale.created_at >= today, Sale.created_at < tomorrow).all()
-    today_total = sum(s.total for s in today_sales)
-    today_count = len(today_sales)
     today_avg = round(today_total / today_count, 2) if today_count else 0.0
-    today_cost = 0.0
-    for s in today_sales:
-        for item in s.items:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if product and product.cost:
-                today_cost += product.cost * item.quantity * item.pack_units
-
-    today_profit = round(today_total - today_cost, 2)
-
-    # Yesterday for comparison
-    yesterday_sales = base.filter(Sale.created_at >= yesterday, Sale.created_at < today).all()
-    yesterday_total = sum(s.total for s in yesterday_sales)
-
-    # Sales by hour (today)
-    hours = []
-    for h in range(24):
-        h_start = today + timedelta(hours=h)
-        h_end = today + timedelta(hours=h + 1)
-        h_sales = [s for s in today_sales if h_start <= s.created_at < h_end]
-        h_total = sum(s.total for s in h_sales)
-        hours.append({"hour": h, "sales": round(h_total, 2), "transactions": len(h_sales)})
-
-    # Top 10 products today
-    product_totals: dict[str, dict] = {}
-    for s in today_sales:
-        for item in s.items:
-            key = item.product_name
-            if key not in product_totals:
-                product_totals[key] = {"product_name": key, "quantity_sold": 0, "revenue": 0.0}
-            product_totals[key]["quantity_sold"] += item.quantity * item.pack_units
-            product_totals[key]["revenue"] += item.line_total
-    top_products = sorted(product_totals.values(), key=lambda x: x["revenue"], reverse=True)[:10]
-
-    # Payment method breakdown
-    cash_total = sum(s.total for s in today_sales if s.payment_method == "cash")
-    card_total = sum(s.total for s in today_sales if s.payment_method == "card")
-    mixed_total = sum(s.total for s in today_sales if s.payment_method == "mixed")
+    top = [
+        {"product_name": name, "quantity_sold": qty, "revenue": revenue}
+        for name, qty, revenue in top_products(db, start_utc, end_utc)
+    ]
 
     return {
-        "date": today.strftime("%Y-%m-%d"),
+        "date": day_str,
         "total_sales": round(today_total, 2),
         "transaction_count": today_count,
         "avg_ticket": today_avg,
-        "total_profit": today_profit,
+        "total_profit": round(today_total - today_cost, 2),
         "yesterday_total": round(yesterday_total, 2),
         "sales_by_hour": hours,
-        "top_products": top_products,
-        "payment_breakdown": {
-            "cash": round(cash_total, 2),
-            "card": round(card_total, 2),
-            "mixed": round(mixed_total, 2),
-        },
+        "top_products": top,
+        "payment_breakdown": {method: round(total, 2) for method, total in payments.items()},
     }
 
 
+@router.get("/dashboard/stream")
+def dashboard_stream(
+    last_event_id: str | None = Header(None),
+    resume: str | None = Query(None, description="Last event id, for clients that can't set headers"),
+    db: Session = Depends(get_db),
+    _user: User = Depends(get_current_user),
+):
+    """Live dashboard as server-sent events: a snapshot (same shape as
+    /dashboard), then sale/void/hour/top_products deltas as sales commit.
+    Reconnecting with Last-Event-ID replays the missed events."""
+    cursor, first = dashboard_feed.connect(db, last_event_id or resume)
+    return StreamingResponse(
+        dashboard_feed.stream(db.get_bind(), cursor, first),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/sales-summary")
 def sales_summary(
     start: str | None = Query(None, description="YYYY-MM-DD"),
@@ -110,44 +119,112 @@ def sales_summary(
     db: Session = Depends(get_db),
     _user: User = Depends(require_role("admin", "manager")),
 ):
-    """Sales totals grouped by day/week/month."""
+    """Sales totals grouped by store-local day, ISO week or month, from the
+    hourly rollup; closed days come from the report cache."""
     start_dt, end_dt = _parse_date_range(start, end, default_days=30)
-
-    sales = (
-        db.query(Sale)
-        .filter(
-            Sale.store_id == settings.store_id,
-            Sale.status == "completed",
-            Sale.created_at >= start_dt,
-            Sale.created_at < end_dt,
-        )
-        .order_by(Sale.created_at)
-        .all()
-    )
+    grain = group_by if group_by in ("week", "month") else "day"
 
     buckets: dict[str, dict] = {}
-    for s in sales:
-        if group_by == "week":
-            key = s.created_at.strftime("%Y-W%W")
-        elif group_by == "month":
-            key = s.created_at.strftime("%Y-%m")
-        else:
-            key = s.created_at.strftime("%Y-%m-%d")
+    partials = report_cache.partials(db, "sales_summary", start_dt, end_dt, local_today(), _summary_by_day)
+    for day, partial in partials.items():
+        if partial is None:
+            continue
+        key = bucket_label(_containing(day, grain), grain)
 
         if key not in buckets:
             buckets[key] = {"period": key, "total_sales": 0.0, "transactions": 0, "avg_ticket": 0.0}
-        buckets[key]["total_sales"] += s.total
-        buckets[key]["transactions"] += 1
+        buckets[key]["total_sales"] += partial[0]
+        buckets[key]["transactions"] += partial[1]
 
     result = []
     for b in buckets.values():
+        if not b["transactions"]:
+            continue  # every sale in the period was voided
         b["total_sales"] = round(b["total_sales"], 2)
-        b["avg_ticket"] = round(b["total_sales"] / b["transactions"], 2) if b["transactions"] else 0.0
+        b["avg_ticket"] = round(b["total_sales"] / b["transactions"], 2)
         result.append(b)
 
     return result
 
 
+def _containing(day: date, grain: str) -> date:
+    """Week (Monday) or month (1st) containing a local day."""
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    if grain == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _summary_by_day(db: Session, start_dt: datetime, end_dt: datetime) -> dict[date, list]:
+    """[total, transactions] per store-local day — GROUP BY over the rollup."""
+    day = bucket(db, SalesHourlyRollup.hour, "day", local=False)
+    rows = db.execute(
+        select(day, func.sum(SalesHourlyRollup.total), func.sum(SalesHourlyRollup.sale_count))
+        .where(
+            SalesHourlyRollup.store_id == settings.store_id,
+            SalesHourlyRollup.hour >= start_dt,
+            SalesHourlyRollup.hour < end_dt,
+        )
+        .group_by(day)
+    )
+    return {bucket_key(d, "day"): [total, count] for d, total, count in rows}
+
+
+def _completed_in_range(start_dt: datetime, end_dt: datetime):
+    return (
+        Sale.store_id == settings.store_id,
+        Sale.status == "completed",
+        Sale.created_at >= start_dt,
+        Sale.created_at < end_dt,
+    )
+
+
+def _product_sales_by_day(db: Session, start_dt: datetime, end_dt: datetime) -> dict[date, dict]:
+    """{product_id: (name, units, revenue, cost)} per store-local day — one
+    GROUP BY. start_dt/end_dt are local midnights.
+
+    Cost comes from each line's unit_cost snapshot, so it never changes
+    after the sale.
+    """
+    start_utc, end_utc = utc_bounds(start_dt.date(), end_dt.date())
+    day = bucket(db, Sale.created_at, "day", start_utc, end_utc)
+    rows = db.execute(
+        select(
+            day,
+            SaleItem.product_id,
+            func.max(SaleItem.product_name),
+            func.sum(SaleItem.quantity * SaleItem.pack_units),
+            func.sum(SaleItem.line_total),
+            func.sum(SaleItem.quantity * SaleItem.pack_units * func.coalesce(SaleItem.unit_cost, 0.0)),
+        )
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .where(*_completed_in_range(start_utc, end_utc))
+        .group_by(day, SaleItem.product_id)
+    )
+    days: dict[date, dict] = {}
+    for d, product_id, name, units, revenue, cost in rows:
+        days.setdefault(bucket_key(d, "day"), {})[product_id] = (name, units, revenue, cost)
+    return days
+
+
+def _product_sales(db: Session, start_dt: datetime, end_dt: datetime) -> dict[str, list]:
+    """Merged [name, units, revenue, cost] per product over the range."""
+    totals: dict[str, list] = {}
+    partials = report_cache.partials(db, "product_sales", start_dt, end_dt, local_today(), _product_sales_by_day)
+    for partial in partials.values():
+        for product_id, (name, units, revenue, cost) in (partial or {}).items():
+            t = totals.get(product_id)
+            if t is None:
+                totals[product_id] = [name, units, revenue, cost]
+                continue
+            t[0] = max(t[0], name)
+            t[1] += units
+            t[2] += revenue
+            t[3] += cost
+    return totals
+
+
 @router.get("/product-profitability")
 def product_profitability(
     start: str | None = Query(None, description="YYYY-MM-DD"),
@@ -156,56 +233,30 @@ def product_profitability(
     db: Session = Depends(get_db),
     _user: User = Depends(require_role("admin", "manager")),
 ):
-    """Product-level revenue, cost, profit, margin."""
-    start_dt, end_dt = _parse_date_range(start, end, default_days=30)
+    """Product-level revenue, cost, profit, margin.
 
-    items = (
-        db.query(SaleItem)
-        .join(Sale)
-        .filter(
-            Sale.store_id == settings.store_id,
-            Sale.status == "completed",
-            Sale.created_at >= start_dt,
-            Sale.created_at < end_dt,
-        )
-        .all()
-    )
-
-    product_data: dict[str, dict] = {}
-    for item in items:
-        pid = item.product_id
-        if pid not in product_data:
-            product = db.query(Product).filter(Product.id == pid).first()
-            cost = product.cost if product else 0.0
-            product_data[pid] = {
-                "product_id": pid,
-                "product_name": item.product_name,
-                "cost": cost,
-                "units_sold": 0,
-                "revenue": 0.0,
-                "total_cost": 0.0,
-            }
-        units = item.quantity * item.pack_units
-        product_data[pid]["units_sold"] += units
-        product_data[pid]["revenue"] += item.line_total
-        product_data[pid]["total_cost"] += product_data[pid]["cost"] * units
+    Merged from per-day partials (one GROUP BY for the days not cached);
+    cost comes from each line's unit_cost snapshot. Ranking needs the
+    merged totals, so ORDER BY/LIMIT can't go into the per-day query; the
+    top ``limit`` are picked with a bounded heap instead of a full sort.
+    """
+    start_dt, end_dt = _parse_date_range(start, end, default_days=30)
+    totals = _product_sales(db, start_dt, end_dt)
+    ranked = heapq.nlargest(limit, totals.items(), key=lambda kv: kv[1][2] - kv[1][3])
 
     result = []
-    for p in product_data.values():
-        profit = round(p["revenue"] - p["total_cost"], 2)
-        margin = round((profit / p["revenue"]) * 100, 1) if p["revenue"] else 0.0
+    for product_id, (product_name, units_sold, rev, cost) in ranked:
+        profit_value = round(rev - cost, 2)
         result.append({
-            "product_id": p["product_id"],
-            "product_name": p["product_name"],
-            "units_sold": round(p["units_sold"], 2),
-            "revenue": round(p["revenue"], 2),
-            "cost": round(p["total_cost"], 2),
-            "profit": profit,
-            "margin_pct": margin,
+            "product_id": product_id,
+            "product_name": product_name,
+            "units_sold": round(units_sold, 2),
+            "revenue": round(rev, 2),
+            "cost": round(cost, 2),
+            "profit": profit_value,
+            "margin_pct": round((profit_value / rev) * 100, 1) if rev else 0.0,
         })
-
-    result.sort(key=lambda x: x["profit"], reverse=True)
-    return result[:limit]
+    return result
 
 
 @router.get("/category-performance")
@@ -215,49 +266,38 @@ def category_performance(
     db: Session = Depends(get_db),
     _user: User = Depends(require_role("admin", "manager")),
 ):
-    """Revenue and units by category."""
-    start_dt, end_dt = _parse_date_range(start, end, default_days=30)
+    """Revenue and units by category.
 
-    items = (
-        db.query(SaleItem)
-        .join(Sale)
-        .filter(
-            Sale.store_id == settings.store_id,
-            Sale.status == "completed",
-            Sale.created_at >= start_dt,
-            Sale.created_at < end_dt,
-        )
-        .all()
-    )
+    Merges the same per-day product partials as product profitability, then
+    maps products to their current category from the catalog cache, so
+    recategorizing a product never leaves stale cached results. Items of
+    deleted products are left out, as before.
+    """
+    start_dt, end_dt = _parse_date_range(start, end, default_days=30)
+    totals = _product_sales(db, start_dt, end_dt)
 
-    cat_data: dict[str, dict] = {}
-    for item in items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
+    category_of = catalog.category_names(db)
+    categories: dict[str, list] = {}
+    for product_id, (_name, units, rev, _cost) in totals.items():
+        if product_id not in category_of:
             continue
-        cat_name = "Sin Categoria"
-        if product.category_id:
-            cat = db.query(Category).filter(Category.id == product.category_id).first()
-            if cat:
-                cat_name = cat.name
-
-        if cat_name not in cat_data:
-            cat_data[cat_name] = {"category": cat_name, "units_sold": 0, "revenue": 0.0, "products_count": set()}
-
-        cat_data[cat_name]["units_sold"] += item.quantity * item.pack_units
-        cat_data[cat_name]["revenue"] += item.line_total
-        cat_data[cat_name]["products_count"].add(item.product_id)
-
-    result = []
-    for c in cat_data.values():
-        result.append({
-            "category": c["category"],
-            "units_sold": round(c["units_sold"], 2),
-            "revenue": round(c["revenue"], 2),
-            "products_count": len(c["products_count"]),
-        })
-    result.sort(key=lambda x: x["revenue"], reverse=True)
-    return result
+        name = category_of[product_id] or "Sin Categoria"
+        c = categories.setdefault(name, [0.0, 0.0, 0])
+        c[0] += units
+        c[1] += rev
+        c[2] += 1
+
+    return [
+        {
+            "category": name,
+            "units_sold": round(units_sold, 2),
+            "revenue": round(rev, 2),
+            "products_count": products_count,
+        }
+        for name, (units_sold, rev, products_count) in sorted(
+            categories.items(), key=lambda kv: kv[1][1], reverse=True
+        )
+    ]
 
 
 @router.get("/cashier-performance")
@@ -267,163 +307,215 @@ def cashier_performance(
     db: Session = Depends(get_db),
     _user: User = Depends(require_role("admin", "manager")),
 ):
-    """Sales per cashier: total, transactions, avg ticket, void count."""
+    """Sales per cashier: total, transactions, avg ticket, void count, units,
+    and throughput (transactions per active hour).
+
+    Merged from per-day partials (one aggregate query for the days not
+    cached); names are looked up once at the end. Active hours are the
+    store-local clock hours in which the cashier completed at least one
+    sale — the closest thing to time on shift the data records.
+    """
     start_dt, end_dt = _parse_date_range(start, end, default_days=30)
 
-    sales = (
-        db.query(Sale)
-        .filter(
-            Sale.store_id == settings.store_id,
-            Sale.created_at >= start_dt,
-            Sale.created_at < end_dt,
-        )
-        .all()
-    )
-
-    user_data: dict[str, dict] = {}
-    for s in sales:
-        uid = s.user_id
-        if uid not in user_data:
-            user = db.query(User).filter(User.id == uid).first()
-            user_data[uid] = {
-                "user_id": uid,
-                "full_name": user.full_name if user else "Desconocido",
-                "total_sales": 0.0,
-                "transactions": 0,
-                "voided": 0,
-                "items_sold": 0,
-            }
-        if s.status == "completed":
-            user_data[uid]["total_sales"] += s.total
-            user_data[uid]["transactions"] += 1
-            user_data[uid]["items_sold"] += sum(i.quantity * i.pack_units for i in s.items)
-        elif s.status == "voided":
-            user_data[uid]["voided"] += 1
+    user_data: dict[str, list] = {}
+    partials = report_cache.partials(db, "cashier", start_dt, end_dt, local_today(), _cashier_by_day)
+    for partial in partials.values():
+        for uid, values in (partial or {}).items():
+            u = user_data.setdefault(uid, [0.0, 0, 0, 0.0, 0])
+            for i, value in enumerate(values):
+                u[i] += value
+    names = dict(db.query(User.id, User.full_name).filter(User.id.in_(user_data)).all()) if user_data else {}
 
     result = []
-    for u in user_data.values():
-        avg_ticket = round(u["total_sales"] / u["transactions"], 2) if u["transactions"] else 0.0
+    for uid, (total_sales, transactions, voided, items_sold, active_hours) in user_data.items():
+        avg_ticket = round(total_sales / transactions, 2) if transactions else 0.0
         result.append({
-            "user_id": u["user_id"],
-            "full_name": u["full_name"],
-            "total_sales": round(u["total_sales"], 2),
-            "transactions": u["transactions"],
+            "user_id": uid,
+            "full_name": names.get(uid, "Desconocido"),
+            "total_sales": round(total_sales, 2),
+            "transactions": transactions,
             "avg_ticket": avg_ticket,
-            "voided": u["voided"],
-            "items_sold": round(u["items_sold"], 2),
+            "voided": voided,
+            "items_sold": round(items_sold, 2),
+            "active_hours": active_hours,
+            "transactions_per_hour": round(transactions / active_hours, 2) if active_hours else 0.0,
         })
     result.sort(key=lambda x: x["total_sales"], reverse=True)
     return result
 
 
+def _cashier_by_day(db: Session, start_dt: datetime, end_dt: datetime) -> dict[date, dict]:
+    """{user_id: [total, transactions, voided, units, active_hours]} per
+    store-local day — one GROUP BY over sales, with units from a per-sale
+    subquery over the same range (joining items directly would repeat each
+    sale once per line)."""
+    start_utc, end_utc = utc_bounds(start_dt.date(), end_dt.date())
+    in_range = (
+        Sale.store_id == settings.store_id,
+        Sale.created_at >= start_utc,
+        Sale.created_at < end_utc,
+    )
+    units = (
+        select(SaleItem.sale_id, func.sum(SaleItem.quantity * SaleItem.pack_units).label("units"))
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .where(*in_range, Sale.status == "completed")
+        .group_by(SaleItem.sale_id)
+        .subquery()
+    )
+    completed = Sale.status == "completed"
+    day = bucket(db, Sale.created_at, "day", start_utc, end_utc)
+    hour = bucket(db, Sale.created_at, "hour", start_utc, end_utc)
+    rows = db.execute(
+        select(
+            day,
+            Sale.user_id,
+            func.coalesce(func.sum(case((completed, Sale.total))), 0.0),
+            func.count(case((completed, 1))),
+            func.count(case((Sale.status == "voided", 1))),
+            func.coalesce(func.sum(units.c.units), 0.0),
+            func.count(func.distinct(case((completed, hour)))),
+        )
+        .outerjoin(units, units.c.sale_id == Sale.id)
+        .where(*in_range)
+        .group_by(day, Sale.user_id)
+    )
+    days: dict[date, dict] = {}
+    for d, uid, total, transactions, voided, items, active_hours in rows:
+        days.setdefault(bucket_key(d, "day"), {})[uid] = [total, transactions, voided, items, active_hours]
+    return days
+
+
 @router.get("/inventory")
 def inventory_report(
+    limit: int = Query(50, ge=0, le=500, description="Items per list"),
+    sort: str = Query("stock", description="stock, name, min_stock, reorder_qty, cost or price"),
+    order: str = Query("asc", description="asc or desc"),
     db: Session = Depends(get_db),
     _user: User = Depends(require_role("admin", "manager")),
 ):
-    """Inventory overview: stock value, below-minimum, reorder suggestions."""
-    products = db.query(Product).filter(Product.is_active == True).all()
-
-    total_stock_value = 0.0
-    total_retail_value = 0.0
-    below_minimum = []
-    out_of_stock = []
-
-    for p in products:
-        cost_value = (p.cost or 0.0) * p.stock
-        retail_value = p.price * p.stock
-        total_stock_value += cost_value
-        total_retail_value += retail_value
-
-        if p.stock <= 0:
-            out_of_stock.append({
-                "product_id": p.id,
-                "name": p.name,
-                "barcode": p.barcode,
-                "stock": p.stock,
-                "min_stock": p.min_stock,
-                "cost": p.cost or 0.0,
-                "price": p.price,
-                "reorder_qty": max(p.min_stock * 3 - p.stock, p.min_stock),
-            })
-        elif p.stock <= p.min_stock:
-            below_minimum.append({
-                "product_id": p.id,
-                "name": p.name,
-                "barcode": p.barcode,
-                "stock": p.stock,
-                "min_stock": p.min_stock,
-                "cost": p.cost or 0.0,
-                "price": p.price,
-                "reorder_qty": max(p.min_stock * 3 - p.stock, p.min_stock),
-            })
-
-    # Sort by urgency (lowest stock first)
-    out_of_stock.sort(key=lambda x: x["stock"])
-    below_minimum.sort(key=lambda x: x["stock"])
+    """Inventory overview: stock value, below-minimum, reorder suggestions.
+
+    Totals and lists come from the in-process inventory index (maintained by
+    the write paths), so nothing scans the catalog. Each list returns its
+    first ``limit`` items; page further with /inventory/items.
+    """
+    summary = inventory.summary(db)
+    lists = {}
+    for status in (OUT_OF_STOCK, BELOW_MINIMUM):
+        _total, rows = _inventory_page(db, status, sort, order, 0, limit)
+        lists[status] = [row.to_dict() for row in rows]
+    return {**summary, **lists}
+
+
+@router.get("/inventory/items")
+def inventory_items(
+    status: str = Query(OUT_OF_STOCK, description="out_of_stock or below_minimum"),
+    sort: str = Query("stock", description="stock, name, min_stock, reorder_qty, cost or price"),
+    order: str = Query("asc", description="asc or desc"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    _user: User = Depends(require_role("admin", "manager")),
+):
+    """One page of the out-of-stock or below-minimum list."""
+    total, rows = _inventory_page(db, status, sort, order, offset, limit)
+    return {"total": total, "offset": offset, "items": [row.to_dict() for row in rows]}
 
-    return {
-        "total_products": len(products),
-        "total_stock_value": round(total_stock_value, 2),
-        "total_retail_value": round(total_retail_value, 2),
-        "potential_profit": round(total_retail_value - total_stock_value, 2),
-        "out_of_stock_count": len(out_of_stock),
-        "below_minimum_count": len(below_minimum),
-        "out_of_stock": out_of_stock,
-        "below_minimum": below_minimum,
-    }
+
+def _inventory_page(db: Session, status: str, sort: str, order: str, offset: int, limit: int):
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    try:
+        return inventory.items(db, status, sort, order == "desc", offset, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/export/sales-csv")
 def export_sales_csv(
     start: str | None = Query(None, description="YYYY-MM-DD"),
     end: str | None = Query(None, description="YYYY-MM-DD"),
+    gzip: bool = Query(False, description="gzip-compress the download"),
     db: Session = Depends(get_db),
     _user: User = Depends(require_role("admin", "manager")),
 ):
-    """Export sales as CSV text."""
-    from fastapi.responses import Response
-    import csv
-    import io
-
-    start_dt, end_dt = _parse_date_range(start, end, default_days=30)
-
-    sales = (
-        db.query(Sale)
-        .filter(
-            Sale.store_id == settings.store_id,
-            Sale.status == "completed",
-            Sale.created_at >= start_dt,
-            Sale.created_at < end_dt,
+    """Export sales as CSV, one row per item, streamed from a single join."""
+    first_day, end_day = _parse_date_range(start, end, default_days=30)
+    start_dt, end_dt = utc_bounds(first_day.date(), end_day.date())
+
+    def query(session: Session):
+        rows = session.execute(
+            select(
+                Sale.created_at, Sale.id, SaleItem.product_name, SaleItem.quantity, SaleItem.pack_units,
+                SaleItem.unit_price, SaleItem.discount_percent, SaleItem.line_total,
+                Sale.payment_method, Sale.total,
+            )
+            .join(SaleItem, SaleItem.sale_id == Sale.id)
+            .where(*_completed_in_range(start_dt, end_dt))
+            .order_by(Sale.created_at, Sale.id)
+            .execution_options(yield_per=YIELD_PER)
         )
-        .order_by(Sale.created_at)
-        .all()
+        for created_at, sale_id, name, qty, pack_units, unit_price, discount, line_total, method, total in rows:
+            local = to_local(created_at)
+            yield [
+                local.strftime("%Y-%m-%d"),
+                local.strftime("%H:%M:%S"),
+                sale_id[:8].upper(),
+                name,
+                qty * pack_units,
+                unit_price,
+                discount,
+                line_total,
+                method,
+                total,
+            ]
+
+    return csv_response(
+        f"ventas_{first_day.strftime('%Y%m%d')}_{(end_day - timedelta(days=1)).strftime('%Y%m%d')}.csv",
+        ["Fecha", "Hora", "ID Venta", "Producto", "Cantidad", "Precio Unitario",
+         "Descuento %", "Total Linea", "Metodo Pago", "Total Venta"],
+        stream_rows(db.get_bind(), query),
+        compress=gzip,
     )
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        "Fecha", "Hora", "ID Venta", "Producto", "Cantidad", "Precio Unitario",
-        "Descuento %", "Total Linea", "Metodo Pago", "Total Venta",
-    ])
-
-    for s in sales:
-        for item in s.items:
-            writer.writerow([
-                s.created_at.strftime("%Y-%m-%d"),
-                s.created_at.strftime("%H:%M:%S"),
-                s.id[:8].upper(),
-                item.product_name,
-                item.quantity * item.pack_units,
-                item.unit_price,
-                item.discount_percent,
-                item.line_total,
-                s.payment_method,
-                s.total,
-            ])
-
-    return Response(
-        content=output.getvalue(),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=ventas_{start_dt.strftime('%Y%m%d')}_{(end_dt - timedelta(days=1)).strftime('%Y%m%d')}.csv"},
-    )
+
+@router.post("/export/analytics")
+def export_analytics(
+    format: str | None = Query(None, description="parquet or csv (default: parquet if pyarrow is installed)"),
+    force: bool = Query(False, description="rewrite closed months too"),
+    db: Session = Depends(get_db),
+    _user: User = Depends(require_role("admin")),
+):
+    """Incrementally export sales and sale items, one file per month, for
+    notebooks. Closed months already exported are skipped."""
+    try:
+        result = export_sales_history(db, ANALYTICS_DIR, fmt=format, force=force)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**result, "partitions": load_manifest(ANALYTICS_DIR)["partitions"]}
+
+
+@router.get("/export/analytics")
+def list_analytics_exports(
+    _user: User = Depends(require_role("admin", "manager")),
+):
+    """Exported month partitions and their files."""
+    return load_manifest(ANALYTICS_DIR)
+
+
+@router.get("/export/analytics/{table}/{month}")
+def download_analytics_export(
+    table: str,
+    month: str,
+    _user: User = Depends(require_role("admin", "manager")),
+):
+    """Download one exported partition (table: sales or sale_items; month: YYYY-MM)."""
+    partition = load_manifest(ANALYTICS_DIR)["partitions"].get(month)
+    files = [f for f in (partition or {}).get("files", []) if f.startswith(f"{table}/")]
+    if table not in ("sales", "sale_items") or not files:
+        raise HTTPException(status_code=404, detail="Export not found")
+    path = os.path.join(ANALYTICS_DIR, files[0])
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Export not found")
+    ext = files[0].rsplit(".", 1)[1]
+    return FileResponse(path, filename=f"{table}_{month}.{ext}")
@@ -1,124 +1,304 @@
+import gzip
+import io
 from datetime import datetime, timedelta, timezone
-from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
 from app.config import get_settings
 from app.database import get_db
-from app.models.product import Product, VolumePromo
+from app.models.product import StockMovement
 from app.models.sale import Sale, SaleItem
 from app.models.user import User
-from app.schemas.sale import SaleCreate, SaleResponse, DailySummary, TopProduct, SaleImportPayload
-from app.services.pricing import bundle_total
+from app.schemas.sale import (
+    SaleCreate,
+    SaleItemCreate,
+    SaleResponse,
+    SaleBatchCreate,
+    SaleBatchResponse,
+    SaleBatchResult,
+    SaleQuoteRequest,
+    SaleQuoteLine,
+    SaleQuoteResponse,
+    SaleQuoteCompactRequest,
+    SaleQuoteCompactResponse,
+    DailySummary,
+    TopProduct,
+    SaleImportPayload,
+    SaleImportBatch,
+    SaleImportBatchResponse,
+)
+from app.services.catalog import catalog
+from app.services.inventory import inventory
+from app.services.live import dashboard_feed
+from app.services.stock import SALE, VOID, apply_movements, recipe_draws
+from app.services.report_cache import report_cache
+from app.services.rollup import hourly_rows, record_sales, top_products
+from app.services.timebucket import local_today, utc_bounds
+from app.services.writer import run_write
 from app.services.auth import get_current_user, require_role, require_sync_key
 
 settings = get_settings()
 router = APIRouter(prefix="/api/sales", tags=["sales"])
 
+MAX_BATCH_SALES = 200
+MAX_IMPORT_SALES = 1000  # per /sync-import/batch request
+MAX_IMPORT_BYTES = 16 * 1024 * 1024  # decompressed
+
 
 def local_day_utc_range(date_str: str | None) -> tuple[str, datetime, datetime]:
     """Resolve a YYYY-MM-DD store-local date (default: today) to naive-UTC
     query bounds matching how Sale.created_at is stored."""
-    tz = ZoneInfo(settings.timezone)
-    if date_str:
-        day = datetime.strptime(date_str, "%Y-%m-%d").date()
-    else:
-        day = datetime.now(tz).date()
-    start_local = datetime(day.year, day.month, day.day, tzinfo=tz)
-    start_utc = start_local.astimezone(timezone.utc).replace(tzinfo=None)
-    return day.isoformat(), start_utc, start_utc + timedelta(days=1)
-
-
-@router.post("", response_model=SaleResponse)
-def create_sale(
-    data: SaleCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    if not data.items:
-        raise HTTPException(status_code=400, detail="Sale must have at least one item")
+    day = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else local_today()
+    start_utc, end_utc = utc_bounds(day, day + timedelta(days=1))
+    return day.isoformat(), start_utc, end_utc
 
-    sale = Sale(
-        store_id=settings.store_id,
-        user_id=current_user.id,
-        payment_method=data.payment_method,
-    )
 
-    subtotal = 0.0
+def _price_cart(items: list[SaleItemCreate], entries: dict) -> list[tuple]:
+    """Price cart lines against resolved catalog entries.
 
+    Returns (entry, item, list_price, unit_price, line_total) per line, where
+    list_price is the regular unit price before volume promos and discount.
+    Raises HTTPException 404 for unknown products.
+    """
     # Group items by product_id to calculate total units for volume promos
     product_units: dict[str, float] = {}
-    for item_data in data.items:
+    for item_data in items:
         key = item_data.product_id
         product_units[key] = product_units.get(key, 0) + (item_data.quantity * item_data.pack_units)
 
-    for item_data in data.items:
-        product = db.query(Product).filter(Product.id == item_data.product_id).first()
-        if not product:
+    lines = []
+    for item_data in items:
+        entry = entries.get(item_data.product_id)
+        if not entry:
             raise HTTPException(status_code=404, detail=f"Product {item_data.product_id} not found")
 
-        stock_decrement = int(item_data.quantity * item_data.pack_units)
-
         # Determine unit price — frontend override takes priority (e.g. Varios custom price)
         if item_data.unit_price is not None:
             unit_price = item_data.unit_price
         elif item_data.pack_units > 1:
-            unit_price = product.price * item_data.pack_units
+            unit_price = entry.price * item_data.pack_units
         else:
-            unit_price = product.price
+            unit_price = entry.price
+        list_price = unit_price
 
         # Apply volume promo for single-unit items (bundle pricing) — only when no price override
-        if item_data.unit_price is None and item_data.pack_units == 1 and not product.sell_by_weight:
+        if item_data.unit_price is None and item_data.pack_units == 1 and not entry.sell_by_weight:
             total_qty = int(product_units.get(item_data.product_id, 0))
-            promos = (
-                db.query(VolumePromo)
-                .filter(VolumePromo.product_id == product.id)
-                .order_by(VolumePromo.min_units.desc())
-                .all()
-            )
-            if promos and total_qty > 0:
-                unit_price = bundle_total(total_qty, product.price, promos) / total_qty
+            if entry.promos and total_qty > 0:
+                unit_price = entry.bundle.unit_price(total_qty)
 
         discount = item_data.discount_percent / 100.0
         line_total = round(unit_price * item_data.quantity * (1 - discount), 2)
+        lines.append((entry, item_data, list_price, unit_price, line_total))
+    return lines
+
+
+def _cart_totals(subtotal: float) -> tuple[float, float, float]:
+    """(subtotal, tax, total), rounded as receipts show them. Tax comes from
+    the unrounded sum of the lines, as checkout has always computed it."""
+    tax = round(subtotal * settings.tax_rate, 2)
+    subtotal = round(subtotal, 2)
+    return subtotal, tax, round(subtotal + tax, 2)
 
+
+def _build_sale(data: SaleCreate, entries: dict, user_id: str) -> tuple[Sale, list]:
+    """Price a cart against resolved catalog entries. Returns the unsaved Sale
+    and the stock movements it draws; raises HTTPException if it can't be sold."""
+    if not data.items:
+        raise HTTPException(status_code=400, detail="Sale must have at least one item")
+
+    sale = Sale(
+        store_id=settings.store_id,
+        user_id=user_id,
+        payment_method=data.payment_method,
+    )
+
+    subtotal = 0.0
+    stock_moves = []
+    for entry, item_data, _list_price, unit_price, line_total in _price_cart(data.items, entries):
         sale_item = SaleItem(
-            product_id=product.id,
-            product_name=product.name,
+            product_id=entry.id,
+            product_name=entry.name,
             quantity=item_data.quantity,
             unit_price=unit_price,
             discount_percent=item_data.discount_percent,
             line_total=line_total,
             pack_units=item_data.pack_units,
+            unit_cost=entry.cost,
         )
         sale.items.append(sale_item)
         subtotal += line_total
 
-        # Decrement stock. Recipe products (made-to-order) consume their components'
-        # stock instead of their own; simple products decrement themselves.
-        if product.components:
-            units_sold = item_data.quantity * item_data.pack_units
-            for comp in product.components:
-                if not comp.component.sell_by_weight:
-                    comp.component.stock -= int(comp.quantity * units_sold)
-        elif not product.sell_by_weight:
-            product.stock -= stock_decrement
-
-    sale.subtotal = round(subtotal, 2)
-    sale.tax = round(subtotal * settings.tax_rate, 2)
-    sale.total = round(sale.subtotal + sale.tax, 2)
+        # Recipe products (made-to-order) consume their components' stock
+        # instead of their own; simple products decrement themselves.
+        stock_moves.extend(recipe_draws(entry, item_data.quantity * item_data.pack_units))
+
+    sale.subtotal, sale.tax, sale.total = _cart_totals(subtotal)
     sale.cash_received = data.cash_received
     sale.change_given = round(max(data.cash_received - sale.total, 0), 2)
     sale.status = "completed"
+    return sale, stock_moves
+
+
+@router.post("/quote", response_model=SaleQuoteResponse)
+def quote_cart(
+    data: SaleQuoteRequest,
+    db: Session = Depends(get_db),
+    _user: User = Depends(get_current_user),
+):
+    """Price a cart exactly as checkout would, without recording anything.
+
+    Served from the catalog cache and compiled bundle tables, so the POS can
+    re-quote on every scan instead of re-implementing pricing client-side.
+    """
+    entries = catalog.get_many(db, (item.product_id for item in data.items))
+    lines = []
+    subtotal = savings = 0.0
+    for entry, item_data, list_price, unit_price, line_total in _price_cart(data.items, entries):
+        saved = round(list_price * item_data.quantity - line_total, 2)
+        lines.append(SaleQuoteLine(
+            product_id=entry.id,
+            product_name=entry.name,
+            quantity=item_data.quantity,
+            pack_units=item_data.pack_units,
+            sell_by_weight=entry.sell_by_weight,
+            list_price=list_price,
+            unit_price=round(unit_price, 4),
+            discount_percent=item_data.discount_percent,
+            line_total=line_total,
+            savings=saved,
+        ))
+        subtotal += line_total
+        savings += saved
+    subtotal, tax, total = _cart_totals(subtotal)
+    return SaleQuoteResponse(lines=lines, subtotal=subtotal, tax=tax, total=total, savings=round(savings, 2))
+
+
+@router.post("/quote/compact", response_model=SaleQuoteCompactResponse)
+def quote_cart_compact(
+    data: SaleQuoteCompactRequest,
+    db: Session = Depends(get_db),
+    _user: User = Depends(get_current_user),
+):
+    """Compact quote for debounced, incremental re-pricing while scanning.
+
+    Items are positional arrays and the response carries only
+    [index, unit_price, line_total] per line. When `changed` lists the
+    product ids touched since the last quote, only their lines are returned
+    (a scan can only reprice lines of the same product); totals always
+    cover the whole cart.
+    """
+    entries = catalog.get_many(db, (item.product_id for item in data.items))
+    changed = set(data.changed) if data.changed is not None else None
+    lines = []
+    subtotal = 0.0
+    for index, (entry, _item, _list_price, unit_price, line_total) in enumerate(_price_cart(data.items, entries)):
+        subtotal += line_total
+        if changed is None or entry.id in changed:
+            lines.append((index, round(unit_price, 4), line_total))
+    subtotal, tax, total = _cart_totals(subtotal)
+    return SaleQuoteCompactResponse(lines=lines, subtotal=subtotal, tax=tax, total=total)
 
-    db.add(sale)
-    db.commit()
-    db.refresh(sale)
+
+@router.post("", response_model=SaleResponse)
+def create_sale(
+    data: SaleCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Every product, promo tier and recipe is resolved from the catalog cache up front
+    entries = catalog.get_many(db, (item.product_id for item in data.items))
+    sale_id = str(data.id) if data.id else None
+    moved: set[str] = set()
+
+    def write(session: Session) -> Sale:
+        sale, stock_moves = _build_sale(data, entries, current_user.id)
+        if sale_id:
+            sale.id = sale_id
+        session.add(sale)
+        session.flush()
+        moved.update(apply_movements(session, SALE, stock_moves, ref_id=sale.id, user_id=current_user.id))
+        record_sales(session, [sale])
+        return sale
+
+    try:
+        sale = run_write(db, write)
+    except IntegrityError:
+        # Unique-key fast path: a retried id collides on the primary key, so
+        # return the stored sale rather than reading before every insert
+        existing = db.get(Sale, sale_id) if sale_id else None
+        if existing is None:
+            raise
+        return existing
+    inventory.invalidate(moved)
+    dashboard_feed.publish_sales(db, [sale])
     return sale
 
 
+@router.post("/batch", response_model=SaleBatchResponse)
+def create_sales_batch(
+    data: SaleBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Submit queued offline sales in one request and one transaction.
+
+    Each sale carries its client-generated id and original timestamp. Ids
+    that already exist (or repeat within the batch) come back as "duplicate";
+    sales that can't be priced come back as "rejected" without affecting the
+    rest of the batch.
+    """
+    if len(data.sales) > MAX_BATCH_SALES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SALES} sales per batch")
+
+    ids = [str(s.id) for s in data.sales]
+    entries = catalog.get_many(db, (item.product_id for s in data.sales for item in s.items))
+    moved: set[str] = set()
+
+    def write(session: Session) -> tuple[list[SaleBatchResult], list[Sale]]:
+        existing = {sid for (sid,) in session.query(Sale.id).filter(Sale.id.in_(ids)).all()} if ids else set()
+        results: list[SaleBatchResult] = []
+        accepted: list[tuple[Sale, list]] = []
+        for payload, sale_id in zip(data.sales, ids):
+            if sale_id in existing:
+                results.append(SaleBatchResult(id=sale_id, status="duplicate"))
+                continue
+            try:
+                sale, stock_moves = _build_sale(payload, entries, current_user.id)
+            except HTTPException as e:
+                results.append(SaleBatchResult(id=sale_id, status="rejected", detail=str(e.detail)))
+                continue
+            sale.id = sale_id
+            if payload.created_at:
+                created = payload.created_at
+                if created.tzinfo:
+                    created = created.astimezone(timezone.utc).replace(tzinfo=None)
+                sale.created_at = created
+            existing.add(sale_id)
+            accepted.append((sale, stock_moves))
+            results.append(SaleBatchResult(id=sale_id, status="created", total=sale.total))
+
+        session.add_all(sale for sale, _ in accepted)
+        session.flush()
+        for sale, stock_moves in accepted:
+            moved.update(apply_movements(session, SALE, stock_moves, ref_id=sale.id, user_id=current_user.id))
+        record_sales(session, [sale for sale, _ in accepted])
+        return results, [sale for sale, _ in accepted]
+
+    results, sales = run_write(db, write)
+    inventory.invalidate(moved)
+    # Offline sales can be backdated into days the report cache has closed
+    report_cache.invalidate_days(sale.created_at for sale in sales)
+    dashboard_feed.publish_sales(db, sales)
+    return SaleBatchResponse(results=results)
+
+
 @router.get("", response_model=list[SaleResponse])
 def list_sales(
     date: str | None = Query(None, description="YYYY-MM-DD"),
@@ -147,30 +327,49 @@ def get_sale(sale_id: str, db: Session = Depends(get_db), _user: User = Depends(
 def void_sale(
     sale_id: str,
     db: Session = Depends(get_db),
-    _manager: User = Depends(require_role("admin", "manager")),
+    manager: User = Depends(require_role("admin", "manager")),
 ):
-    sale = db.query(Sale).filter(Sale.id == sale_id).first()
-    if not sale:
-        raise HTTPException(status_code=404, detail="Sale not found")
-    if sale.status == "voided":
-        raise HTTPException(status_code=400, detail="Sale already voided")
-
-    # Restore stock — mirror the sale-time logic: recipes restore components, not self.
-    for item in sale.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
-            continue
-        if product.components:
-            units = item.quantity * item.pack_units
-            for comp in product.components:
-                if not comp.component.sell_by_weight:
-                    comp.component.stock += int(comp.quantity * units)
-        elif not product.sell_by_weight:
-            product.stock += int(item.quantity * item.pack_units)
-
-    sale.status = "voided"
-    db.commit()
-    db.refresh(sale)
+    moved: set[str] = set()
+
+    def write(session: Session) -> tuple[Sale, bool]:
+        sale = session.query(Sale).options(selectinload(Sale.items)).filter(Sale.id == sale_id).first()
+        if not sale:
+            raise HTTPException(status_code=404, detail="Sale not found")
+        if sale.status == "voided":
+            raise HTTPException(status_code=400, detail="Sale already voided")
+
+        # Restore stock by reversing the sale's own ledger rows, so recipe edits
+        # since the sale don't matter. Sales from before the ledger existed fall
+        # back to the current recipes.
+        sold = (
+            session.query(StockMovement.product_id, StockMovement.via_product_id, func.sum(StockMovement.quantity))
+            .filter(StockMovement.ref_id == sale.id, StockMovement.kind == SALE)
+            .group_by(StockMovement.product_id, StockMovement.via_product_id)
+            .all()
+        )
+        entries = catalog.get_many(session, (item.product_id for item in sale.items))
+        if sold:
+            restore = [(pid, -qty, via) for pid, via, qty in sold]
+        else:
+            restore = [
+                (pid, -qty, via)
+                for item in sale.items
+                if item.product_id in entries
+                for pid, qty, via in recipe_draws(entries[item.product_id], item.quantity * item.pack_units)
+            ]
+        moved.update(apply_movements(session, VOID, restore, ref_id=sale.id, user_id=manager.id))
+
+        was_completed = sale.status == "completed"
+        if was_completed:
+            record_sales(session, [sale], sign=-1)
+        sale.status = "voided"
+        return sale, was_completed
+
+    sale, was_completed = run_write(db, write)
+    inventory.invalidate(moved)
+    report_cache.invalidate_days([sale.created_at])
+    if was_completed:
+        dashboard_feed.publish_void(db, sale)
     return sale
 
 
@@ -181,50 +380,30 @@ def daily_summary(
     _user: User = Depends(get_current_user),
 ):
     day_str, start, end = local_day_utc_range(date)
+    local_start = datetime.strptime(day_str, "%Y-%m-%d")
 
-    sales = (
-        db.query(Sale)
-        .filter(Sale.store_id == settings.store_id, Sale.status == "completed")
-        .filter(Sale.created_at >= start, Sale.created_at < end)
-        .all()
-    )
-
-    total_sales = sum(s.total for s in sales)
-    count = len(sales)
+    rows = hourly_rows(db, local_start, local_start + timedelta(days=1))
+    total_sales = sum(r.total for r in rows)
+    count = sum(r.sale_count for r in rows)
     avg_ticket = round(total_sales / count, 2) if count else 0.0
 
-    # Top products by quantity
-    product_totals: dict[str, dict] = {}
-    for sale in sales:
-        for item in sale.items:
-            key = item.product_name
-            if key not in product_totals:
-                product_totals[key] = {"product_name": key, "quantity_sold": 0, "revenue": 0.0}
-            product_totals[key]["quantity_sold"] += item.quantity
-            product_totals[key]["revenue"] += item.line_total
-
-    top = sorted(product_totals.values(), key=lambda x: x["quantity_sold"], reverse=True)[:10]
-
     return DailySummary(
         date=day_str,
         total_sales=round(total_sales, 2),
         transaction_count=count,
         avg_ticket=avg_ticket,
-        top_products=[TopProduct(**p) for p in top],
+        top_products=[
+            TopProduct(product_name=name, quantity_sold=qty, revenue=round(revenue, 2))
+            for name, qty, revenue in top_products(db, start, end, order_by="quantity", units=False)
+        ],
     )
 
 
-@router.post("/sync-import", status_code=201)
-def sync_import_sale(
-    data: SaleImportPayload,
-    db: Session = Depends(get_db),
-    _store=Depends(require_sync_key),
-):
-    """Idempotent sale import from local store instances. Authenticated by store API key."""
-    existing = db.query(Sale).filter(Sale.id == data.id).first()
-    if existing:
-        raise HTTPException(status_code=409, detail="Sale already exists")
-
+def _imported_sale(data: SaleImportPayload, entries: dict) -> Sale:
+    """Sale (with items) for a payload pushed by a local instance."""
+    created = data.created_at
+    if created.tzinfo:
+        created = created.astimezone(timezone.utc).replace(tzinfo=None)
     sale = Sale(
         id=data.id,
         store_id=data.store_id,
@@ -236,10 +415,9 @@ def sync_import_sale(
         cash_received=data.cash_received,
         change_given=data.change_given,
         status=data.status,
-        created_at=data.created_at,
+        created_at=created,
         synced_at=datetime.now(timezone.utc),
     )
-
     for item_data in data.items:
         sale.items.append(SaleItem(
             product_id=item_data.product_id,
@@ -249,8 +427,101 @@ def sync_import_sale(
             discount_percent=item_data.discount_percent,
             line_total=item_data.line_total,
             pack_units=item_data.pack_units,
+            # Instances from before cost snapshots don't send unit_cost: use the current cost
+            unit_cost=(
+                item_data.unit_cost if item_data.unit_cost is not None
+                else entries[item_data.product_id].cost if item_data.product_id in entries
+                else None
+            ),
         ))
+    return sale
+
 
-    db.add(sale)
-    db.commit()
+@router.post("/sync-import", status_code=201)
+def sync_import_sale(
+    data: SaleImportPayload,
+    db: Session = Depends(get_db),
+    _store=Depends(require_sync_key),
+):
+    """Idempotent sale import from local store instances. Authenticated by store API key."""
+    entries = catalog.get_many(db, (item.product_id for item in data.items if item.unit_cost is None))
+
+    def write(session: Session) -> Sale:
+        existing = session.query(Sale.id).filter(Sale.id == data.id).first()
+        if existing:
+            raise HTTPException(status_code=409, detail="Sale already exists")
+        sale = _imported_sale(data, entries)
+        session.add(sale)
+        session.flush()
+        if sale.status == "completed":
+            record_sales(session, [sale])
+        return sale
+
+    sale = run_write(db, write)
+    report_cache.invalidate_days([sale.created_at])
+    dashboard_feed.publish_sales(db, [sale])
     return {"ok": True, "id": sale.id}
+
+
+async def _import_batch_body(request: Request) -> SaleImportBatch:
+    """Parse a (possibly gzip-encoded) SaleImportBatch body, bounded in size."""
+    body = await request.body()
+    if request.headers.get("content-encoding", "").lower() == "gzip":
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(body)) as f:
+                body = f.read(MAX_IMPORT_BYTES + 1)
+        except (OSError, EOFError):
+            raise HTTPException(status_code=400, detail="Invalid gzip body")
+    if len(body) > MAX_IMPORT_BYTES:
+        raise HTTPException(status_code=413, detail=f"Batch larger than {MAX_IMPORT_BYTES} bytes")
+    try:
+        batch = SaleImportBatch.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False, include_context=False))
+    if len(batch.sales) > MAX_IMPORT_SALES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_IMPORT_SALES} sales per batch")
+    return batch
+
+
+@router.post(
+    "/sync-import/batch",
+    response_model=SaleImportBatchResponse,
+    openapi_extra={"requestBody": {"content": {"application/json": {"schema": SaleImportBatch.model_json_schema()}}}},
+)
+async def sync_import_sales_batch(
+    request: Request,
+    db: Session = Depends(get_db),
+    _store=Depends(require_sync_key),
+):
+    """Import many sales pushed by a local instance in one transaction.
+
+    Body: ``{"sales": [SaleImportPayload, ...]}``, optionally sent with
+    ``Content-Encoding: gzip``. Ids the server already has (or that repeat
+    within the batch) are skipped and counted as duplicates, so a chunk can
+    be resent safely after a lost response.
+    """
+    batch = await _import_batch_body(request)
+    return await run_in_threadpool(_import_batch, batch, db)
+
+
+def _import_batch(batch: SaleImportBatch, db: Session) -> SaleImportBatchResponse:
+    ids = list({s.id: None for s in batch.sales})
+    entries = catalog.get_many(db, (item.product_id for s in batch.sales for item in s.items if item.unit_cost is None))
+
+    def write(session: Session) -> list[Sale]:
+        seen = {sid for (sid,) in session.query(Sale.id).filter(Sale.id.in_(ids)).all()} if ids else set()
+        sales = []
+        for data in batch.sales:
+            if data.id in seen:
+                continue
+            seen.add(data.id)
+            sales.append(_imported_sale(data, entries))
+        session.add_all(sales)
+        session.flush()
+        record_sales(session, [sale for sale in sales if sale.status == "completed"])
+        return sales
+
+    sales = run_write(db, write)
+    report_cache.invalidate_days(sale.created_at for sale in sales)
+    dashboard_feed.publish_sales(db, sales)
+    return SaleImportBatchResponse(created=len(sales), duplicate=len(batch.sales) - len(sales))
@@ -9,6 +9,7 @@ from app.models.supplier import Supplier
 from app.models.product import Product
 from app.schemas.supplier import SupplierCreate, SupplierUpdate, SupplierResponse
 from app.services.auth import get_current_user, require_role
+from app.services.catalog import catalog
 from app.models.user import User
 
 router = APIRouter(prefix="/api/suppliers", tags=["suppliers"])
@@ -85,6 +86,7 @@ def delete_supplier(
     )
     db.delete(supplier)
     db.commit()
+    catalog.invalidate()
     return {"ok": True}
 
 
@@ -1,18 +1,27 @@
+import base64
+import json
 import secrets
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, selectinload
 
 from app.database import get_db
 from app.models.product import Product, Category
 from app.models.store import Store
+from app.models.sync import CatalogTombstone
 from app.models.user import User
 from app.services.auth import require_role, require_sync_key
 from app.services.sync import get_sync_status, run_sync
 
 router = APIRouter(prefix="/api/sync", tags=["sync"])
 
+# The change feed holds back rows changed this recently: a transaction can
+# commit a row stamped slightly before a page that was already read, and the
+# cursor must not get ahead of it
+FEED_SETTLE_SECONDS = 5.0
+
 
 class RegisterStoreRequest(BaseModel):
     name: str
@@ -89,45 +98,135 @@ def list_stores(
     ]
 
 
+Position = tuple[datetime, str]
+
+
+def _encode_cursor(products: Position | None, categories: Position | None, deleted: Position | None) -> str:
+    state = {
+        key: [pos[0].isoformat(), pos[1]] if pos else None
+        for key, pos in (("p", products), ("c", categories), ("d", deleted))
+    }
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode()
+
+
+def _decode_cursor(token: str) -> tuple[Position | None, Position | None, Position | None]:
+    """(products, categories, tombstones) positions from a page token.
+    Raises ValueError. Tokens from before tombstones replay them from the
+    start, which is harmless."""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return tuple(
+            (datetime.fromisoformat(state[key][0]), str(state[key][1])) if state.get(key) else None
+            for key in ("p", "c", "d")
+        )
+    except (TypeError, KeyError, IndexError, AttributeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _product_dict(p: Product) -> dict:
+    return {
+        "id": p.id,
+        "barcode": p.barcode,
+        "name": p.name,
+        "description": p.description,
+        "brand": p.brand,
+        "category_id": p.category_id,
+        "supplier_id": p.supplier_id,
+        "price": p.price,
+        "cost": p.cost,
+        "stock": p.stock,
+        "min_stock": p.min_stock,
+        "image_url": p.image_url,
+        "is_active": p.is_active,
+        "is_favorite": p.is_favorite,
+        "sell_by_weight": p.sell_by_weight,
+        "updated_at": p.updated_at.isoformat(),
+        # Child rows, complete, as compact arrays (the store diffs them by natural key)
+        "barcodes": [[b.barcode, b.units, b.pack_price] for b in p.barcodes],
+        "promos": [[v.min_units, v.promo_price] for v in p.volume_promos],
+        "components": [[c.component_id, c.quantity] for c in p.components],
+    }
+
+
 @router.get("/products")
 def sync_pull_products(
-    updated_since: str | None = Query(None),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    updated_since: str | None = Query(None, description="Start point when there is no cursor (legacy)"),
+    limit: int = Query(1000, ge=1, le=5000),
     db: Session = Depends(get_db),
     _store: Store = Depends(require_sync_key),
 ):
-    """Return products (and categories) updated since a given timestamp. Used by local store servers."""
-    categories = db.query(Category).all()
-    q = db.query(Product).filter(Product.is_active == True)
-    if updated_since:
+    """Catalog change feed for local store servers.
+
+    Products come in (updated_at, id) order, ``limit`` per page, inactive
+    ones included, each with its full set of pack barcodes, volume promos
+    and recipe components (editing those bumps the product); categories
+    changed since the cursor come whole on the page that reaches them (they
+    are few). ``deleted`` lists catalog rows deleted since the cursor
+    (tombstones, in (deleted_at, id) order, also ``limit`` per page), to be
+    deleted by natural key. Pass ``next_cursor`` back to get the next page;
+    ``has_more`` says whether to ask now. Keep the last ``next_cursor`` to
+    resume from there on the next sync: rows sharing a timestamp are never
+    skipped or re-sent, and rows changed in the last FEED_SETTLE_SECONDS
+    wait for the next sync. Without a cursor the feed starts at
+    ``updated_since`` (or at the beginning).
+    """
+    if cursor:
         try:
-            since_dt = datetime.fromisoformat(updated_since.replace("Z", "+00:00"))
-            q = q.filter(Product.updated_at >= since_dt)
+            after, categories_after, deleted_after = _decode_cursor(cursor)
         except ValueError:
-            pass
-    products = q.limit(10000).all()
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    else:
+        after = categories_after = deleted_after = None
+        if updated_since:
+            try:
+                since = datetime.fromisoformat(updated_since.replace("Z", "+00:00"))
+                if since.tzinfo:
+                    since = since.astimezone(timezone.utc).replace(tzinfo=None)
+                after = categories_after = deleted_after = (since, "")
+            except ValueError:
+                pass
+
+    settled = datetime.utcnow() - timedelta(seconds=FEED_SETTLE_SECONDS)
+    cq = db.query(Category).filter(Category.updated_at <= settled)
+    if categories_after:
+        cq = cq.filter(tuple_(Category.updated_at, Category.id) > categories_after)
+    categories = cq.order_by(Category.updated_at, Category.id).all()
+    if categories:
+        categories_after = (categories[-1].updated_at, categories[-1].id)
+
+    # Inactive products too: a deactivation has to reach the stores
+    q = (
+        db.query(Product)
+        .options(selectinload(Product.barcodes), selectinload(Product.volume_promos), selectinload(Product.components))
+        .filter(Product.updated_at <= settled)
+    )
+    if after:
+        q = q.filter(tuple_(Product.updated_at, Product.id) > after)
+    products = q.order_by(Product.updated_at, Product.id).limit(limit + 1).all()
+    has_more = len(products) > limit
+    products = products[:limit]
+    if products:
+        after = (products[-1].updated_at, products[-1].id)
+
+    tq = db.query(CatalogTombstone).filter(CatalogTombstone.deleted_at <= settled)
+    if deleted_after:
+        tq = tq.filter(tuple_(CatalogTombstone.deleted_at, CatalogTombstone.id) > deleted_after)
+    deleted = tq.order_by(CatalogTombstone.deleted_at, CatalogTombstone.id).limit(limit + 1).all()
+    has_more = has_more or len(deleted) > limit
+    deleted = deleted[:limit]
+    if deleted:
+        deleted_after = (deleted[-1].deleted_at, deleted[-1].id)
+
     return {
         "categories": [{"id": c.id, "name": c.name, "color": c.color} for c in categories],
-        "products": [
-            {
-                "id": p.id,
-                "barcode": p.barcode,
-                "name": p.name,
-                "description": p.description,
-                "brand": p.brand,
-                "category_id": p.category_id,
-                "supplier_id": p.supplier_id,
-                "price": p.price,
-                "cost": p.cost,
-                "stock": p.stock,
-                "min_stock": p.min_stock,
-                "image_url": p.image_url,
-                "is_active": p.is_active,
-                "is_favorite": p.is_favorite,
-                "sell_by_weight": p.sell_by_weight,
-                "updated_at": p.updated_at.isoformat(),
-            }
-            for p in products
+        "products": [_product_dict(p) for p in products],
+        "deleted": [
+            {"entity": t.entity, "product_id": t.product_id, "key": t.key, "deleted_at": t.deleted_at.isoformat()}
+            for t in deleted
         ],
+        "next_cursor": _encode_cursor(after, categories_after, deleted_after),
+        "has_more": has_more,
     }
 
 
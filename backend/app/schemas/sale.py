@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
-from pydantic import BaseModel, field_serializer
-from typing import Optional
+from pydantic import BaseModel, field_serializer, field_validator
+from typing import Literal, Optional
+from uuid import UUID
 
 
 class SaleItemCreate(BaseModel):
@@ -24,11 +25,90 @@ class SaleItemResponse(BaseModel):
 
 
 class SaleCreate(BaseModel):
+    # Client-generated id makes submission idempotent: resending the same id
+    # returns the stored sale instead of recording it twice
+    id: Optional[UUID] = None
     items: list[SaleItemCreate]
     payment_method: str = "cash"
     cash_received: float = 0.0
 
 
+class SaleQuoteRequest(BaseModel):
+    items: list[SaleItemCreate]
+
+
+class SaleQuoteLine(BaseModel):
+    product_id: str
+    product_name: str
+    quantity: float
+    pack_units: int = 1
+    sell_by_weight: bool = False
+    list_price: float  # regular unit price, before volume promos and discount
+    unit_price: float  # effective unit price charged
+    discount_percent: float
+    line_total: float
+    savings: float
+
+
+class SaleQuoteResponse(BaseModel):
+    lines: list[SaleQuoteLine]
+    subtotal: float
+    tax: float
+    total: float
+    savings: float
+
+
+# Compact quote rows: [product_id, quantity, pack_units, unit_price, discount_percent];
+# trailing fields may be omitted
+_COMPACT_ITEM_FIELDS = ("product_id", "quantity", "pack_units", "unit_price", "discount_percent")
+
+
+class SaleQuoteCompactRequest(BaseModel):
+    items: list[SaleItemCreate]
+    changed: Optional[list[str]] = None  # product ids touched since the last quote
+
+    @field_validator("items", mode="before")
+    @classmethod
+    def _expand_rows(cls, rows):
+        if not isinstance(rows, list):
+            return rows
+        expanded = []
+        for row in rows:
+            if isinstance(row, (list, tuple)):
+                if not 2 <= len(row) <= len(_COMPACT_ITEM_FIELDS):
+                    raise ValueError("compact items are [product_id, quantity, pack_units?, unit_price?, discount_percent?]")
+                row = {k: v for k, v in zip(_COMPACT_ITEM_FIELDS, row) if v is not None}
+            expanded.append(row)
+        return expanded
+
+
+class SaleQuoteCompactResponse(BaseModel):
+    lines: list[tuple[int, float, float]]  # [index, unit_price, line_total]
+    subtotal: float
+    tax: float
+    total: float
+
+
+class SaleBatchItem(SaleCreate):
+    id: UUID  # required for queued sales
+    created_at: Optional[datetime] = None  # when the sale actually happened (offline)
+
+
+class SaleBatchCreate(BaseModel):
+    sales: list[SaleBatchItem]
+
+
+class SaleBatchResult(BaseModel):
+    id: str
+    status: Literal["created", "duplicate", "rejected"]
+    total: Optional[float] = None
+    detail: Optional[str] = None
+
+
+class SaleBatchResponse(BaseModel):
+    results: list[SaleBatchResult]
+
+
 class SaleResponse(BaseModel):
     id: str
     store_id: str
@@ -58,6 +138,7 @@ class SaleImportItemPayload(BaseModel):
     discount_percent: float = 0.0
     line_total: float
     pack_units: int = 1
+    unit_cost: Optional[float] = None  # cost snapshot; absent from older instances
 
 
 class SaleImportPayload(BaseModel):
@@ -75,6 +156,15 @@ class SaleImportPayload(BaseModel):
     items: list[SaleImportItemPayload]
 
 
+class SaleImportBatch(BaseModel):
+    sales: list[SaleImportPayload]
+
+
+class SaleImportBatchResponse(BaseModel):
+    created: int
+    duplicate: int  # ids the server already had (or repeated in the batch)
+
+
 class TopProduct(BaseModel):
     product_name: str
     quantity_sold: float
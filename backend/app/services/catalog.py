@@ -0,0 +1,301 @@
+"""In-process hot catalog cache.
+
+The catalog (products, pack barcodes, volume promo tiers, recipe components)
+changes a few times a day but is read on every scan. This keeps an index of
+it in memory, keyed by product id, main barcode and pack barcode, so barcode
+lookups, the price checker and checkout pricing skip SQLite on the hot path.
+
+Freshness:
+- Write endpoints in this process call ``catalog.invalidate(ids)``; the
+  touched products are reloaded on next access.
+- Writes from other processes (sync, scripts) are picked up by an
+  incremental sweep over ``Product.updated_at`` at most every
+  ``SWEEP_INTERVAL_SECONDS``.
+- Unknown ids/barcodes fall through to the database (counted as misses), so
+  a product created elsewhere is never reported as missing.
+
+Every change bumps ``version``; hit/miss counters are exposed via stats().
+"""
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.product import Product, ProductBarcode, ProductComponent
+from app.schemas.product import ProductResponse
+from app.services.pricing import BundleTable
+
+SWEEP_INTERVAL_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class CatalogPromo:
+    min_units: int
+    promo_price: float
+
+
+@dataclass(frozen=True)
+class CatalogPack:
+    id: str
+    barcode: str
+    units: int
+    pack_price: float
+
+
+@dataclass(frozen=True)
+class CatalogComponent:
+    component_id: str
+    quantity: float
+    sell_by_weight: bool
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Immutable snapshot of one product as checkout and lookups need it."""
+    id: str
+    barcode: str
+    name: str
+    price: float
+    cost: float
+    is_active: bool
+    sell_by_weight: bool
+    image_url: str
+    category: str | None  # category name
+    updated_at: datetime
+    promos: tuple[CatalogPromo, ...]  # ascending by min_units
+    packs: tuple[CatalogPack, ...]
+    components: tuple[CatalogComponent, ...]
+    bundle: BundleTable  # compiled volume promo pricing
+    response: ProductResponse  # full API representation for barcode lookups (stale stock)
+
+
+def _load_options():
+    return (
+        selectinload(Product.category),
+        selectinload(Product.barcodes),
+        selectinload(Product.volume_promos),
+        selectinload(Product.ticket_aliases),
+        selectinload(Product.components).joinedload(ProductComponent.component),
+    )
+
+
+def _to_entry(p: Product) -> CatalogEntry:
+    promos = tuple(
+        CatalogPromo(vp.min_units, vp.promo_price)
+        for vp in sorted(p.volume_promos, key=lambda vp: vp.min_units)
+    )
+    return CatalogEntry(
+        id=p.id,
+        barcode=p.barcode,
+        name=p.name,
+        price=p.price,
+        cost=p.cost or 0.0,
+        is_active=p.is_active,
+        sell_by_weight=p.sell_by_weight,
+        image_url=p.image_url or "",
+        category=p.category.name if p.category else None,
+        updated_at=p.updated_at,
+        promos=promos,
+        packs=tuple(CatalogPack(b.id, b.barcode, b.units, b.pack_price) for b in p.barcodes),
+        components=tuple(
+            CatalogComponent(c.component_id, c.quantity, bool(c.component and c.component.sell_by_weight))
+            for c in p.components
+        ),
+        bundle=BundleTable(p.price, promos),
+        response=ProductResponse.model_validate(p),
+    )
+
+
+class CatalogCache:
+    def __init__(self, sweep_interval: float = SWEEP_INTERVAL_SECONDS):
+        self.sweep_interval = sweep_interval
+        self._lock = threading.RLock()
+        self._reset(None)
+
+    def _reset(self, bind) -> None:
+        self._bind = bind
+        self._loaded = False
+        self._entries: dict[str, CatalogEntry] = {}
+        self._by_barcode: dict[str, str] = {}
+        self._by_pack_barcode: dict[str, tuple[str, CatalogPack]] = {}
+        self._used_in: dict[str, set[str]] = {}  # component id -> recipe ids
+        self._categories: tuple[int, dict[str, str | None]] | None = None  # (version, product id -> name)
+        self._dirty: set[str] = set()
+        self._watermark: datetime | None = None
+        self._last_sweep = 0.0
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    # --- Index maintenance ---
+
+    def _drop(self, product_id: str) -> None:
+        old = self._entries.pop(product_id, None)
+        if not old:
+            return
+        if self._by_barcode.get(old.barcode) == product_id:
+            del self._by_barcode[old.barcode]
+        for pack in old.packs:
+            if self._by_pack_barcode.get(pack.barcode, (None,))[0] == product_id:
+                del self._by_pack_barcode[pack.barcode]
+        for comp in old.components:
+            self._used_in.get(comp.component_id, set()).discard(product_id)
+
+    def _put(self, entry: CatalogEntry) -> None:
+        self._drop(entry.id)
+        self._entries[entry.id] = entry
+        self._by_barcode[entry.barcode] = entry.id
+        for pack in entry.packs:
+            self._by_pack_barcode[pack.barcode] = (entry.id, pack)
+        for comp in entry.components:
+            self._used_in.setdefault(comp.component_id, set()).add(entry.id)
+        if entry.updated_at and (self._watermark is None or entry.updated_at > self._watermark):
+            self._watermark = entry.updated_at
+
+    def _load(self, db: Session, product_ids: Iterable[str] | None = None) -> None:
+        q = db.query(Product).options(*_load_options())
+        if product_ids is not None:
+            ids = set(product_ids)
+            if not ids:
+                return
+            q = q.filter(Product.id.in_(ids))
+        found = set()
+        for p in q.all():
+            self._put(_to_entry(p))
+            found.add(p.id)
+        if product_ids is not None:
+            for pid in ids - found:
+                self._drop(pid)  # deleted
+        self.version += 1
+
+    def _ensure_fresh(self, db: Session) -> None:
+        bind = db.get_bind()
+        if bind is not self._bind:
+            self._reset(bind)
+        if not self._loaded:
+            self._entries, self._by_barcode, self._by_pack_barcode, self._used_in = {}, {}, {}, {}
+            self._watermark = None
+            self._load(db)
+            self._loaded = True
+            self._dirty.clear()
+            self._last_sweep = time.monotonic()
+            return
+        if self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            self._load(db, dirty)
+        now = time.monotonic()
+        if self._watermark is not None and now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            changed = [
+                pid
+                for pid, updated_at in db.query(Product.id, Product.updated_at)
+                .filter(Product.updated_at >= self._watermark)
+                .all()
+                if pid not in self._entries or self._entries[pid].updated_at != updated_at
+            ]
+            if changed:
+                self._load(db, changed)
+
+    # --- Public API ---
+
+    def invalidate(self, product_ids: Iterable[str] | None = None) -> None:
+        """Mark products stale (reloaded on next access). No ids = everything."""
+        with self._lock:
+            if product_ids is None:
+                self._loaded = False
+                return
+            for pid in product_ids:
+                self._dirty.add(pid)
+                self._dirty.update(self._used_in.get(pid, ()))
+
+    def get_many(self, db: Session, product_ids: Iterable[str]) -> dict[str, CatalogEntry]:
+        """Entries for the given ids (active or not); unknown ids are omitted."""
+        ids = set(product_ids)
+        with self._lock:
+            self._ensure_fresh(db)
+            missing = ids - self._entries.keys()
+            self.hits += len(ids) - len(missing)
+            if missing:
+                self.misses += len(missing)
+                self._load(db, missing)
+            return {pid: self._entries[pid] for pid in ids if pid in self._entries}
+
+    def get(self, db: Session, product_id: str) -> CatalogEntry | None:
+        return self.get_many(db, [product_id]).get(product_id)
+
+    def lookup_barcode(self, db: Session, barcode: str) -> tuple[CatalogEntry, CatalogPack | None] | None:
+        """Resolve a scanned barcode to an active product — pack barcodes first,
+        then the main barcode, same precedence as the old per-scan queries."""
+        with self._lock:
+            self._ensure_fresh(db)
+            found = self._find_barcode(barcode)
+            if found:
+                self.hits += 1
+                return found
+            self.misses += 1
+            pid = (
+                db.query(ProductBarcode.product_id).filter(ProductBarcode.barcode == barcode).scalar()
+                or db.query(Product.id).filter(Product.barcode == barcode).scalar()
+            )
+            if pid:
+                self._load(db, [pid])
+                return self._find_barcode(barcode)
+            return None
+
+    def _find_barcode(self, barcode: str) -> tuple[CatalogEntry, CatalogPack | None] | None:
+        if barcode in self._by_pack_barcode:
+            pid, pack = self._by_pack_barcode[barcode]
+            entry = self._entries.get(pid)
+            if entry and entry.is_active:
+                return entry, pack
+        pid = self._by_barcode.get(barcode)
+        entry = self._entries.get(pid) if pid else None
+        if entry and entry.is_active:
+            return entry, None
+        return None
+
+    def category_names(self, db: Session) -> dict[str, str | None]:
+        """{product id: category name} for every product, inactive ones
+        included (None = uncategorized). Rebuilt only when the catalog
+        changes; category edits invalidate the whole catalog."""
+        with self._lock:
+            self._ensure_fresh(db)
+            if self._categories is None or self._categories[0] != self.version:
+                self._categories = (self.version, {pid: e.category for pid, e in self._entries.items()})
+            return self._categories[1]
+
+    def with_live_stock(self, db: Session, entry: CatalogEntry) -> ProductResponse:
+        """entry.response with stock (own and components') read fresh.
+
+        Stock moves on every sale, so it is deliberately not part of the cached
+        snapshot; one primary-key query overlays the current values.
+        """
+        ids = [entry.id] + [c.component_id for c in entry.components]
+        stock = dict(db.query(Product.id, Product.stock).filter(Product.id.in_(ids)).all())
+        response = entry.response
+        components = [
+            c.model_copy(update={"component_stock": stock.get(c.component_id, c.component_stock)})
+            for c in response.components
+        ]
+        return response.model_copy(update={
+            "stock": stock.get(entry.id, response.stock),
+            "components": components,
+        })
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "products": len(self._entries),
+            "barcodes": len(self._by_barcode) + len(self._by_pack_barcode),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+        }
+
+
+catalog = CatalogCache()
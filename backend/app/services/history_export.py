@@ -0,0 +1,246 @@
+"""Columnar export of sales history for offline analysis.
+
+Sales and sale items are written one file per store-local month:
+
+    <out_dir>/sales/month=2026-01/part-0.parquet
+    <out_dir>/sale_items/month=2026-01/part-0.parquet
+
+(hive-style partitions, so ``pyarrow.dataset`` / pandas / DuckDB read the
+whole directory as one table). Columns are typed; product names, payment
+methods, statuses and other low-cardinality strings are dictionary-encoded.
+
+pyarrow is optional: without it (or with ``fmt="csv"``) the same partitions
+are written as ``part-0.csv``.
+
+Exports are incremental. ``_manifest.json`` records each exported month;
+months that had already closed when they were exported are skipped on the
+next run unless their fingerprint (completed sale count and total, read from
+the hourly rollup) changed — e.g. a late sync import or a void. The current
+month is always rewritten.
+"""
+import csv
+import json
+import os
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.sale import Sale, SaleItem, SalesHourlyRollup
+from app.services.export import YIELD_PER
+from app.services.timebucket import bucket, bucket_key, local_today, to_local, utc_bounds
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = pq = None
+
+settings = get_settings()
+
+MANIFEST = "_manifest.json"
+
+# (column, type): str, dict (dictionary-encoded str), float, int, ts (UTC)
+SALES_COLUMNS = [
+    ("id", "str"), ("store_id", "dict"), ("user_id", "dict"), ("created_at", "ts"),
+    ("subtotal", "float"), ("tax", "float"), ("total", "float"), ("payment_method", "dict"),
+    ("cash_received", "float"), ("change_given", "float"), ("status", "dict"),
+]
+ITEM_COLUMNS = [
+    ("id", "str"), ("sale_id", "str"), ("created_at", "ts"), ("status", "dict"),
+    ("product_id", "dict"), ("product_name", "dict"), ("quantity", "float"), ("pack_units", "int"),
+    ("unit_price", "float"), ("discount_percent", "float"), ("line_total", "float"), ("unit_cost", "float"),
+]
+
+
+def default_format() -> str:
+    return "parquet" if pa is not None else "csv"
+
+
+def _arrow_type(kind: str):
+    return {
+        "str": pa.string(),
+        "dict": pa.dictionary(pa.int32(), pa.string()),
+        "float": pa.float64(),
+        "int": pa.int32(),
+        "ts": pa.timestamp("us", tz="UTC"),
+    }[kind]
+
+
+def _month_bounds(year: int, month: int) -> tuple[datetime, datetime]:
+    """Naive-UTC [start, end) of a store-local calendar month."""
+    nxt = (year + 1, 1) if month == 12 else (year, month + 1)
+    return utc_bounds(date(year, month, 1), date(*nxt, 1))
+
+
+def _months(first: datetime, last: datetime) -> Iterator[tuple[int, int]]:
+    """Store-local (year, month) pairs covering naive-UTC [first, last]."""
+    lo, hi = to_local(first), to_local(last)
+    year, month = lo.year, lo.month
+    while (year, month) <= (hi.year, hi.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _fingerprints(db: Session) -> dict[str, list]:
+    """[completed sale count, total] per month key — GROUP BY over the hourly
+    rollup (whose hours are already store-local)."""
+    month = bucket(db, SalesHourlyRollup.hour, "month", local=False)
+    rows = db.execute(
+        select(month, func.sum(SalesHourlyRollup.sale_count), func.sum(SalesHourlyRollup.total)).group_by(month)
+    )
+    return {bucket_key(m, "month").strftime("%Y-%m"): [count, round(total, 2)] for m, count, total in rows}
+
+
+def _write(path: str, columns: list[tuple[str, str]], rows: Iterable[tuple], fmt: str) -> int:
+    """Write rows to path (+ extension) via a temp file. Returns the row count."""
+    final = f"{path}.{fmt}"
+    tmp = f"{final}.tmp"
+    os.makedirs(os.path.dirname(final), exist_ok=True)
+    count = 0
+    if fmt == "parquet":
+        schema = pa.schema([(name, _arrow_type(kind)) for name, kind in columns])
+        with pq.ParquetWriter(tmp, schema) as writer:
+            batch: list[tuple] = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= YIELD_PER * 10:
+                    writer.write_table(_table(schema, batch))
+                    count += len(batch)
+                    batch = []
+            if batch or not count:
+                writer.write_table(_table(schema, batch))
+                count += len(batch)
+    else:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow([name for name, _ in columns])
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+    os.replace(tmp, final)
+    return count
+
+
+def _table(schema, rows: list[tuple]):
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    return pa.Table.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+    )
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc)
+
+
+def _sale_rows(db: Session, start: datetime, end: datetime, fmt: str) -> Iterator[tuple]:
+    rows = db.execute(
+        select(
+            Sale.id, Sale.store_id, Sale.user_id, Sale.created_at, Sale.subtotal, Sale.tax, Sale.total,
+            Sale.payment_method, Sale.cash_received, Sale.change_given, Sale.status,
+        )
+        .where(Sale.created_at >= start, Sale.created_at < end)
+        .order_by(Sale.created_at, Sale.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    for row in rows:
+        row = list(row)
+        row[3] = _utc(row[3]) if fmt == "parquet" else _utc(row[3]).isoformat()
+        yield tuple(row)
+
+
+def _item_rows(db: Session, start: datetime, end: datetime, fmt: str) -> Iterator[tuple]:
+    rows = db.execute(
+        select(
+            SaleItem.id, SaleItem.sale_id, Sale.created_at, Sale.status, SaleItem.product_id,
+            SaleItem.product_name, SaleItem.quantity, SaleItem.pack_units, SaleItem.unit_price,
+            SaleItem.discount_percent, SaleItem.line_total, SaleItem.unit_cost,
+        )
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .where(Sale.created_at >= start, Sale.created_at < end)
+        .order_by(Sale.created_at, SaleItem.sale_id, SaleItem.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    for row in rows:
+        row = list(row)
+        row[2] = _utc(row[2]) if fmt == "parquet" else _utc(row[2]).isoformat()
+        yield tuple(row)
+
+
+def load_manifest(out_dir: str) -> dict:
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {"partitions": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def export_sales_history(db: Session, out_dir: str, fmt: str | None = None, force: bool = False) -> dict:
+    """Export sales and sale items by month into out_dir (see module doc).
+
+    Returns {"format", "written": [month, ...], "skipped": [month, ...]}.
+    Raises ValueError for an unknown format, or parquet without pyarrow.
+    """
+    fmt = fmt or default_format()
+    if fmt not in ("parquet", "csv"):
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "parquet" and pa is None:
+        raise ValueError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    manifest = load_manifest(out_dir)
+    partitions = manifest.setdefault("partitions", {})
+    written, skipped = [], []
+
+    first, last = db.execute(select(func.min(Sale.created_at), func.max(Sale.created_at))).one()
+    if first is not None:
+        fingerprints = _fingerprints(db)
+        today = local_today()
+        current = (today.year, today.month)
+        for year, month in _months(first, last):
+            key = f"{year:04d}-{month:02d}"
+            fingerprint = fingerprints.get(key, [0, 0.0])
+            previous = partitions.get(key)
+            if (
+                not force
+                and previous is not None
+                and previous["closed"]
+                and previous["format"] == fmt
+                and previous["fingerprint"] == fingerprint
+                and all(os.path.exists(os.path.join(out_dir, p)) for p in previous["files"])
+            ):
+                skipped.append(key)
+                continue
+
+            start, end = _month_bounds(year, month)
+            files, counts = [], {}
+            for table, columns, rows in (
+                ("sales", SALES_COLUMNS, _sale_rows(db, start, end, fmt)),
+                ("sale_items", ITEM_COLUMNS, _item_rows(db, start, end, fmt)),
+            ):
+                base = f"{table}/month={key}/part-0"  # manifest paths use / on every OS
+                counts[table] = _write(os.path.join(out_dir, base), columns, rows, fmt)
+                files.append(f"{base}.{fmt}")
+            if previous is not None:
+                for stale in set(previous["files"]) - set(files):
+                    stale_path = os.path.join(out_dir, stale)
+                    if os.path.exists(stale_path):
+                        os.remove(stale_path)
+            partitions[key] = {
+                "format": fmt,
+                "closed": (year, month) < current,
+                "fingerprint": fingerprint,
+                "rows": counts,
+                "files": files,
+                "exported_at": datetime.utcnow().isoformat(timespec="seconds"),
+            }
+            written.append(key)
+
+    manifest["format"] = fmt
+    os.makedirs(out_dir, exist_ok=True)
+    tmp = os.path.join(out_dir, f"{MANIFEST}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST))
+    return {"format": fmt, "written": written, "skipped": skipped}
@@ -0,0 +1,240 @@
+"""In-process inventory valuation and below-minimum index.
+
+The inventory report and the low-stock alert used to scan every active
+product on each call. This keeps, per active product, the few fields they
+need, plus running totals (cost and retail value of stock) and the sets of
+out-of-stock and below-minimum product ids, so both answer in time
+proportional to what they return.
+
+Freshness follows the catalog cache (app.services.catalog):
+- Writers in this process call ``inventory.invalidate(ids)`` after commit —
+  checkout, the sales batch, voids, stock adjustments, product edits and
+  imports, sync pulls. Touched products are re-read by primary key on next
+  access and the totals are adjusted by the difference.
+- Writes from other processes (import scripts) are picked up by a sweep over
+  ``Product.updated_at`` and ``StockMovement.created_at`` at most every
+  ``SWEEP_INTERVAL_SECONDS``.
+
+Out of stock: stock <= 0. Below minimum: 0 < stock <= min_stock.
+"""
+import threading
+import time
+from collections.abc import Iterable
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.product import Product, StockMovement
+
+SWEEP_INTERVAL_SECONDS = 5.0
+OUT_OF_STOCK = "out_of_stock"
+BELOW_MINIMUM = "below_minimum"
+SORT_KEYS = ("stock", "name", "min_stock", "reorder_qty", "cost", "price")
+
+
+class InventoryRow(NamedTuple):
+    id: str
+    name: str
+    barcode: str
+    stock: int
+    min_stock: int
+    cost: float
+    price: float
+
+    @property
+    def reorder_qty(self) -> int:
+        return max(self.min_stock * 3 - self.stock, self.min_stock)
+
+    def status(self) -> str | None:
+        if self.stock <= 0:
+            return OUT_OF_STOCK
+        if self.stock <= self.min_stock:
+            return BELOW_MINIMUM
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "product_id": self.id,
+            "name": self.name,
+            "barcode": self.barcode,
+            "stock": self.stock,
+            "min_stock": self.min_stock,
+            "cost": self.cost,
+            "price": self.price,
+            "reorder_qty": self.reorder_qty,
+        }
+
+
+_COLUMNS = (
+    Product.id, Product.name, Product.barcode, Product.stock, Product.min_stock,
+    func.coalesce(Product.cost, 0.0), Product.price,
+)
+
+
+class InventoryIndex:
+    def __init__(self, sweep_interval: float = SWEEP_INTERVAL_SECONDS):
+        self.sweep_interval = sweep_interval
+        self._lock = threading.RLock()
+        self._reset(None)
+
+    def _reset(self, bind) -> None:
+        self._bind = bind
+        self._loaded = False
+        self._rows: dict[str, InventoryRow] = {}  # active products only
+        self._lists: dict[str, set[str]] = {OUT_OF_STOCK: set(), BELOW_MINIMUM: set()}
+        self._stock_value = 0.0
+        self._retail_value = 0.0
+        self._dirty: set[str] = set()
+        self._product_watermark: datetime | None = None
+        self._movement_watermark: datetime | None = None
+        self._last_sweep = 0.0
+        self.loads = 0
+        self.reloaded = 0
+
+    # --- Index maintenance ---
+
+    def _remove(self, product_id: str) -> None:
+        old = self._rows.pop(product_id, None)
+        if old is None:
+            return
+        self._stock_value -= old.cost * old.stock
+        self._retail_value -= old.price * old.stock
+        status = old.status()
+        if status:
+            self._lists[status].discard(product_id)
+
+    def _add(self, row: InventoryRow) -> None:
+        self._rows[row.id] = row
+        self._stock_value += row.cost * row.stock
+        self._retail_value += row.price * row.stock
+        status = row.status()
+        if status:
+            self._lists[status].add(row.id)
+
+    def _full_load(self, db: Session) -> None:
+        self._rows = {}
+        self._lists = {OUT_OF_STOCK: set(), BELOW_MINIMUM: set()}
+        self._stock_value = self._retail_value = 0.0
+        for row in db.execute(select(*_COLUMNS).where(Product.is_active == True)):
+            self._add(InventoryRow(*row))
+        self._product_watermark = db.scalar(select(func.max(Product.updated_at)))
+        self._movement_watermark = db.scalar(select(func.max(StockMovement.created_at)))
+        self._loaded = True
+        self._dirty.clear()
+        self._last_sweep = time.monotonic()
+        self.loads += 1
+
+    def _reload(self, db: Session, product_ids: set[str]) -> None:
+        if not product_ids:
+            return
+        found = {
+            row[0]: InventoryRow(*row)
+            for row in db.execute(
+                select(*_COLUMNS).where(Product.id.in_(product_ids), Product.is_active == True)
+            )
+        }
+        for pid in product_ids:
+            self._remove(pid)
+            if pid in found:
+                self._add(found[pid])
+        self.reloaded += len(product_ids)
+
+    def _sweep(self, db: Session) -> None:
+        changed: set[str] = set()
+        if self._product_watermark is not None:
+            rows = db.execute(
+                select(Product.id, Product.updated_at).where(Product.updated_at >= self._product_watermark)
+            ).all()
+            for pid, updated_at in rows:
+                changed.add(pid)
+                self._product_watermark = max(self._product_watermark, updated_at)
+        else:
+            self._product_watermark = db.scalar(select(func.max(Product.updated_at)))
+        if self._movement_watermark is not None:
+            rows = db.execute(
+                select(StockMovement.product_id, StockMovement.created_at)
+                .where(StockMovement.created_at >= self._movement_watermark)
+            ).all()
+            for pid, created_at in rows:
+                changed.add(pid)
+                self._movement_watermark = max(self._movement_watermark, created_at)
+        else:
+            self._movement_watermark = db.scalar(select(func.max(StockMovement.created_at)))
+        self._reload(db, changed)
+
+    def _ensure_fresh(self, db: Session) -> None:
+        bind = db.get_bind()
+        if bind is not self._bind:
+            self._reset(bind)
+        if not self._loaded:
+            self._full_load(db)
+            return
+        if self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            self._reload(db, dirty)
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self._sweep(db)
+
+    # --- Public API ---
+
+    def invalidate(self, product_ids: Iterable[str] | None = None) -> None:
+        """Mark products stale (re-read on next access). No ids = everything."""
+        with self._lock:
+            if product_ids is None:
+                self._loaded = False
+                return
+            self._dirty.update(product_ids)
+
+    def summary(self, db: Session) -> dict:
+        """Running totals and list sizes."""
+        with self._lock:
+            self._ensure_fresh(db)
+            return {
+                "total_products": len(self._rows),
+                "total_stock_value": round(self._stock_value, 2),
+                "total_retail_value": round(self._retail_value, 2),
+                "potential_profit": round(self._retail_value - self._stock_value, 2),
+                "out_of_stock_count": len(self._lists[OUT_OF_STOCK]),
+                "below_minimum_count": len(self._lists[BELOW_MINIMUM]),
+            }
+
+    def items(
+        self,
+        db: Session,
+        status: str,
+        sort: str = "stock",
+        descending: bool = False,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> tuple[int, list[InventoryRow]]:
+        """(total, page) of the out-of-stock or below-minimum list, sorted by
+        ``sort`` (ties by name). Raises ValueError for an unknown status/sort."""
+        if status not in (OUT_OF_STOCK, BELOW_MINIMUM):
+            raise ValueError(f"Unknown inventory list: {status}")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        with self._lock:
+            self._ensure_fresh(db)
+            rows = [self._rows[pid] for pid in self._lists[status]]
+        rows.sort(key=lambda r: (r.name, r.id))
+        rows.sort(key=lambda r: getattr(r, sort), reverse=descending)
+        end = None if limit is None else offset + limit
+        return len(rows), rows[offset:end]
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "products": len(self._rows),
+            "out_of_stock": len(self._lists[OUT_OF_STOCK]),
+            "below_minimum": len(self._lists[BELOW_MINIMUM]),
+            "full_loads": self.loads,
+            "reloaded": self.reloaded,
+            "pending": len(self._dirty),
+        }
+
+
+inventory = InventoryIndex()
@@ -0,0 +1,333 @@
+"""Live dashboard feed (server-sent events).
+
+The feed keeps today's dashboard (store-local day) in memory: KPIs, the 24
+hourly buckets, payment breakdown and per-product totals. It is built once
+from the hourly rollup and one items query — the same numbers as
+GET /api/reports/dashboard — and from then on updated by the sale write
+path: create_sale, the sales batch, void_sale and sync-import call
+publish_sales() / publish_void() after their write commits.
+
+Each change appends small delta events to a sequenced ring buffer:
+
+- ``sale`` / ``void``: the sale id, total and method, plus the new KPIs
+- ``hour``: the hourly bucket it landed in
+- ``top_products``: the new top 10, only when it changed
+
+Subscribers stream the buffer from their position, so a reconnect with
+``Last-Event-ID`` replays what it missed. A client too far behind (or from
+before a day rollover or restart) gets a fresh ``snapshot`` event instead.
+Event ids are ``<epoch>:<seq>``; the epoch changes whenever the state is
+rebuilt.
+
+A sale committed while the state is being built would otherwise be counted
+twice (in the snapshot and by its publish), so the state tracks the ids of
+the sales it has counted. The totals and those ids are read in one read
+transaction, so a sale is either in both or in neither.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.sale import Sale
+from app.services.rollup import hourly_rows, sale_cost, top_products
+from app.services.timebucket import local_today, to_local, to_utc, utc_bounds
+
+settings = get_settings()
+
+BUFFER_EVENTS = 1000
+KEEPALIVE_SECONDS = 15.0
+TOP_PRODUCTS = 10
+PAYMENT_METHODS = ("cash", "card", "mixed")
+
+
+def _message(event_id: str, kind: str, data) -> str:
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@contextmanager
+def _read_snapshot(bind) -> Iterator[Session]:
+    """A session whose reads all see the same snapshot of the database."""
+    with bind.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            # pysqlite only opens a transaction before a write: without one
+            # each SELECT would see whatever committed before it
+            conn.exec_driver_sql("BEGIN")
+        else:
+            conn = conn.execution_options(isolation_level="REPEATABLE READ")
+        with Session(bind=conn) as db:
+            yield db
+
+
+class _Today:
+    """Mutable dashboard state for one store-local day."""
+
+    def __init__(self, db: Session, day: date):
+        """Build from ``db``, which must read one snapshot (_read_snapshot)."""
+        self.day = day
+        start_local = datetime(day.year, day.month, day.day)
+        yesterday_utc, start_utc = utc_bounds(day - timedelta(days=1), day)
+        end_utc = to_utc(start_local + timedelta(days=1))
+
+        self.hours = [[0.0, 0] for _ in range(24)]
+        self.payments = dict.fromkeys(PAYMENT_METHODS, 0.0)
+        self.total = self.cost = self.yesterday_total = 0.0
+        self.count = 0
+        for r in hourly_rows(db, start_local - timedelta(days=1), start_local + timedelta(days=1)):
+            if r.hour < start_local:
+                self.yesterday_total += r.total
+                continue
+            self.total += r.total
+            self.count += r.sale_count
+            self.cost += r.cost
+            self.hours[r.hour.hour][0] += r.total
+            self.hours[r.hour.hour][1] += r.sale_count
+            if r.payment_method in self.payments:
+                self.payments[r.payment_method] += r.total
+        self.products = {
+            name: [qty, revenue] for name, qty, revenue in top_products(db, start_utc, end_utc, limit=None)
+        }
+        # Completed sales already in the numbers above (today and yesterday)
+        self.counted = set(db.scalars(
+            select(Sale.id).where(
+                Sale.store_id == settings.store_id,
+                Sale.status == "completed",
+                Sale.created_at >= yesterday_utc,
+                Sale.created_at < end_utc,
+            )
+        ))
+        self.top = self.top_products()
+
+    def top_products(self) -> list[dict]:
+        ranked = sorted(self.products.items(), key=lambda kv: kv[1][1], reverse=True)[:TOP_PRODUCTS]
+        return [
+            {"product_name": name, "quantity_sold": qty, "revenue": revenue}
+            for name, (qty, revenue) in ranked
+            if qty or revenue
+        ]
+
+    def kpis(self) -> dict:
+        return {
+            "date": self.day.isoformat(),
+            "total_sales": round(self.total, 2),
+            "transaction_count": self.count,
+            "avg_ticket": round(self.total / self.count, 2) if self.count else 0.0,
+            "total_profit": round(self.total - self.cost, 2),
+            "yesterday_total": round(self.yesterday_total, 2),
+            "payment_breakdown": {method: round(total, 2) for method, total in self.payments.items()},
+        }
+
+    def hour(self, h: int) -> dict:
+        return {"hour": h, "sales": round(self.hours[h][0], 2), "transactions": self.hours[h][1]}
+
+    def dashboard(self) -> dict:
+        """Same shape as GET /api/reports/dashboard."""
+        kpis = self.kpis()
+        return {
+            **{k: v for k, v in kpis.items() if k != "payment_breakdown"},
+            "sales_by_hour": [self.hour(h) for h in range(24)],
+            "top_products": self.top,
+            "payment_breakdown": kpis["payment_breakdown"],
+        }
+
+
+class DashboardFeed:
+    def __init__(self, buffer: int = BUFFER_EVENTS):
+        self.buffer = buffer
+        self._lock = threading.Lock()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._reset(None)
+
+    def _reset(self, bind) -> None:
+        self._bind = bind
+        self._state: _Today | None = None
+        self._epoch = int(time.time())  # ids from before a restart never resume
+        self._seq = 0
+        self._events: deque[tuple[int, str]] = deque(maxlen=self.buffer)
+        self.published = 0
+
+    # --- State ---
+
+    def _fresh(self, db: Session) -> _Today:
+        """Current state, rebuilt for a new engine or a new local day. Lock held."""
+        bind = db.get_bind()
+        if bind is not self._bind:
+            self._reset(bind)
+        today = local_today()
+        if self._state is None or self._state.day != today:
+            with _read_snapshot(bind) as snapshot:
+                self._state = _Today(snapshot, today)
+            self._epoch += 1
+            self._seq = 0
+            self._events.clear()
+        return self._state
+
+    def _snapshot(self) -> tuple[tuple[int, int], str]:
+        cursor = (self._epoch, self._seq)
+        return cursor, _message(f"{self._epoch}:{self._seq}", "snapshot", self._state.dashboard())
+
+    def _emit(self, kind: str, data) -> None:
+        self._seq += 1
+        self._events.append((self._seq, _message(f"{self._epoch}:{self._seq}", kind, data)))
+
+    def _apply(self, state: _Today, sale: Sale, sign: int) -> None:
+        if sale.store_id != settings.store_id:
+            return
+        local = to_local(sale.created_at)
+        day = local.date()
+        if day > state.day:
+            self._state = None  # the day rolled over: subscribers re-snapshot
+            return
+        if day < state.day - timedelta(days=1):
+            return
+        if (sale.id in state.counted) == (sign > 0):
+            return  # already in the numbers (or never was, for a void)
+        if sign > 0:
+            state.counted.add(sale.id)
+        else:
+            state.counted.discard(sale.id)
+
+        if day < state.day:
+            state.yesterday_total += sign * sale.total
+        else:
+            state.total += sign * sale.total
+            state.count += sign
+            state.cost += sign * sale_cost(sale)
+            state.hours[local.hour][0] += sign * sale.total
+            state.hours[local.hour][1] += sign
+            if sale.payment_method in state.payments:
+                state.payments[sale.payment_method] += sign * sale.total
+            for item in sale.items:
+                p = state.products.setdefault(item.product_name, [0.0, 0.0])
+                p[0] += sign * item.quantity * item.pack_units
+                p[1] += sign * item.line_total
+
+        kind = "sale" if sign > 0 else "void"
+        self._emit(kind, {
+            "sale_id": sale.id,
+            "total": sale.total,
+            "payment_method": sale.payment_method,
+            "kpis": state.kpis(),
+        })
+        if day == state.day:
+            self._emit("hour", state.hour(local.hour))
+            top = state.top_products()
+            if top != state.top:
+                state.top = top
+                self._emit("top_products", top)
+
+    def _publish(self, db: Session, sales: Iterable[Sale], sign: int) -> None:
+        with self._lock:
+            if db.get_bind() is not self._bind or self._state is None:
+                return  # nobody has subscribed yet (or the state is being rebuilt)
+            seq = self._seq
+            for sale in sales:
+                if self._state is None:
+                    break
+                self._apply(self._state, sale, sign)
+            self.published += 1
+            changed = self._seq != seq or self._state is None
+            waiters = list(self._waiters) if changed else []
+        for loop, wake in waiters:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # loop closed; the subscriber is gone
+
+    # --- Write path ---
+
+    def publish_sales(self, db: Session, sales: Iterable[Sale]) -> None:
+        """Feed newly committed sales (items loaded). Non-completed are skipped."""
+        self._publish(db, [s for s in sales if s.status == "completed"], 1)
+
+    def publish_void(self, db: Session, sale: Sale) -> None:
+        """Feed a committed void (items loaded)."""
+        self._publish(db, [sale], -1)
+
+    # --- Subscribers ---
+
+    def connect(self, db: Session, last_event_id: str | None = None) -> tuple[tuple[int, int], list[str]]:
+        """Start (or resume) a subscription: returns the cursor and the
+        messages to send first — the events after last_event_id when they
+        are still buffered, else a snapshot."""
+        with self._lock:
+            self._fresh(db)
+            if last_event_id:
+                try:
+                    epoch, seq = (int(part) for part in last_event_id.split(":"))
+                except ValueError:
+                    epoch, seq = -1, -1
+                replay = self._after((epoch, seq))
+                if replay is not None:
+                    return replay
+            cursor, message = self._snapshot()
+            return cursor, [message]
+
+    def _after(self, cursor: tuple[int, int]) -> tuple[tuple[int, int], list[str]] | None:
+        """Buffered messages after cursor, or None if it can't be resumed. Lock held."""
+        epoch, seq = cursor
+        if self._state is None or epoch != self._epoch or seq > self._seq:
+            return None
+        if self._state.day != local_today():
+            return None  # midnight passed
+        if seq < self._seq and (not self._events or self._events[0][0] > seq + 1):
+            return None  # fell off the buffer
+        return (epoch, self._seq), [message for n, message in self._events if n > seq]
+
+    def _resnapshot(self, bind) -> tuple[tuple[int, int], list[str]]:
+        with Session(bind=bind) as db, self._lock:
+            self._fresh(db)
+            cursor, message = self._snapshot()
+            return cursor, [message]
+
+    async def stream(self, bind, cursor: tuple[int, int], first: list[str]) -> AsyncIterator[str]:
+        """SSE body: the first messages, then new events as they are published
+        (re-snapshotting after a rollover), with keep-alive comments."""
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        waiter = (loop, wake)
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            yield "retry: 3000\n\n"
+            for message in first:
+                yield message
+            while True:
+                wake.clear()
+                with self._lock:
+                    after = self._after(cursor)
+                if after is None:
+                    after = await asyncio.to_thread(self._resnapshot, bind)
+                cursor, messages = after
+                for message in messages:
+                    yield message
+                if messages:
+                    continue
+                try:
+                    await asyncio.wait_for(wake.wait(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def stats(self) -> dict:
+        return {
+            "epoch": self._epoch,
+            "seq": self._seq,
+            "buffered": len(self._events),
+            "subscribers": len(self._waiters),
+            "published": self.published,
+            "live": self._state is not None,
+        }
+
+
+dashboard_feed = DashboardFeed()
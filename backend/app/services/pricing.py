@@ -1,8 +1,15 @@
 """Volume promo (bundle) pricing.
 
 promo_price is the TOTAL price for min_units (e.g. 8 for $135 → promo_price=135).
-The frontend mirrors this algorithm in useCart.ts (calcBundleUnitPrice) — keep both in sync.
+The frontend mirrors this algorithm in useCart.ts (calcBundleUnitPrice) for its
+instant/offline estimate — keep both in sync. Online, the POS adopts the prices
+from POST /api/sales/quote, which runs the same code as checkout.
+
+bundle_total() is the reference implementation. Checkout, the price checker
+and quotes use a BundleTable compiled once per product (held on its catalog
+entry, rebuilt whenever the product's promos change).
 """
+import threading
 
 
 def bundle_total(total_qty: int, base_price: float, promos) -> float:
@@ -28,3 +35,59 @@ def bundle_total(total_qty: int, base_price: float, promos) -> float:
                     best = candidate
         cost[q] = best
     return cost[total_qty]
+
+
+class BundleTable:
+    """bundle_total() for one product, memoized across calls.
+
+    The DP array is kept and extended lazily, so each quantity is computed
+    once. It never needs to grow past ``horizon``: an optimal basket never
+    needs ``best_units`` or more items other than the best-value bundle (some
+    subset of them adds up to a multiple of ``best_units`` and can be swapped
+    for best bundles at no extra cost), so for q >= horizon the optimum is
+    ``cost[q - best_units] + best_price``. Larger quantities fold back into
+    the table arithmetically — O(1) after warm-up, however big the order.
+    """
+
+    def __init__(self, base_price: float, promos):
+        self.base_price = base_price
+        self.tiers = [(p.min_units, p.promo_price) for p in promos if p.min_units > 0]
+        # Best value per unit among singles and tiers (singles win ties)
+        self.best_units, self.best_price = 1, base_price
+        for min_units, promo_price in self.tiers:
+            if promo_price * self.best_units < self.best_price * min_units:
+                self.best_units, self.best_price = min_units, promo_price
+        largest = max((m for m, _ in self.tiers), default=1)
+        self.horizon = self.best_units * largest
+        self._cost = [0.0]
+        self._lock = threading.Lock()
+
+    def total(self, qty: int) -> float:
+        """Cheapest total for qty units (same result as bundle_total)."""
+        if qty <= 0:
+            return 0.0
+        if not self.tiers:
+            return qty * self.base_price
+        bundles = 0
+        if qty >= self.horizon:
+            bundles = (qty - self.horizon) // self.best_units + 1
+            qty -= bundles * self.best_units
+        if qty >= len(self._cost):
+            self._extend(qty)
+        return self._cost[qty] + bundles * self.best_price
+
+    def unit_price(self, qty: int) -> float:
+        """Average unit price for qty units at the bundle optimum."""
+        return self.total(qty) / qty if qty > 0 else self.base_price
+
+    def _extend(self, qty: int) -> None:
+        with self._lock:
+            cost = self._cost
+            for q in range(len(cost), qty + 1):
+                best = cost[q - 1] + self.base_price
+                for min_units, promo_price in self.tiers:
+                    if min_units <= q:
+                        candidate = cost[q - min_units] + promo_price
+                        if candidate < best:
+                            best = candidate
+                cost.append(best)
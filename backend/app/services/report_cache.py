@@ -0,0 +1,151 @@
+"""Per-day partial aggregates for range reports.
+
+A report over past days can only change when a sale in one of those days is
+voided or arrives late (sync import, backdated offline batch). So reports
+are computed as per-day partials: closed days are cached, and a range query
+merges cached days with freshly computed ones — normally just today.
+
+Partials are keyed by (kind, store, params, day). Several endpoints can share
+a kind (product profitability and category performance both merge the
+per-product daily sales). Days are store-local calendar days
+(app.services.timebucket), so a sale invalidates exactly one day.
+
+Freshness:
+- void_sale, sync-import and the sales batch call ``invalidate_days()`` with
+  the sale timestamps after their write commits.
+- A partial computed before an invalidation of its day is not stored
+  (generation check), so a report racing a void can't cache the old value.
+- Rebuilding the rollup clears everything.
+
+Hit/miss counters (in days) are exposed via stats().
+"""
+import threading
+from collections.abc import Callable, Hashable, Iterable
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.services.timebucket import to_local
+
+settings = get_settings()
+
+# compute(db, start, end) -> {day: partial} for local days in [start, end)
+# (naive local midnights); days without data may be left out
+Compute = Callable[[Session, datetime, datetime], dict[date, Any]]
+
+
+class ReportCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, bind) -> None:
+        self._bind = bind
+        self._partials: dict[tuple, Any] = {}
+        self._by_day: dict[date, set[tuple]] = {}
+        self._invalidated: dict[date, int] = {}  # day -> generation of its last invalidation
+        self._cleared = 0  # generation of the last clear()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def partials(
+        self,
+        db: Session,
+        kind: str,
+        start: datetime,
+        end: datetime,
+        today: date,
+        compute: Compute,
+        params: Hashable = (),
+    ) -> dict[date, Any]:
+        """Partials for each day in [start, end) (midnight-aligned), in order.
+
+        Days before ``today`` come from the cache when present; the rest are
+        computed, one ``compute`` call per contiguous run of missing days.
+        Days without data map to None.
+        """
+        days = [start.date() + timedelta(days=n) for n in range((end - start).days)]
+        store_id = settings.store_id
+        bind = db.get_bind()
+        with self._lock:
+            if bind is not self._bind:
+                self._reset(bind)
+            generation = self.generation
+            cached = {
+                day: self._partials[(kind, store_id, params, day)]
+                for day in days
+                if day < today and (kind, store_id, params, day) in self._partials
+            }
+            self.hits += len(cached)
+            self.misses += len(days) - len(cached)
+
+        fresh: dict[date, Any] = {}
+        for first, last in _runs([day for day in days if day not in cached]):
+            lo = datetime.combine(first, time())
+            fresh.update({day: None for day in _span(first, last)})
+            fresh.update(compute(db, lo, datetime.combine(last, time()) + timedelta(days=1)))
+
+        with self._lock:
+            if bind is self._bind:
+                for day, partial in fresh.items():
+                    if day < today and max(self._invalidated.get(day, 0), self._cleared) <= generation:
+                        key = (kind, store_id, params, day)
+                        self._partials[key] = partial
+                        self._by_day.setdefault(day, set()).add(key)
+
+        return {day: cached[day] if day in cached else fresh.get(day) for day in days}
+
+    def invalidate_days(self, timestamps: Iterable[datetime]) -> None:
+        """Drop cached partials for the store-local days of these sale
+        timestamps (naive UTC or aware)."""
+        days = {to_local(ts).date() for ts in timestamps if ts is not None}
+        if not days:
+            return
+        with self._lock:
+            self.generation += 1
+            for day in days:
+                self._invalidated[day] = self.generation
+                for key in self._by_day.pop(day, ()):
+                    self._partials.pop(key, None)
+            self.invalidations += len(days)
+
+    def clear(self) -> None:
+        """Drop every cached partial (counters are kept)."""
+        with self._lock:
+            self.generation += 1
+            self._cleared = self.generation
+            self._partials.clear()
+            self._by_day.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "partials": len(self._partials),
+            "days": len(self._by_day),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidated_days": self.invalidations,
+        }
+
+
+def _span(first: date, last: date) -> list[date]:
+    return [first + timedelta(days=n) for n in range((last - first).days + 1)]
+
+
+def _runs(days: list[date]) -> list[tuple[date, date]]:
+    """Contiguous (first, last) runs of sorted days."""
+    runs: list[tuple[date, date]] = []
+    for day in days:
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+report_cache = ReportCache()
@@ -0,0 +1,157 @@
+"""Hourly sales rollup.
+
+sales_hourly_rollup holds completed-sale totals per (store, store-local hour,
+payment method). create_sale, the batch endpoint, void_sale and sync-import
+call record_sales() in their own transaction, so the rollup is always in
+step with the sales table; dashboard and summaries read it instead of
+loading every sale.
+
+Updates are relative upserts (``sale_count = sale_count + excluded...``), so
+concurrent writers can't lose each other's increments. rebuild_rollup()
+recomputes the whole table from sales (history, or after a manual fix).
+"""
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.sale import Sale, SaleItem, SalesHourlyRollup
+from app.services.timebucket import python_bucket
+
+settings = get_settings()
+
+_rollup = SalesHourlyRollup.__table__
+_KEY = ("store_id", "hour", "payment_method")
+_MEASURES = ("sale_count", "subtotal", "tax", "total", "units", "cost")
+
+
+def local_hour(created_at: datetime) -> datetime:
+    """Store-local hour bucket (naive) for a naive-UTC timestamp."""
+    return python_bucket(created_at, "hour")
+
+
+def sale_cost(sale: Sale) -> float:
+    """Cost of goods for a sale from its items' cost snapshots."""
+    return sum((i.unit_cost or 0.0) * i.quantity * i.pack_units for i in sale.items)
+
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(_rollup)
+
+
+def _upsert(db: Session, buckets: dict[tuple, dict]) -> None:
+    if not buckets:
+        return
+    stmt = _insert(db)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_rollup.c[k] for k in _KEY],
+        set_={m: _rollup.c[m] + stmt.excluded[m] for m in _MEASURES},
+    )
+    db.execute(stmt, [dict(zip(_KEY, key), **measures) for key, measures in buckets.items()])
+
+
+def _add(buckets: dict[tuple, dict], key: tuple, sign: int, subtotal, tax, total, units, cost) -> None:
+    b = buckets.get(key)
+    if b is None:
+        b = buckets[key] = dict.fromkeys(_MEASURES, 0)
+    b["sale_count"] += sign
+    b["subtotal"] += sign * (subtotal or 0.0)
+    b["tax"] += sign * (tax or 0.0)
+    b["total"] += sign * (total or 0.0)
+    b["units"] += sign * (units or 0.0)
+    b["cost"] += sign * (cost or 0.0)
+
+
+def record_sales(db: Session, sales: Iterable[Sale], sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1, void) completed sales from the
+    rollup. Runs in the caller's transaction; sales must be flushed
+    (created_at set)."""
+    buckets: dict[tuple, dict] = {}
+    for sale in sales:
+        key = (sale.store_id, local_hour(sale.created_at), sale.payment_method)
+        units = sum(i.quantity * i.pack_units for i in sale.items)
+        _add(buckets, key, sign, sale.subtotal, sale.tax, sale.total, units, sale_cost(sale))
+    _upsert(db, buckets)
+
+
+def rebuild_rollup(db: Session) -> int:
+    """Recompute the rollup from all completed sales and their items' cost
+    snapshots. Returns the number of rollup rows. Caller commits."""
+    items = (
+        select(
+            SaleItem.sale_id,
+            func.sum(SaleItem.quantity * SaleItem.pack_units).label("units"),
+            func.sum(SaleItem.quantity * SaleItem.pack_units * func.coalesce(SaleItem.unit_cost, 0.0)).label("cost"),
+        )
+        .group_by(SaleItem.sale_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            Sale.store_id, Sale.created_at, Sale.payment_method,
+            Sale.subtotal, Sale.tax, Sale.total, items.c.units, items.c.cost,
+        )
+        .outerjoin(items, items.c.sale_id == Sale.id)
+        .where(Sale.status == "completed")
+        .execution_options(yield_per=5000)
+    )
+    buckets: dict[tuple, dict] = {}
+    for store_id, created_at, method, subtotal, tax, total, units, cost in rows:
+        _add(buckets, (store_id, local_hour(created_at), method), 1, subtotal, tax, total, units, cost)
+
+    db.execute(delete(_rollup))
+    if buckets:
+        db.execute(_rollup.insert(), [dict(zip(_KEY, key), **measures) for key, measures in buckets.items()])
+    return len(buckets)
+
+
+def hourly_rows(db: Session, start: datetime, end: datetime, store_id: str | None = None) -> list[SalesHourlyRollup]:
+    """Rollup rows for store-local hours in [start, end)."""
+    return (
+        db.query(SalesHourlyRollup)
+        .filter(
+            SalesHourlyRollup.store_id == (store_id or settings.store_id),
+            SalesHourlyRollup.hour >= start,
+            SalesHourlyRollup.hour < end,
+        )
+        .order_by(SalesHourlyRollup.hour)
+        .all()
+    )
+
+
+def top_products(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    order_by: str = "revenue",
+    units: bool = True,
+    limit: int | None = 10,
+) -> list[tuple[str, float, float]]:
+    """(product_name, quantity, revenue) for completed sales in the naive-UTC
+    range [start, end), aggregated in SQL. Item-level, so not rolled up;
+    `units` counts pack lines as their units rather than packs. limit=None
+    returns every product sold."""
+    qty = func.sum(SaleItem.quantity * SaleItem.pack_units if units else SaleItem.quantity)
+    revenue = func.sum(SaleItem.line_total)
+    return [
+        tuple(row)
+        for row in db.execute(
+            select(SaleItem.product_name, qty, revenue)
+            .join(Sale, Sale.id == SaleItem.sale_id)
+            .where(
+                Sale.store_id == settings.store_id,
+                Sale.status == "completed",
+                Sale.created_at >= start,
+                Sale.created_at < end,
+            )
+            .group_by(SaleItem.product_name)
+            .order_by((revenue if order_by == "revenue" else qty).desc())
+            .limit(limit)
+        )
+    ]
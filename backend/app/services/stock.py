@@ -0,0 +1,176 @@
+"""Stock ledger: atomic, set-based stock changes.
+
+Every stock change is appended to stock_movements and applied to
+products.stock with a relative ``stock = stock + :delta`` statement, so two
+terminals selling the same SKU can't lose each other's updates. A sale's
+movements go out as one executemany INSERT plus one executemany UPDATE,
+however many lines it has.
+
+products.stock is a cached projection of the ledger; rebuild_stock()
+recomputes it from SUM(quantity). Stock writes leave products.updated_at
+alone: it marks catalog edits (the sync change feed and the catalog cache
+sweep follow it), and stock changes are tracked by the ledger instead.
+"""
+import uuid
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.product import Product, StockMovement
+
+OPENING = "opening"
+SALE = "sale"
+VOID = "void"
+ADJUSTMENT = "adjustment"
+SYNC = "sync"
+
+_products = Product.__table__
+_movements = StockMovement.__table__
+
+# (product_id, signed quantity, via_product_id)
+Move = tuple[str, int, str | None]
+
+
+def recipe_draws(entry, units: float) -> list[Move]:
+    """Stock drawn by selling `units` of a catalog entry (negative quantities).
+
+    Recipe products consume their components instead of themselves;
+    sell-by-weight products aren't stock-tracked.
+    """
+    if entry.components:
+        return [
+            (c.component_id, -int(c.quantity * units), entry.id)
+            for c in entry.components
+            if not c.sell_by_weight
+        ]
+    if entry.sell_by_weight:
+        return []
+    return [(entry.id, -int(units), None)]
+
+
+def apply_movements(
+    db: Session,
+    kind: str,
+    moves: Iterable[Move],
+    ref_id: str | None = None,
+    user_id: str | None = None,
+) -> dict[str, int]:
+    """Append moves to the ledger and apply them to products.stock.
+
+    Runs in the caller's transaction. Returns the net delta per product.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "product_id": pid,
+            "quantity": qty,
+            "kind": kind,
+            "via_product_id": via,
+            "ref_id": ref_id,
+            "user_id": user_id,
+            "created_at": now,
+        }
+        for pid, qty, via in moves
+        if qty
+    ]
+    if not rows:
+        return {}
+    deltas: dict[str, int] = {}
+    for row in rows:
+        deltas[row["product_id"]] = deltas.get(row["product_id"], 0) + row["quantity"]
+
+    db.execute(_movements.insert(), rows)
+    db.execute(
+        update(_products)
+        .where(_products.c.id == bindparam("pid"))
+        .values(stock=_products.c.stock + bindparam("delta"), updated_at=_products.c.updated_at),
+        [{"pid": pid, "delta": delta} for pid, delta in deltas.items() if delta],
+    )
+    return deltas
+
+
+def _lock_stock(db: Session, product_id: str) -> int | None:
+    """Current stock, read through a no-op UPDATE so the row (SQLite: the
+    database) stays write-locked until commit and no sale can interleave."""
+    return db.execute(
+        update(_products)
+        .where(_products.c.id == product_id)
+        .values(stock=_products.c.stock, updated_at=_products.c.updated_at)
+        .returning(_products.c.stock)
+    ).scalar()
+
+
+def adjust_product_stock(
+    db: Session,
+    product_id: str,
+    quantity: int,
+    kind: str = ADJUSTMENT,
+    ref_id: str | None = None,
+    user_id: str | None = None,
+    clamp: bool = True,
+) -> tuple[int, int] | None:
+    """Add `quantity` (may be negative) to one product, never below zero when
+    `clamp`. Returns (old, new) stock, or None if the product doesn't exist.
+    The ledger records the delta actually applied."""
+    old = _lock_stock(db, product_id)
+    if old is None:
+        return None
+    new = max(old + quantity, 0) if clamp else old + quantity
+    apply_movements(db, kind, [(product_id, new - old, None)], ref_id=ref_id, user_id=user_id)
+    return old, new
+
+
+def set_product_stock(
+    db: Session,
+    product_id: str,
+    stock: int,
+    kind: str = ADJUSTMENT,
+    ref_id: str | None = None,
+    user_id: str | None = None,
+) -> tuple[int, int] | None:
+    """Set one product's stock to an absolute count (physical recount)."""
+    old = _lock_stock(db, product_id)
+    if old is None:
+        return None
+    apply_movements(db, kind, [(product_id, stock - old, None)], ref_id=ref_id, user_id=user_id)
+    return old, stock
+
+
+def rebuild_stock(db: Session) -> int:
+    """Recompute products.stock from the ledger. Returns how many products
+    were out of step with it. Caller commits."""
+    ledger = (
+        select(func.coalesce(func.sum(_movements.c.quantity), 0))
+        .where(_movements.c.product_id == _products.c.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(_products).where(_products.c.stock != ledger).values(stock=ledger, updated_at=_products.c.updated_at)
+    )
+    return result.rowcount
+
+
+def seed_opening_balances(db: Session) -> int:
+    """Give an existing database a ledger: one opening movement per product
+    whose stock isn't yet backed by movements. Idempotent. Caller commits."""
+    ledger = (
+        select(_movements.c.product_id, func.sum(_movements.c.quantity).label("qty"))
+        .group_by(_movements.c.product_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(_products.c.id, _products.c.stock - func.coalesce(ledger.c.qty, 0))
+        .outerjoin(ledger, ledger.c.product_id == _products.c.id)
+        .where(_products.c.stock != func.coalesce(ledger.c.qty, 0))
+    ).all()
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+    db.execute(_movements.insert(), [
+        {"id": str(uuid.uuid4()), "product_id": pid, "quantity": qty, "kind": OPENING, "created_at": now}
+        for pid, qty in rows
+    ])
+    return len(rows)
@@ -7,22 +7,40 @@ Sync service for local ↔ cloud data synchronization.
 Runs as a background task every SYNC_INTERVAL_SECONDS when online.
 """
 import asyncio
+import gzip
+import json
 import logging
+import time
 from datetime import datetime, timezone
 
 import httpx
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, select, tuple_, update
+from sqlalchemy.orm import Session, selectinload
 
 from app.config import get_settings
 from app.database import SessionLocal
 from app.models.sync import SyncMeta
 from app.models.sale import Sale, SaleItem
-from app.models.product import Product, Category, ProductBarcode, VolumePromo
+from app.models.product import (
+    Product, Category, ProductBarcode, VolumePromo, ProductComponent, ProductTicketAlias, StockAdjustment, StockMovement,
+)
 from app.models.finance import FinanceEntry
+from app.models.supplier import Supplier
+from app.services.catalog import catalog
+from app.services.inventory import inventory
+from app.services import tombstones
+from app.services.stock import SYNC, apply_movements
+from app.services.writer import run_write
 
 logger = logging.getLogger("sync")
 settings = get_settings()
 
+PULL_PAGE_SIZE = 1000
+PULL_CHUNK_ROWS = 500
+PUSH_CHUNK_SALES = 200
+PUSH_CHUNK_ITEMS = 2000
+
+
 def _sync_headers() -> dict:
     """Return auth headers for VPS sync calls."""
     if settings.sync_api_key:
@@ -48,137 +66,544 @@ def _set_meta(db: Session, key: str, result: str):
     db.commit()
 
 
+# Product columns the cloud owns (stock is local: new products get their
+# initial stock through the ledger, existing ones keep theirs)
+_PULL_DEFAULTS = {
+    "name": None, "barcode": None, "price": None,
+    "description": "", "brand": None, "category_id": None, "supplier_id": None, "cost": 0.0, "min_stock": 5,
+    "image_url": "", "is_active": True, "is_favorite": False, "sell_by_weight": False,
+}
+_products = Product.__table__
+_categories = Category.__table__
+_packs = ProductBarcode.__table__
+
+# Recipes pulled before one of their component products: parent id ->
+# [[component_id, quantity], ...]. Retried after every page, and on the next
+# sync if the component only shows up then.
+_waiting_recipes: dict[str, list] = {}
+
+
+def _insert(db: Session, table):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def _remote_time(value: str | None) -> datetime | None:
+    """Cloud timestamp (ISO string) as naive UTC, like local columns."""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def _apply_categories(db: Session, categories: list[dict]) -> int:
+    """Upsert the categories that differ from the local ones. Returns how many."""
+    local = {cid: (name, color) for cid, name, color in db.execute(select(Category.id, Category.name, Category.color))}
+    rows = [
+        {"id": c["id"], "name": c["name"], "color": c.get("color", "#3B82F6")}
+        for c in categories
+        if local.get(c["id"]) != (c["name"], c.get("color", "#3B82F6"))
+    ]
+    if rows:
+        stmt = _insert(db, _categories)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_categories.c.id],
+            set_={"name": stmt.excluded.name, "color": stmt.excluded.color},
+        )
+        db.execute(stmt, rows)
+    return len(rows)
+
+
+def _diff_keyed(db: Session, owner, key, value, owners: list[str], wanted: dict[tuple, float]) -> None:
+    """Make a child table's rows for ``owners`` match ``wanted``, a
+    {(owner id, natural key): value} map: one SELECT, then at most one
+    DELETE, one executemany UPDATE and one executemany INSERT."""
+    model = owner.class_
+    seen, stale, changed = set(), [], []
+    for row_id, owner_id, row_key, row_value in db.execute(
+        select(model.id, owner, key, value).where(owner.in_(owners))
+    ):
+        k = (owner_id, row_key)
+        if k not in wanted or k in seen:  # gone, or a second row for the same key
+            stale.append(row_id)
+        elif row_value != wanted[k]:
+            changed.append({"id": row_id, value.key: wanted[k]})
+        seen.add(k)
+    if stale:
+        db.execute(delete(model).where(model.id.in_(stale)))
+    if changed:
+        db.execute(update(model), changed)
+    new = [{owner.key: o, key.key: k, value.key: v} for (o, k), v in wanted.items() if (o, k) not in seen]
+    if new:
+        db.execute(insert(model), new)
+
+
+def _apply_packs(db: Session, products: list[dict]) -> None:
+    """Pack barcodes, by barcode. Barcodes are unique across products, so a
+    pack that moved to another product is upserted on the barcode rather
+    than deleted from one and inserted into the other."""
+    wanted = {bc: (p["id"], int(units), float(price)) for p in products for bc, units, price in p["barcodes"]}
+    local = {
+        bc: (pid, units, price)
+        for bc, pid, units, price in db.execute(
+            select(ProductBarcode.barcode, ProductBarcode.product_id, ProductBarcode.units, ProductBarcode.pack_price)
+            .where(ProductBarcode.product_id.in_([p["id"] for p in products]))
+        )
+    }
+    stale = [bc for bc in local if bc not in wanted]
+    if stale:
+        db.execute(delete(ProductBarcode).where(ProductBarcode.barcode.in_(stale)))
+    rows = [
+        {"barcode": bc, "product_id": pid, "units": units, "pack_price": price}
+        for bc, (pid, units, price) in wanted.items()
+        if local.get(bc) != (pid, units, price)
+    ]
+    if rows:
+        stmt = _insert(db, _packs)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_packs.c.barcode],
+            set_={col: stmt.excluded[col] for col in ("product_id", "units", "pack_price")},
+        )
+        db.execute(stmt, rows)
+
+
+def _apply_recipes(db: Session, recipes: dict[str, list]) -> dict[str, list]:
+    """Recipe components, by (parent_id, component_id). A recipe naming a
+    product this store doesn't have yet is left whole for later; returns
+    those."""
+    if not recipes:
+        return {}
+    needed = set(recipes) | {cid for components in recipes.values() for cid, _qty in components}
+    present = set(db.scalars(select(Product.id).where(Product.id.in_(needed))))
+    ready = {
+        pid: components for pid, components in recipes.items()
+        if pid in present and all(cid in present for cid, _qty in components)
+    }
+    if ready:
+        _diff_keyed(
+            db, ProductComponent.parent_id, ProductComponent.component_id, ProductComponent.quantity, list(ready),
+            {(pid, cid): float(qty) for pid, components in ready.items() for cid, qty in components},
+        )
+    # A parent deleted meanwhile has nothing left to wait for
+    return {pid: components for pid, components in recipes.items() if pid in present and pid not in ready}
+
+
+def _apply_children(db: Session, products: list[dict]) -> dict[str, list]:
+    """Make each product's pack barcodes, volume promos and recipe match the
+    arrays the cloud sent, set-based across the chunk. Products without an
+    array (an older cloud) keep those rows as they are. Returns the recipes
+    left waiting for a component (see _apply_recipes)."""
+    with_packs = [p for p in products if "barcodes" in p]
+    if with_packs:
+        _apply_packs(db, with_packs)
+    with_promos = [p for p in products if "promos" in p]
+    if with_promos:
+        _diff_keyed(
+            db, VolumePromo.product_id, VolumePromo.min_units, VolumePromo.promo_price, [p["id"] for p in with_promos],
+            {(p["id"], int(units)): float(price) for p in with_promos for units, price in p["promos"]},
+        )
+    return _apply_recipes(db, {p["id"]: p["components"] for p in products if "components" in p})
+
+
+def _apply_products(db: Session, chunk: list[dict]) -> tuple[list[str], list[str], dict[str, list]]:
+    """Upsert one chunk of cloud products, and their packs, promos and
+    recipes, in the caller's transaction.
+
+    Rows whose cloud updated_at is not newer than the stamp recorded at the
+    last pull are skipped. Returns (created ids, updated ids, recipes left
+    waiting for a component).
+    """
+    ids = [p["id"] for p in chunk]
+    known = dict(db.execute(select(Product.id, Product.remote_updated_at).where(Product.id.in_(ids))).all())
+    # Suppliers aren't synced: link the ones this store has
+    supplier_ids = {p["supplier_id"] for p in chunk if p.get("supplier_id")}
+    suppliers = set(db.scalars(select(Supplier.id).where(Supplier.id.in_(supplier_ids)))) if supplier_ids else set()
+    now = datetime.utcnow()
+    rows, applied, created, updated = [], [], [], []
+    opening = []  # new products' initial stock, applied through the ledger
+    for p_data in chunk:
+        remote = _remote_time(p_data.get("updated_at"))
+        pid = p_data["id"]
+        if pid in known:
+            stamp = known[pid]
+            if remote is not None and stamp is not None and remote <= stamp:
+                continue
+            updated.append(pid)
+        else:
+            created.append(pid)
+            opening.append((pid, int(p_data.get("stock", 0)), None))
+        row = {field: p_data.get(field, default) for field, default in _PULL_DEFAULTS.items()}
+        row.update(id=pid, stock=0, created_at=now, updated_at=now, remote_updated_at=remote)
+        if row["supplier_id"] not in suppliers:
+            row["supplier_id"] = None
+        rows.append(row)
+        applied.append(p_data)
+    if rows:
+        stmt = _insert(db, _products)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_products.c.id],
+            set_={col: stmt.excluded[col] for col in (*_PULL_DEFAULTS, "updated_at", "remote_updated_at")},
+        )
+        db.execute(stmt, rows)
+        apply_movements(db, SYNC, opening)
+    return created, updated, _apply_children(db, applied)
+
+
+def _remove_products(db: Session, ids: list[str]) -> tuple[int, int]:
+    """Delete products the cloud deleted, with their child rows and ledger.
+    Products this store still references (sales, stock adjustments, a local
+    recipe) are deactivated instead, as the cloud does. Returns (deleted,
+    deactivated)."""
+    keep = set(db.scalars(select(SaleItem.product_id).where(SaleItem.product_id.in_(ids))))
+    keep.update(db.scalars(select(StockAdjustment.product_id).where(StockAdjustment.product_id.in_(ids))))
+    keep.update(db.scalars(select(ProductComponent.component_id).where(
+        ProductComponent.component_id.in_(ids), ProductComponent.parent_id.not_in(ids),
+    )))
+    gone = [pid for pid in ids if pid not in keep]
+    if keep:
+        db.execute(update(Product).where(Product.id.in_(keep)).values(is_active=False))
+    if gone:
+        for model, column in (
+            (ProductBarcode, ProductBarcode.product_id),
+            (VolumePromo, VolumePromo.product_id),
+            (ProductTicketAlias, ProductTicketAlias.product_id),
+            (ProductComponent, ProductComponent.parent_id),
+            (ProductComponent, ProductComponent.component_id),
+            (StockMovement, StockMovement.product_id),
+        ):
+            db.execute(delete(model).where(column.in_(gone)))
+        db.execute(delete(Product).where(Product.id.in_(gone)))
+    return len(gone), len(keep)
+
+
+_CHILD_ENTITIES = (tombstones.BARCODE, tombstones.PROMO, tombstones.COMPONENT)
+
+
+def _apply_tombstones(db: Session, chunk: list[dict]) -> tuple[int, list[str]]:
+    """Apply one chunk of cloud deletions in the caller's transaction, by
+    natural key, a few set-based statements per entity. Rows of a product
+    pulled after the deletion (remote_updated_at newer) are left alone: it
+    came with its full set of children, maybe one re-added since.
+    Returns (rows deleted or deactivated, product ids affected)."""
+    owners = {t["product_id"] for t in chunk if t["entity"] in _CHILD_ENTITIES}
+    stamps = {}
+    if owners:
+        stamps = dict(db.execute(select(Product.id, Product.remote_updated_at).where(Product.id.in_(owners))).all())
+    by_entity: dict[str, list[dict]] = {}
+    for t in chunk:
+        stamp = stamps.get(t["product_id"]) if t["entity"] in _CHILD_ENTITIES else None
+        if stamp is not None and stamp > _remote_time(t["deleted_at"]):
+            continue
+        by_entity.setdefault(t["entity"], []).append(t)
+    applied = 0
+    touched: set[str] = set()
+
+    for entity, model, column in (
+        (tombstones.BARCODE, ProductBarcode, ProductBarcode.barcode),
+        (tombstones.PROMO, VolumePromo, VolumePromo.min_units),
+        (tombstones.COMPONENT, ProductComponent, ProductComponent.component_id),
+    ):
+        rows = by_entity.get(entity, [])
+        if not rows:
+            continue
+        owner = ProductComponent.parent_id if model is ProductComponent else model.product_id
+        keys = {(t["product_id"], int(t["key"]) if entity == tombstones.PROMO else t["key"]) for t in rows}
+        applied += db.execute(delete(model).where(tuple_(owner, column).in_(keys))).rowcount
+        touched.update(pid for pid, _key in keys)
+
+    rows = by_entity.get(tombstones.PRODUCT, [])
+    if rows:
+        deleted_at = {t["key"]: _remote_time(t["deleted_at"]) for t in rows}
+        local = db.execute(select(Product.id, Product.remote_updated_at).where(Product.id.in_(deleted_at))).all()
+        ids = [pid for pid, stamp in local if stamp is None or stamp <= deleted_at[pid]]
+        if ids:
+            removed, deactivated = _remove_products(db, ids)
+            applied += removed + deactivated
+            touched.update(ids)
+
+    rows = by_entity.get(tombstones.CATEGORY, [])
+    if rows:
+        ids = [t["key"] for t in rows]
+        db.execute(update(Product).where(Product.category_id.in_(ids)).values(category_id=None))
+        db.execute(update(Category).where(Category.parent_id.in_(ids)).values(parent_id=None))
+        applied += db.execute(delete(Category).where(Category.id.in_(ids))).rowcount
+    return applied, sorted(touched)
+
+
+def _apply_page(db: Session, payload: dict) -> tuple[int, list[str], list[str], int, int, list[str]]:
+    """Apply one feed page: categories, then products with their child rows,
+    then deletions, each in PULL_CHUNK_ROWS write jobs. Returns (categories changed, created,
+    updated, received, deletions applied, ids the deletions touched)."""
+    categories = run_write(db, lambda session: _apply_categories(session, payload.get("categories", [])))
+    # Last one wins for an id sent twice (one upsert can't touch a row twice)
+    products_data = list({p["id"]: p for p in payload.get("products", [])}.values())
+    created: list[str] = []
+    updated: list[str] = []
+    for n in range(0, len(products_data), PULL_CHUNK_ROWS):
+        chunk = products_data[n:n + PULL_CHUNK_ROWS]
+        new, changed, waiting = run_write(db, lambda session: _apply_products(session, chunk))
+        created += new
+        updated += changed
+        for pid in new + changed:  # a newer recipe replaces one still waiting
+            _waiting_recipes.pop(pid, None)
+        _waiting_recipes.update(waiting)
+    if _waiting_recipes:
+        recipes = dict(_waiting_recipes)
+        still_waiting = run_write(db, lambda session: _apply_recipes(session, recipes))
+        _waiting_recipes.clear()
+        _waiting_recipes.update(still_waiting)
+    # After the upserts: a row created and deleted between two syncs ends up deleted
+    deleted_data = payload.get("deleted", [])
+    deleted = 0
+    removed: list[str] = []
+    for n in range(0, len(deleted_data), PULL_CHUNK_ROWS):
+        chunk = deleted_data[n:n + PULL_CHUNK_ROWS]
+        count, ids = run_write(db, lambda session: _apply_tombstones(session, chunk))
+        deleted += count
+        removed += ids
+    return categories, created, updated, len(products_data), deleted, removed
+
+
+def _invalidate_pulled(categories: int, touched: list[str]) -> None:
+    if categories or len(touched) > PULL_CHUNK_ROWS:
+        catalog.invalidate()
+        inventory.invalidate()
+    elif touched:
+        catalog.invalidate(touched)
+        inventory.invalidate(touched)
+
+
+def _in_session(bind, fn, *args):
+    """Run ``fn(session, *args)`` in a session of its own, for the worker
+    thread the async sync steps hand database work to."""
+    with Session(bind=bind) as session:
+        return fn(session, *args)
+
+
+def _pull_position(db: Session) -> tuple[str | None, str]:
+    """(saved feed cursor, start time for a pull without one)."""
+    meta = _get_meta(db, "pull_products")
+    # Without a cursor (first pull, or a cloud without the paged feed) start
+    # from the last pull's time, as before
+    since = meta.last_synced_at.isoformat() if meta.last_synced_at and not meta.cursor else ""
+    return meta.cursor, since
+
+
+def _save_cursor(db: Session, cursor: str) -> None:
+    meta = _get_meta(db, "pull_products")
+    meta.cursor = cursor
+    db.commit()
+
+
 async def pull_products(db: Session) -> str:
-    """Pull products and categories from cloud → local."""
+    """Pull products (with their pack barcodes, volume promos and recipes)
+    and categories from cloud → local.
+
+    Follows the cloud's change feed page by page (PULL_PAGE_SIZE products
+    each) until it is caught up, saving the feed cursor after every page, so
+    any catalog size syncs in bounded memory and an interrupted pull resumes
+    where it stopped. Pages are applied with set-based upserts (INSERT ...
+    ON CONFLICT DO UPDATE), one write transaction per PULL_CHUNK_ROWS
+    products through the group-commit writer, so checkout never waits long
+    for the database. Products the cloud hasn't changed since the last pull
+    are skipped; the child rows of the rest are diffed by natural key in
+    the same transaction. Deletions come as tombstones after the rows and
+    are applied by natural key, so stores converge without a full re-pull.
+
+    Database work runs in a worker thread with its own session, so the event
+    loop (SSE streams, checkout responses) keeps serving while a page is
+    applied. ``db`` only supplies the engine.
+    """
     headers = _sync_headers()
     if not headers:
         return "no_sync_key"
 
-    meta = _get_meta(db, "pull_products")
-    since = meta.last_synced_at.isoformat() if meta.last_synced_at else ""
-    params = {"limit": 5000}
-    if since:
-        params["updated_since"] = since
+    bind = db.get_bind()
+    cursor, since = await asyncio.to_thread(_in_session, bind, _pull_position)
 
+    categories = pages = received = deleted = 0
+    created: list[str] = []
+    updated: list[str] = []
+    removed: list[str] = []
+    fetch_seconds = apply_seconds = 0.0
     try:
         async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.get(f"{settings.cloud_api_url}/sync/products", headers=headers, params=params)
-            if r.status_code != 200:
-                return f"error_{r.status_code}"
-
-            payload = r.json()
-
-            for cat_data in payload.get("categories", []):
-                cat = db.query(Category).filter(Category.id == cat_data["id"]).first()
-                if cat:
-                    cat.name = cat_data["name"]
-                    cat.color = cat_data.get("color", "#3B82F6")
-                else:
-                    db.add(Category(
-                        id=cat_data["id"],
-                        name=cat_data["name"],
-                        color=cat_data.get("color", "#3B82F6"),
-                    ))
-            db.commit()
-
-            products_data = payload.get("products", [])
-            updated = 0
-            created = 0
-
-            for p_data in products_data:
-                product = db.query(Product).filter(Product.id == p_data["id"]).first()
-                if product:
-                    for field in ["name", "barcode", "description", "brand", "category_id",
-                                  "price", "cost", "min_stock", "image_url", "is_active",
-                                  "is_favorite", "sell_by_weight"]:
-                        setattr(product, field, p_data.get(field, getattr(product, field)))
-                    updated += 1
-                else:
-                    db.add(Product(
-                        id=p_data["id"],
-                        barcode=p_data["barcode"],
-                        name=p_data["name"],
-                        description=p_data.get("description", ""),
-                        brand=p_data.get("brand"),
-                        category_id=p_data.get("category_id"),
-                        price=p_data["price"],
-                        cost=p_data.get("cost", 0),
-                        stock=p_data.get("stock", 0),
-                        min_stock=p_data.get("min_stock", 5),
-                        image_url=p_data.get("image_url", ""),
-                        is_active=p_data.get("is_active", True),
-                        is_favorite=p_data.get("is_favorite", False),
-                        sell_by_weight=p_data.get("sell_by_weight", False),
-                    ))
-                    created += 1
-
-            db.commit()
-            result = f"ok: {created} nuevos, {updated} actualizados"
-            _set_meta(db, "pull_products", result)
-            return result
-
+            while True:
+                params = {"limit": PULL_PAGE_SIZE}
+                if cursor:
+                    params["cursor"] = cursor
+                elif since:
+                    params["updated_since"] = since
+                started = time.perf_counter()
+                r = await client.get(f"{settings.cloud_api_url}/sync/products", headers=headers, params=params)
+                if r.status_code != 200:
+                    return f"error_{r.status_code}"
+                payload = r.json()
+                fetched = time.perf_counter()
+
+                (page_categories, page_created, page_updated, page_received, page_deleted,
+                 page_removed) = await asyncio.to_thread(_in_session, bind, _apply_page, payload)
+                categories += page_categories
+                created += page_created
+                updated += page_updated
+                received += page_received
+                deleted += page_deleted
+                removed += page_removed
+                pages += 1
+                fetch_seconds += fetched - started
+                apply_seconds += time.perf_counter() - fetched
+
+                cursor = payload.get("next_cursor")
+                if not cursor:
+                    break  # cloud without the paged feed: one page
+                await asyncio.to_thread(_in_session, bind, _save_cursor, cursor)
+                if not payload.get("has_more"):
+                    break
     except Exception as e:
         logger.error(f"pull_products error: {e}")
         return f"error: {e}"
+    finally:
+        _invalidate_pulled(categories, created + updated + removed)
+
+    skipped = received - len(created) - len(updated)
+    result = (
+        f"ok: {len(created)} nuevos, {len(updated)} actualizados, {skipped} sin cambios, "
+        f"{categories} categorías en {pages} página(s)"
+        + (f", {deleted} eliminados" if deleted else "")
+        + (f", {len(_waiting_recipes)} recetas esperando componentes" if _waiting_recipes else "")
+        + f"; descarga {fetch_seconds * 1000:.0f} ms, aplicado {apply_seconds * 1000:.0f} ms"
+    )
+    await asyncio.to_thread(_in_session, bind, _set_meta, "pull_products", result)
+    return result
+
+
+def _sale_payload(sale: Sale) -> dict:
+    return {
+        "id": sale.id,
+        "store_id": sale.store_id,
+        "subtotal": sale.subtotal,
+        "tax": sale.tax,
+        "total": sale.total,
+        "payment_method": sale.payment_method,
+        "cash_received": sale.cash_received,
+        "change_given": sale.change_given,
+        "status": sale.status,
+        "created_at": sale.created_at.isoformat(),
+        "items": [
+            {
+                "product_id": item.product_id,
+                "product_name": item.product_name,
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+                "discount_percent": item.discount_percent,
+                "line_total": item.line_total,
+                "pack_units": item.pack_units,
+                "unit_cost": item.unit_cost,
+            }
+            for item in sale.items
+        ],
+    }
+
+
+def _unsynced_chunk(db: Session, after: tuple | None) -> list[Sale]:
+    """Next unsynced sales in (created_at, id) order, items loaded: at most
+    PUSH_CHUNK_SALES sales, cut short once PUSH_CHUNK_ITEMS lines are in."""
+    q = (
+        db.query(Sale)
+        .options(selectinload(Sale.items))
+        .filter(Sale.synced_at == None)  # noqa
+        .order_by(Sale.created_at, Sale.id)
+    )
+    if after is not None:
+        q = q.filter(tuple_(Sale.created_at, Sale.id) > after)
+    chunk, lines = [], 0
+    for sale in q.limit(PUSH_CHUNK_SALES).all():
+        if chunk and lines + len(sale.items) > PUSH_CHUNK_ITEMS:
+            break
+        chunk.append(sale)
+        lines += len(sale.items)
+    return chunk
+
+
+def _mark_synced(db: Session, ids: list[str]) -> None:
+    db.execute(update(Sale).where(Sale.id.in_(ids)).values(synced_at=datetime.now(timezone.utc)))
+    db.commit()
+
+
+async def _push_one_by_one(client: httpx.AsyncClient, headers: dict, sales: list[Sale]) -> list[str]:
+    """Legacy path for cloud servers without the batch endpoint. Returns the
+    ids the server accepted (or already had); the caller marks them synced.
+    ``sales`` are detached with their items loaded, so nothing here touches
+    the database."""
+    accepted = []
+    for sale in sales:
+        try:
+            r = await client.post(f"{settings.cloud_api_url}/sales/sync-import", json=_sale_payload(sale), headers=headers)
+        except httpx.HTTPError as e:
+            logger.error(f"push sale {sale.id} error: {e}")
+            continue
+        if r.status_code in (200, 201, 409):  # 409 = already exists, that's ok
+            accepted.append(sale.id)
+        else:
+            logger.warning(f"push sale {sale.id} failed: {r.status_code}")
+    return accepted
 
 
 async def push_sales(db: Session) -> str:
-    """Push unsynced local sales → cloud."""
+    """Push unsynced local sales → cloud.
+
+    Sales go in gzip-compressed chunks to /sales/sync-import/batch, which
+    imports each chunk in one transaction and skips ids it already has, so
+    a chunk whose response was lost is simply resent. synced_at is set per
+    chunk; a failed chunk stops the push and is retried on the next cycle.
+
+    Each chunk's read and its synced_at update run in a worker thread with
+    a session of their own, as in pull_products; ``db`` only supplies the
+    engine.
+    """
     headers = _sync_headers()
     if not headers:
         return "no_sync_key"
 
-    unsynced = db.query(Sale).filter(Sale.synced_at == None).all()  # noqa
-    if not unsynced:
-        return "ok: nothing to sync"
     pushed = 0
     errors = 0
-
-    async with httpx.AsyncClient(timeout=30) as client:
-        for sale in unsynced:
-            payload = {
-                "id": sale.id,
-                "store_id": sale.store_id,
-                "subtotal": sale.subtotal,
-                "tax": sale.tax,
-                "total": sale.total,
-                "payment_method": sale.payment_method,
-                "cash_received": sale.cash_received,
-                "change_given": sale.change_given,
-                "status": sale.status,
-                "created_at": sale.created_at.isoformat(),
-                "items": [
-                    {
-                        "product_id": item.product_id,
-                        "product_name": item.product_name,
-                        "quantity": item.quantity,
-                        "unit_price": item.unit_price,
-                        "discount_percent": item.discount_percent,
-                        "line_total": item.line_total,
-                        "pack_units": item.pack_units,
-                    }
-                    for item in sale.items
-                ],
-            }
+    after = None
+    batch_headers = {**headers, "Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+    bind = db.get_bind()
+    async with httpx.AsyncClient(timeout=60) as client:
+        while True:
+            chunk = await asyncio.to_thread(_in_session, bind, _unsynced_chunk, after)
+            if not chunk:
+                break
+            after = (chunk[-1].created_at, chunk[-1].id)
+            body = gzip.compress(json.dumps({"sales": [_sale_payload(s) for s in chunk]}).encode())
             try:
-                r = await client.post(
-                    f"{settings.cloud_api_url}/sales/sync-import",
-                    json=payload,
-                    headers=headers,
-                )
-                if r.status_code in (200, 201, 409):  # 409 = already exists, that's ok
-                    sale.synced_at = datetime.now(timezone.utc)
-                    pushed += 1
-                else:
-                    errors += 1
-                    logger.warning(f"push sale {sale.id} failed: {r.status_code}")
-            except Exception as e:
-                errors += 1
-                logger.error(f"push sale {sale.id} error: {e}")
-
-    db.commit()
+                r = await client.post(f"{settings.cloud_api_url}/sales/sync-import/batch", content=body, headers=batch_headers)
+            except httpx.HTTPError as e:
+                logger.error(f"push sales chunk error: {e}")
+                errors += len(chunk)
+                break
+            if r.status_code == 404:
+                accepted = await _push_one_by_one(client, headers, chunk)
+            elif r.status_code == 200:
+                accepted = [s.id for s in chunk]
+            else:
+                logger.warning(f"push sales chunk failed: {r.status_code}")
+                errors += len(chunk)
+                break
+            errors += len(chunk) - len(accepted)
+            if accepted:
+                await asyncio.to_thread(_in_session, bind, _mark_synced, accepted)
+                pushed += len(accepted)
+
+    if not pushed and not errors:
+        return "ok: nothing to sync"
     result = f"ok: {pushed} pushed, {errors} errors"
-    _set_meta(db, "push_sales", result)
+    await asyncio.to_thread(_in_session, bind, _set_meta, "push_sales", result)
     return result
 
 
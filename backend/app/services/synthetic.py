@@ -0,0 +1,398 @@
+"""Deterministic synthetic store data for load tests and benchmarks.
+
+generate() fills a database with a realistic catalog and sales history:
+categories, products with brands, pack barcodes, volume promos and
+made-to-order recipes, cashiers, and sales following an hourly and weekly
+traffic curve with Zipf-distributed product popularity, voids and daily
+finance entries. The same config and seed always produce the same rows.
+
+Everything is written with executemany INSERTs in chunks, bypassing the
+ORM, so millions of sale items take minutes rather than hours. The derived
+tables are kept consistent the way the API would leave them:
+
+- Lines are priced like checkout (pack prices, volume promo bundles) and
+  carry the product's cost as their unit_cost snapshot.
+- Stock goes through the ledger: one opening movement per product plus one
+  aggregated sale movement per product and day, so products.stock equals
+  SUM(stock_movements.quantity). Recipes draw from their components.
+- The hourly sales rollup is rebuilt at the end.
+
+Used by scripts/generate_synthetic_data.py and the benchmark fixtures.
+"""
+import math
+import random
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import Base
+from app.models.finance import FinanceEntry
+from app.models.product import Category, Product, ProductBarcode, ProductComponent, StockMovement, VolumePromo
+from app.models.sale import Sale, SaleItem
+from app.models.store import Store
+from app.models.user import User
+from app.services.auth import hash_password
+from app.services.pricing import BundleTable
+from app.services.rollup import rebuild_rollup
+from app.services.stock import OPENING, SALE
+from app.services.timebucket import local_today, to_utc
+
+settings = get_settings()
+
+CHUNK_ROWS = 20_000
+
+# Relative traffic by store-local hour (store opens 7:00, closes 23:00)
+HOURLY_TRAFFIC = [0, 0, 0, 0, 0, 0, 0, 2, 4, 5, 5, 6, 8, 9, 8, 6, 6, 7, 9, 11, 12, 10, 6, 3]
+# Monday .. Sunday
+WEEKDAY_TRAFFIC = [0.85, 0.85, 0.9, 0.95, 1.2, 1.35, 1.1]
+PAYMENT_METHODS = (("cash", 70), ("card", 25), ("mixed", 5))
+QUANTITIES = ((1, 60), (2, 20), (3, 9), (4, 5), (6, 4), (12, 2))
+
+CATEGORY_NAMES = [
+    "Cervezas", "Refrescos", "Botanas", "Dulces", "Abarrotes", "Lacteos", "Panaderia", "Limpieza",
+    "Higiene", "Cigarros", "Vinos y Licores", "Congelados", "Carnes frias", "Frutas y Verduras",
+    "Bebidas preparadas", "Mascotas", "Papeleria", "Farmacia", "Hielo", "Desechables",
+]
+BRANDS = ["Corona", "Tecate", "Modelo", "Victoria", "Indio", "XX Lager", "Heineken", "Carta Blanca"]
+WORDS = [
+    "Clasico", "Light", "Original", "Familiar", "Mini", "Extra", "Natural", "Picante", "Limon", "Fresa",
+    "Chocolate", "Vainilla", "Integral", "Premium", "Economico", "Grande", "Chico", "Mediano", "Mango", "Chile",
+]
+SIZES = ["355ml", "473ml", "600ml", "1L", "2L", "45g", "62g", "170g", "340g", "500g", "1kg", "pza"]
+EXPENSES = (("proveedores", 40, 800, 6000), ("servicios", 10, 300, 2500), ("nomina", 8, 1200, 3000),
+            ("transporte", 8, 50, 400), ("mantenimiento", 5, 100, 1500), ("varios", 10, 20, 500))
+INCOMES = (("ventas_tarjeta", 15, 500, 5000), ("otros_ingresos", 4, 50, 800))
+
+
+@dataclass
+class SyntheticConfig:
+    seed: int = 42
+    products: int = 2000
+    categories: int = 20
+    pack_share: float = 0.15        # products with 6/12/24 pack barcodes
+    promo_share: float = 0.10       # products with volume promo tiers
+    recipes: int = 20               # made-to-order products (2-3 components each)
+    weight_share: float = 0.03      # products sold by weight
+    cashiers: int = 4
+    days: int = 90
+    end: date | None = None         # last store-local day (default: today)
+    sales_per_day: int = 400        # average; shaped by WEEKDAY_TRAFFIC
+    items_per_sale: float = 3.0     # mean distinct lines per sale
+    void_rate: float = 0.02
+    finance_per_day: float = 3.0
+    hourly_traffic: list[int] = field(default_factory=lambda: list(HOURLY_TRAFFIC))
+    weekday_traffic: list[float] = field(default_factory=lambda: list(WEEKDAY_TRAFFIC))
+
+
+@dataclass
+class _Item:
+    id: str
+    name: str
+    price: float
+    cost: float
+    by_weight: bool
+    bundle: BundleTable | None = None
+    packs: list[tuple[int, float]] = field(default_factory=list)  # (units, pack_price)
+    components: list[tuple[str, float]] = field(default_factory=list)  # (component id, qty)
+
+
+class _Writer:
+    """Buffers rows per table and inserts them in executemany chunks. When
+    one buffer fills, every buffer is flushed in foreign-key order, so
+    children never go in before their parents."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.buffers: dict = {}
+        self.counts: dict[str, int] = {}
+        self._order = {t: n for n, t in enumerate(Base.metadata.sorted_tables)}
+
+    def add(self, table, row: dict) -> None:
+        rows = self.buffers.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= CHUNK_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        for table in sorted(self.buffers, key=self._order.__getitem__):
+            rows = self.buffers[table]
+            if rows:
+                self.db.execute(table.insert(), rows)
+                self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+                self.buffers[table] = []
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _barcode(n: int) -> str:
+    return f"99{n:011d}"  # outside the real GS1 Mexico range (750)
+
+
+def generate(db: Session, config: SyntheticConfig | None = None, progress: Callable[[str], None] | None = None) -> dict:
+    """Write a synthetic dataset into db and commit. Returns row counts.
+
+    Raises ValueError if the database already has products (barcodes and the
+    stock ledger would clash); point it at an empty database.
+    """
+    config = config or SyntheticConfig()
+    if db.scalar(select(func.count(Product.id))):
+        raise ValueError("Database already has products; generate into an empty database")
+    rng = random.Random(config.seed)
+    log = progress or (lambda _msg: None)
+    started = time.perf_counter()
+    out = _Writer(db)
+    store_id = settings.store_id
+    end = config.end or local_today()
+    first = end - timedelta(days=config.days - 1)
+    opened_at = to_utc(datetime.combine(first, datetime.min.time()))
+
+    # --- Store and staff ---
+    if db.get(Store, store_id) is None:
+        out.add(Store.__table__, {"id": store_id, "name": settings.store_name, "address": "", "phone": "",
+                                  "is_active": True, "created_at": opened_at})
+    password = hash_password("cajero")  # bcrypt is slow: one hash shared by all staff
+    cashiers = []
+    for n in range(config.cashiers):
+        uid = _uuid(rng)
+        cashiers.append(uid)
+        out.add(User.__table__, {
+            "id": uid, "username": f"cajero{n + 1}", "full_name": f"Cajero {n + 1}", "pin_code": f"{n + 1:04d}",
+            "hashed_password": password, "role": "cashier", "store_id": store_id, "is_active": True,
+            "created_at": opened_at,
+        })
+    manager = _uuid(rng)
+    out.add(User.__table__, {
+        "id": manager, "username": "gerente", "full_name": "Gerente", "pin_code": "9999",
+        "hashed_password": password, "role": "manager", "store_id": store_id, "is_active": True,
+        "created_at": opened_at,
+    })
+    out.flush()
+
+    # --- Catalog ---
+    categories = []
+    for n in range(config.categories):
+        name = CATEGORY_NAMES[n % len(CATEGORY_NAMES)] + ("" if n < len(CATEGORY_NAMES) else f" {n // len(CATEGORY_NAMES) + 1}")
+        cid = _uuid(rng)
+        categories.append((cid, name))
+        out.add(Category.__table__, {"id": cid, "name": name, "color": f"#{rng.randrange(0x1000000):06X}",
+                                     "parent_id": None, "favorite_group": False})
+    beer_category = categories[0][0] if categories else None
+
+    items: list[_Item] = []
+    min_stock: dict[str, int] = {}
+    simple = config.products
+    for n in range(simple):
+        pid = _uuid(rng)
+        cid, cat_name = categories[rng.randrange(len(categories))] if categories else (None, "Producto")
+        brand = rng.choice(BRANDS) if cid == beer_category else None
+        by_weight = rng.random() < config.weight_share
+        base = brand or cat_name.split()[0]
+        name = f"{base} {rng.choice(WORDS)} {'kg' if by_weight else rng.choice(SIZES)} #{n + 1}"
+        price = round(rng.lognormvariate(3.2, 0.7), 1) or 1.0  # median ≈ $25
+        cost = round(price * rng.uniform(0.55, 0.8), 2)
+        item = _Item(pid, name, price, cost, by_weight)
+        if not by_weight and rng.random() < config.promo_share:
+            tiers = sorted(rng.sample([2, 3, 4, 6, 8, 10, 12], 2))
+            promos = [(units, round(price * units * (1 - 0.04 * (k + 1)), 2)) for k, units in enumerate(tiers)]
+            for units, promo_price in promos:
+                out.add(VolumePromo.__table__, {"id": _uuid(rng), "product_id": pid, "min_units": units,
+                                                "promo_price": promo_price})
+            item.bundle = BundleTable(price, [_Tier(u, p) for u, p in promos])
+        if not by_weight and rng.random() < config.pack_share:
+            for k, units in enumerate(rng.sample([6, 12, 24], rng.randint(1, 2))):
+                pack_price = round(price * units * 0.92, 2)
+                item.packs.append((units, pack_price))
+                out.add(ProductBarcode.__table__, {"id": _uuid(rng), "product_id": pid,
+                                                   "barcode": _barcode(10_000_000 + n * 4 + k),
+                                                   "units": units, "pack_price": pack_price})
+        items.append(item)
+        min_stock[pid] = rng.choice([0, 2, 3, 5, 5, 10, 12, 24])
+        out.add(Product.__table__, {
+            "id": pid, "barcode": _barcode(n), "name": name, "description": "", "brand": brand,
+            "category_id": cid, "price": price, "cost": cost, "stock": 0, "min_stock": min_stock[pid],
+            "image_url": "", "is_active": True, "is_favorite": rng.random() < 0.01, "sell_by_weight": by_weight,
+            "created_at": opened_at, "updated_at": opened_at, "supplier_id": None,
+        })
+
+    stocked = [it for it in items if not it.by_weight]
+    by_id = {it.id: it for it in stocked}
+    for n in range(config.recipes if stocked else 0):
+        pid = _uuid(rng)
+        components = [(c.id, float(rng.choice([1, 1, 2]))) for c in rng.sample(stocked, min(len(stocked), rng.randint(2, 3)))]
+        cost = round(sum(by_id[c].cost * qty for c, qty in components), 2)
+        price = round(cost * rng.uniform(1.6, 2.2), 0)
+        item = _Item(pid, f"Preparado {rng.choice(WORDS)} #{n + 1}", price, cost, False, components=components)
+        items.append(item)
+        min_stock[pid] = 0
+        out.add(Product.__table__, {
+            "id": pid, "barcode": _barcode(simple + n), "name": item.name, "description": "", "brand": None,
+            "category_id": categories[-1][0] if categories else None, "price": price, "cost": cost, "stock": 0,
+            "min_stock": 0, "image_url": "", "is_active": True, "is_favorite": True, "sell_by_weight": False,
+            "created_at": opened_at, "updated_at": opened_at, "supplier_id": None,
+        })
+        for component_id, qty in components:
+            out.add(ProductComponent.__table__, {"id": _uuid(rng), "parent_id": pid,
+                                                 "component_id": component_id, "quantity": qty})
+    out.flush()
+    log(f"catalog: {len(items)} products, {len(categories)} categories")
+
+    # --- Sales ---
+    # Zipf-like popularity over a shuffled catalog: a few products dominate
+    ranked = items[:]
+    rng.shuffle(ranked)
+    cum_weights, total = [], 0.0
+    for rank in range(len(ranked)):
+        total += 1.0 / (rank + 1) ** 0.9
+        cum_weights.append(total)
+    hours = [h for h in range(24) if config.hourly_traffic[h] > 0]
+    hour_weights = [config.hourly_traffic[h] for h in hours]
+    methods, method_weights = zip(*PAYMENT_METHODS)
+    qtys, qty_weights = zip(*QUANTITIES)
+    extra_lines = max(config.items_per_sale - 1.0, 0.01)
+    sold: dict[str, int] = {}
+    sales_count = items_count = 0
+
+    for day_n in range(config.days):
+        day = first + timedelta(days=day_n)
+        count = int(config.sales_per_day * config.weekday_traffic[day.weekday()] * rng.uniform(0.85, 1.15))
+        midnight = datetime.combine(day, datetime.min.time())
+        moments = sorted(
+            midnight + timedelta(hours=h, seconds=rng.randrange(3600))
+            for h in rng.choices(hours, weights=hour_weights, k=count)
+        )
+        drawn_today: dict[str, int] = {}
+        for local in moments:
+            sale_id = _uuid(rng)
+            created_at = to_utc(local)
+            voided = rng.random() < config.void_rate
+            lines: dict[tuple, list] = {}
+            for item in rng.choices(ranked, cum_weights=cum_weights, k=1 + min(int(rng.expovariate(1 / extra_lines)), 29)):
+                if item.by_weight:
+                    key, qty, pack = (item.id, 0), round(rng.uniform(0.2, 2.0), 3), 1
+                elif item.packs and rng.random() < 0.3:
+                    units, _pack_price = rng.choice(item.packs)
+                    key, qty, pack = (item.id, units), 1, units
+                else:
+                    key, qty, pack = (item.id, 1), rng.choices(qtys, weights=qty_weights)[0], 1
+                line = lines.get(key)
+                if line:
+                    line[1] += qty
+                else:
+                    lines[key] = [item, qty, pack]
+
+            subtotal = 0.0
+            item_rows = []
+            for (_pid, _), (item, qty, pack) in lines.items():
+                if pack > 1:
+                    unit_price = next(p for u, p in item.packs if u == pack)
+                elif item.bundle is not None:
+                    unit_price = item.bundle.unit_price(int(qty))
+                else:
+                    unit_price = item.price
+                line_total = round(unit_price * qty, 2)
+                subtotal += line_total
+                item_rows.append({
+                    "id": _uuid(rng), "sale_id": sale_id, "product_id": item.id, "product_name": item.name,
+                    "quantity": qty, "unit_price": unit_price, "discount_percent": 0.0, "line_total": line_total,
+                    "pack_units": pack, "unit_cost": item.cost,
+                })
+                items_count += 1
+                if voided or item.by_weight:
+                    continue
+                for pid, per_unit in item.components or [(item.id, 1.0)]:
+                    drawn_today[pid] = drawn_today.get(pid, 0) + int(per_unit * qty * pack)
+
+            subtotal = round(subtotal, 2)
+            tax = round(subtotal * settings.tax_rate, 2)
+            total_due = round(subtotal + tax, 2)
+            method = rng.choices(methods, weights=method_weights)[0]
+            cash = total_due
+            if method == "cash" and rng.random() < 0.7:
+                cash = float(math.ceil(total_due / 50) * 50)  # paid with the next $50
+            out.add(Sale.__table__, {
+                "id": sale_id, "store_id": store_id, "user_id": cashiers[rng.randrange(len(cashiers))] if cashiers else manager,
+                "subtotal": subtotal, "tax": tax, "total": total_due, "payment_method": method,
+                "cash_received": cash, "change_given": round(max(cash - total_due, 0), 2),
+                "status": "voided" if voided else "completed", "created_at": created_at, "synced_at": None,
+            })
+            for row in item_rows:
+                out.add(SaleItem.__table__, row)
+            sales_count += 1
+
+        # One aggregated ledger row per product and day (at closing time)
+        closing = to_utc(midnight + timedelta(hours=23, minutes=59))
+        for pid, qty in drawn_today.items():
+            sold[pid] = sold.get(pid, 0) + qty
+            out.add(StockMovement.__table__, {
+                "id": _uuid(rng), "product_id": pid, "quantity": -qty, "kind": SALE, "via_product_id": None,
+                "ref_id": None, "user_id": None, "created_at": closing,
+            })
+
+        for _ in range(_poisson(rng, config.finance_per_day)):
+            income = rng.random() < 0.15
+            category, _w, low, high = rng.choices(INCOMES if income else EXPENSES,
+                                                  weights=[w for _, w, _, _ in (INCOMES if income else EXPENSES)])[0]
+            moment = to_utc(midnight + timedelta(hours=rng.randint(8, 21), minutes=rng.randrange(60)))
+            out.add(FinanceEntry.__table__, {
+                "id": _uuid(rng), "store_id": store_id, "user_id": manager, "assigned_to": None,
+                "entry_type": "income" if income else "expense", "category": category,
+                "amount": round(rng.uniform(low, high), 2), "description": "", "image_path": "",
+                "is_personal": False, "linked_entry_id": None, "date": moment, "created_at": moment,
+                "updated_at": moment,
+            })
+        if (day_n + 1) % 30 == 0 or day_n + 1 == config.days:
+            log(f"sales: {day_n + 1}/{config.days} days, {sales_count} sales, {items_count} items "
+                f"({time.perf_counter() - started:.0f}s)")
+    out.flush()
+
+    # --- Stock: opening balances so each product ends near its minimum ---
+    stock: dict[str, int] = {}
+    for item in items:
+        if item.by_weight or item.components:
+            continue
+        low = min_stock[item.id]
+        remaining = 0 if rng.random() < 0.04 else rng.randint(max(low // 2, 1), max(low * 4, 10))
+        stock[item.id] = remaining
+        opening = remaining + sold.get(item.id, 0)
+        if opening:
+            out.add(StockMovement.__table__, {
+                "id": _uuid(rng), "product_id": item.id, "quantity": opening, "kind": OPENING,
+                "via_product_id": None, "ref_id": None, "user_id": None, "created_at": opened_at,
+            })
+    out.flush()
+    products = Product.__table__
+    db.execute(
+        update(products).where(products.c.id == bindparam("pid")).values(stock=bindparam("stock")),
+        [{"pid": pid, "stock": qty} for pid, qty in stock.items()],
+    )
+    rollup_rows = rebuild_rollup(db)
+    db.commit()
+    counts = dict(out.counts, sales_hourly_rollup=rollup_rows)
+    log(f"done in {time.perf_counter() - started:.1f}s")
+    return counts
+
+
+@dataclass(frozen=True)
+class _Tier:
+    min_units: int
+    promo_price: float
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    """Knuth's method; fine for the small means used here."""
+    if mean <= 0:
+        return 0
+    limit, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
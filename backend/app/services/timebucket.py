@@ -0,0 +1,204 @@
+"""Reporting time dimension: store-local time buckets, computed in SQL.
+
+Sale.created_at is stored as naive UTC; reports group by the store's
+calendar (``settings.timezone``). This module turns that timezone into SQL
+expressions so grouping happens in the database:
+
+- ``local_time(db, col)``: the column as naive store-local time
+- ``bucket(db, col, grain)``: start of its local hour / day / ISO week
+  (Monday) / month
+- ``part(db, col, "hour" | "weekday")``: local hour of day, day of week
+  (0 = Sunday)
+
+PostgreSQL converts with ``timezone()``. SQLite has no timezone database, so
+the zone's UTC offsets over the queried range are spelled out as a CASE over
+the transition instants — exact across DST changes (Monterrey observed DST
+until 2022). Pass the query's UTC bounds so the CASE stays short.
+
+``bucket_key()`` normalizes a bucket value from either backend to a date
+(datetime for hours); ``python_bucket()`` is the reference implementation
+the SQL is tested against.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Integer, case, cast, func
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+
+settings = get_settings()
+
+GRAINS = ("hour", "day", "week", "month")
+TRANSITIONS_RANGE = (datetime(2000, 1, 1), datetime(2100, 1, 1))
+
+
+def _tz() -> ZoneInfo:
+    return ZoneInfo(settings.timezone)
+
+
+def local_now() -> datetime:
+    """Current store-local time (naive)."""
+    return datetime.now(_tz()).replace(tzinfo=None)
+
+
+def local_today() -> date:
+    return datetime.now(_tz()).date()
+
+
+def to_local(utc: datetime) -> datetime:
+    """Naive (or aware) UTC → naive store-local."""
+    if utc.tzinfo is None:
+        utc = utc.replace(tzinfo=timezone.utc)
+    return utc.astimezone(_tz()).replace(tzinfo=None)
+
+
+def to_utc(local: datetime) -> datetime:
+    """Naive store-local → naive UTC, as Sale.created_at is stored."""
+    return local.replace(tzinfo=_tz()).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def utc_bounds(first: date, end: date) -> tuple[datetime, datetime]:
+    """Naive-UTC [start, end) covering the local days [first, end)."""
+    return to_utc(datetime.combine(first, time())), to_utc(datetime.combine(end, time()))
+
+
+def _offset_minutes(tz: ZoneInfo, utc: datetime) -> int:
+    return int(utc.replace(tzinfo=timezone.utc).astimezone(tz).utcoffset().total_seconds() // 60)
+
+
+@lru_cache
+def _transitions(tzname: str) -> tuple[tuple[datetime, int], ...]:
+    """((utc_instant, offset_minutes_from_then), ...) between 2000 and 2100.
+
+    zoneinfo doesn't expose transitions, so they're found by probing daily
+    and bisecting to the minute. Computed once per zone.
+    """
+    tz = ZoneInfo(tzname)
+    t, end = TRANSITIONS_RANGE
+    current = _offset_minutes(tz, t)
+    found = [(t, current)]
+    step = timedelta(days=1)
+    while t < end:
+        nxt = t + step
+        if _offset_minutes(tz, nxt) != current:
+            lo, hi = t, nxt  # offset(lo) == current != offset(hi)
+            while hi - lo > timedelta(minutes=1):
+                mid = lo + (hi - lo) / 2
+                if _offset_minutes(tz, mid) == current:
+                    lo = mid
+                else:
+                    hi = mid
+            at = hi.replace(second=0, microsecond=0)
+            if _offset_minutes(tz, at) == current:
+                at = hi
+            current = _offset_minutes(tz, at)
+            found.append((at, current))
+        t = nxt
+    return tuple(found)
+
+
+def offset_spans(start: datetime | None = None, end: datetime | None = None) -> list[tuple[datetime | None, int]]:
+    """[(until_utc, offset_minutes), ...] covering naive-UTC [start, end);
+    the last span has until=None. No bounds = every known transition."""
+    transitions = _transitions(settings.timezone)
+    spans: list[tuple[datetime | None, int]] = []
+    offset = transitions[0][1]
+    for at, after in transitions[1:]:
+        if start is not None and at <= start:
+            offset = after
+            continue
+        if end is not None and at >= end:
+            break
+        spans.append((at, offset))
+        offset = after
+    spans.append((None, offset))
+    return spans
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def local_time(db: Session, column, start: datetime | None = None, end: datetime | None = None):
+    """SQL expression: naive-UTC ``column`` as naive store-local time.
+
+    start/end: the naive-UTC range the query filters on (SQLite only needs
+    the offsets in force within it).
+    """
+    if _dialect(db) == "postgresql":
+        return func.timezone(settings.timezone, func.timezone("UTC", column))
+    spans = offset_spans(start, end)
+
+    def shifted(minutes: int):
+        return func.datetime(column, f"{minutes:+d} minutes")
+
+    if len(spans) == 1:
+        return shifted(spans[0][1])
+    return case(
+        *[(column < until, shifted(minutes)) for until, minutes in spans[:-1]],
+        else_=shifted(spans[-1][1]),
+    )
+
+
+def bucket(db: Session, column, grain: str, start: datetime | None = None, end: datetime | None = None, local: bool = True):
+    """SQL expression: start of the store-local hour/day/week/month of column.
+
+    local=False buckets a column that already holds local time (e.g. the
+    hourly rollup's ``hour``).
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain: {grain}")
+    t = local_time(db, column, start, end) if local else column
+    if _dialect(db) == "postgresql":
+        return func.date_trunc(grain, t)  # ISO weeks start on Monday
+    if grain == "hour":
+        return func.strftime("%Y-%m-%d %H:00:00", t)
+    if grain == "day":
+        return func.date(t)
+    if grain == "week":
+        return func.date(t, "weekday 0", "-6 days")  # next-or-same Sunday, back to Monday
+    return func.strftime("%Y-%m-01", t)
+
+
+def part(db: Session, column, field: str, start: datetime | None = None, end: datetime | None = None, local: bool = True):
+    """SQL integer expression: local ``hour`` (0-23) or ``weekday`` (0 = Sunday)."""
+    t = local_time(db, column, start, end) if local else column
+    if _dialect(db) == "postgresql":
+        return cast(func.extract("hour" if field == "hour" else "dow", t), Integer)
+    return cast(func.strftime("%H" if field == "hour" else "%w", t), Integer)
+
+
+def bucket_key(value, grain: str) -> date | datetime:
+    """Normalize a bucket() result: datetime for hours, date otherwise."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value) if grain == "hour" else date.fromisoformat(value)
+    if grain == "hour":
+        return value if isinstance(value, datetime) else datetime.combine(value, time())
+    return value.date() if isinstance(value, datetime) else value
+
+
+def python_bucket(created_at: datetime, grain: str) -> date | datetime:
+    """Reference: bucket key of a naive-UTC timestamp, computed in Python."""
+    local = to_local(created_at)
+    if grain == "hour":
+        return local.replace(minute=0, second=0, microsecond=0)
+    day = local.date()
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    if grain == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_label(key: date | datetime, grain: str) -> str:
+    """Display label: 2026-03-01 14:00, 2026-03-01, 2026-W09, 2026-03."""
+    if grain == "hour":
+        return key.strftime("%Y-%m-%d %H:00")
+    if grain == "week":
+        year, week, _ = key.isocalendar()
+        return f"{year}-W{week:02d}"
+    if grain == "month":
+        return key.strftime("%Y-%m")
+    return key.isoformat()
@@ -0,0 +1,59 @@
+"""Catalog tombstones: a record of every deleted catalog row.
+
+The catalog change feed (GET /api/sync/products) pages through rows by
+updated_at, so a deleted row simply stops showing up in it. Every flush
+that deletes a product, category, pack barcode, volume promo or recipe
+component (directly or through the Product cascades) adds a
+CatalogTombstone in the same transaction; the feed sends them after the
+rows and local stores delete by natural key (services.sync).
+
+A delete that fails (e.g. a product with sales, which then gets
+deactivated instead) rolls its tombstone back with it.
+
+Only ORM deletes (``session.delete``, and the cascades it triggers) are
+seen here. Core ``delete(Model)`` statements and bulk query deletes never
+reach the session and leave no tombstone. The only ones on catalog tables
+are in the local pull (services.sync), which applies deletions the cloud
+already recorded. Anywhere else, delete catalog rows through the session;
+tests/test_sync_tombstones.py lists the allowed bulk deletes.
+"""
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.product import Category, Product, ProductBarcode, ProductComponent, VolumePromo
+from app.models.sync import CatalogTombstone
+
+PRODUCT = "product"
+CATEGORY = "category"
+BARCODE = "barcode"
+PROMO = "promo"
+COMPONENT = "component"
+
+
+def _tombstone(obj, now: datetime) -> CatalogTombstone | None:
+    if isinstance(obj, Product):
+        entity, product_id, key = PRODUCT, obj.id, obj.id
+    elif isinstance(obj, Category):
+        entity, product_id, key = CATEGORY, None, obj.id
+    elif isinstance(obj, ProductBarcode):
+        entity, product_id, key = BARCODE, obj.product_id, obj.barcode
+    elif isinstance(obj, VolumePromo):
+        entity, product_id, key = PROMO, obj.product_id, str(obj.min_units)
+    elif isinstance(obj, ProductComponent):
+        entity, product_id, key = COMPONENT, obj.parent_id, obj.component_id
+    else:
+        return None
+    return CatalogTombstone(entity=entity, entity_id=obj.id, product_id=product_id, key=key, deleted_at=now)
+
+
+@event.listens_for(Session, "before_flush")
+def record_deletes(session: Session, _flush_context, _instances) -> None:
+    if not session.deleted:
+        return
+    now = datetime.utcnow()
+    for obj in list(session.deleted):
+        tombstone = _tombstone(obj, now)
+        if tombstone is not None:
+            session.add(tombstone)
@@ -0,0 +1,195 @@
+"""Group-commit write coordinator.
+
+SQLite allows one writer at a time and every commit costs an fsync, so with
+several cashier terminals checking out at once the request threads queue on
+the database lock and spend most of their time waiting for each other's
+commits. Instead, sale, void and stock-adjustment writes are handed to a
+single writer thread per database:
+
+- ``run_write(db, fn)`` enqueues ``fn`` and blocks until it is committed.
+- The writer takes the first queued job, waits up to
+  ``settings.group_commit_window_ms`` for more (at most ``MAX_GROUP`` jobs),
+  runs them one after another in one session and commits once. The window
+  is skipped while writes arrive one at a time, so a single terminal
+  commits immediately.
+- A job that raises is rolled back on its own: the transaction is rolled
+  back, the failed job gets its exception, and the jobs before it are re-run
+  and committed without it. Jobs therefore must be re-runnable — build the
+  ORM objects inside ``fn`` and don't commit.
+
+Reads never go through the writer. Jobs get a session with
+``expire_on_commit=False`` so the objects they return can be serialized
+after commit without another round trip.
+
+With ``settings.group_commit`` off, ``run_write`` runs the job in the
+request session and commits it there (the old behaviour).
+"""
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+MAX_GROUP = 64
+IDLE_SECONDS = 60.0
+
+
+class _Job:
+    __slots__ = ("fn", "future")
+
+    def __init__(self, fn: Callable[[Session], object]):
+        self.fn = fn
+        self.future: Future = Future()
+
+
+class WriteCoordinator:
+    """Single writer thread for one engine. The thread starts on first use
+    and exits after ``IDLE_SECONDS`` without work."""
+
+    def __init__(self, bind: Engine, window_ms: float | None = None, max_group: int = MAX_GROUP):
+        self._session_factory = sessionmaker(bind=bind, autoflush=False, expire_on_commit=False)
+        self._window = (settings.group_commit_window_ms if window_ms is None else window_ms) / 1000.0
+        self._max_group = max_group
+        self._queue: queue.SimpleQueue[_Job] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._last_group = 0
+        self.jobs = 0
+        self.commits = 0
+        self.retries = 0
+
+    def submit(self, fn: Callable[[Session], T]) -> T:
+        job = _Job(fn)
+        with self._lock:
+            self._queue.put(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-coordinator", daemon=True)
+                self._thread.start()
+        return job.future.result()
+
+    def stats(self) -> dict:
+        return {
+            "jobs": self.jobs,
+            "commits": self.commits,
+            "retries": self.retries,
+            "jobs_per_commit": round(self.jobs / self.commits, 2) if self.commits else 0.0,
+            "window_ms": self._window * 1000.0,
+        }
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=IDLE_SECONDS)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            group = [first]
+            # Only hold the commit open when other terminals are writing too;
+            # a lone terminal shouldn't pay the window on every sale.
+            window = self._window if (self._last_group > 1 or not self._queue.empty()) else 0.0
+            deadline = time.monotonic() + window
+            while len(group) < self._max_group:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Jobs already queued always join the group
+                    group.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._last_group = len(group)
+            self._commit_group(group)
+
+    def _commit_group(self, group: list[_Job]):
+        pending = group
+        while pending:
+            failed: tuple[_Job, BaseException] | None = None
+            done: list[tuple[_Job, object]] = []
+            session = self._session_factory()
+            try:
+                for job in pending:
+                    try:
+                        result = job.fn(session)
+                        session.flush()
+                    except Exception as e:
+                        failed = (job, e)
+                        break
+                    done.append((job, result))
+
+                if failed is None:
+                    try:
+                        session.commit()
+                    except Exception as e:
+                        session.rollback()
+                        if len(pending) == 1:
+                            pending[0].future.set_exception(e)
+                            return
+                        # Don't let one bad commit fail the whole group:
+                        # commit each job on its own instead.
+                        logger.warning("Group commit of %d writes failed, retrying one by one: %s", len(pending), e)
+                        self.retries += 1
+                        for job in pending:
+                            self._commit_group([job])
+                        return
+                    self.jobs += len(done)
+                    self.commits += 1
+                    for job, result in done:
+                        job.future.set_result(result)
+                    return
+                session.rollback()
+            finally:
+                session.close()
+
+            job, exc = failed
+            job.future.set_exception(exc)
+            pending = [j for j in pending if j is not job]
+            if pending:
+                self.retries += 1
+
+
+_coordinators: dict[Engine, WriteCoordinator] = {}
+_coordinators_lock = threading.Lock()
+
+
+def coordinator_for(bind: Engine) -> WriteCoordinator:
+    with _coordinators_lock:
+        coord = _coordinators.get(bind)
+        if coord is None:
+            coord = _coordinators[bind] = WriteCoordinator(bind)
+        return coord
+
+
+def run_write(db: Session, fn: Callable[[Session], T]) -> T:
+    """Run ``fn(session)`` as one committed write and return its result.
+
+    ``fn`` may raise (e.g. HTTPException) to reject the write; nothing it did
+    is committed and the exception propagates to the caller.
+
+    ``fn`` may run more than once: when another job in its group fails, the
+    group is rolled back and re-run without it. So ``fn`` must only act
+    through ``session`` and must not commit. Cache invalidation, events,
+    network calls and other side effects go after ``run_write`` returns.
+    """
+    if not settings.group_commit:
+        try:
+            result = fn(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return result
+    return coordinator_for(db.get_bind()).submit(fn)
@@ -0,0 +1,49 @@
+"""Checkout and scanning: POST /api/sales throughput by cart size, and
+barcode lookup latency with a cold and a warm catalog cache."""
+from sqlalchemy import select
+
+from app.models.product import Product, ProductBarcode
+from app.services.catalog import catalog
+
+
+def _sellable(store, n: int) -> list[str]:
+    with store.Session() as db:
+        return list(db.scalars(
+            select(Product.id).where(Product.is_active == True, Product.sell_by_weight == False)
+            .order_by(Product.barcode).limit(n)
+        ))
+
+
+def test_create_sale(client, store, bench):
+    products = _sellable(store, 200)
+    for lines in (1, 3, 10):
+        counter = iter(range(10**9))
+
+        def next_cart():
+            n = next(counter)
+            return [{"product_id": products[(n * lines + i) % len(products)], "quantity": 1 + i % 3}
+                    for i in range(lines)]
+
+        def checkout(items):
+            r = client.post("/api/sales", json={"items": items, "payment_method": "card"})
+            assert r.status_code == 200, r.text
+
+        bench.run(f"create_sale[{lines} lines]", checkout, rounds=40, setup=next_cart)
+
+
+def test_barcode_lookup(client, store, bench):
+    with store.Session() as db:
+        codes = list(db.scalars(select(Product.barcode).order_by(Product.barcode).limit(150)))
+        codes += list(db.scalars(select(ProductBarcode.barcode).order_by(ProductBarcode.barcode).limit(50)))
+
+    def lookup(code):
+        r = client.get(f"/api/products/barcode/{code}")
+        assert r.status_code == 200, r.text
+
+    def lookup_all():
+        for code in codes:
+            lookup(code)
+
+    # Cold: the first scan after an invalidation loads the catalog
+    bench.run("barcode_lookup[cold]", lambda _: lookup(codes[0]), rounds=9, setup=catalog.invalidate)
+    bench.run("barcode_lookup[warm]", lookup_all, rounds=10, ops=len(codes))
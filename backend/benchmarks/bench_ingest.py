@@ -0,0 +1,94 @@
+"""Catalog ingestion: a sync pull (cloud → local) and the CSV import, each
+with half updates to existing products and half new ones (the pull with
+their packs and promos). The cloud API is an httpx MockTransport."""
+import asyncio
+import csv
+import io
+
+import httpx
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.models.product import Category, Product
+from app.services import sync
+
+BATCH = 1000
+
+
+def _existing(store, n: int) -> list[Product]:
+    with store.Session() as db:
+        products = list(db.scalars(select(Product).order_by(Product.barcode).limit(n)))
+        db.expunge_all()
+    return products
+
+
+def test_pull_products(store, bench, monkeypatch):
+    with store.Session() as db:
+        categories = [{"id": c.id, "name": c.name, "color": c.color} for c in db.scalars(select(Category))]
+    existing = _existing(store, BATCH // 2)
+    rounds = iter(range(10**6))
+    payload: dict = {}
+
+    def next_payload():
+        n = next(rounds)
+        products = [{
+            "id": p.id, "barcode": p.barcode, "name": p.name, "description": p.description or "",
+            "brand": p.brand, "category_id": p.category_id, "price": round(p.price + n + 1, 2),
+            "cost": p.cost, "min_stock": p.min_stock, "image_url": p.image_url or "", "is_active": True,
+            "is_favorite": p.is_favorite, "sell_by_weight": p.sell_by_weight,
+            # Child rows change every round too: one pack repriced, promos replaced
+            "barcodes": [[f"{p.barcode}-6", 6, round(p.price * 6 + n, 2)]],
+            "promos": [[3 + n % 2, round(p.price, 2)]], "components": [],
+        } for p in existing]
+        products += [{
+            "id": f"bench-{n}-{i}", "barcode": f"99{n:04d}{i:06d}", "name": f"Nuevo {n}-{i}",
+            "category_id": categories[i % len(categories)]["id"], "price": 25.0, "cost": 15.0, "stock": 12,
+            "barcodes": [[f"99{n:04d}{i:06d}-6", 6, 140.0]], "promos": [[6, 23.0]], "components": [],
+        } for i in range(BATCH - len(existing))]
+        payload.clear()
+        payload.update(categories=categories, products=products)
+        return store.Session()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=payload)
+
+    transport = httpx.MockTransport(handler)
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(sync.httpx, "AsyncClient", lambda **kw: real_client(transport=transport, **kw))
+    monkeypatch.setattr(get_settings(), "sync_api_key", "bench-key")
+    monkeypatch.setattr(get_settings(), "cloud_api_url", "http://cloud.invalid/api")
+
+    def pull(db):
+        try:
+            result = asyncio.run(sync.pull_products(db))
+        finally:
+            db.close()
+        assert result.startswith("ok"), result
+
+    bench.run("pull_products", pull, rounds=7, ops=BATCH, setup=next_payload)
+
+
+def test_import_csv(client, store, bench):
+    with store.Session() as db:
+        category_names = list(db.scalars(select(Category.name)))
+    existing = _existing(store, BATCH // 2)
+    rounds = iter(range(10**6))
+
+    def next_file():
+        n = next(rounds)
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["barcode", "name", "price", "cost", "stock", "min_stock", "category"])
+        for p in existing:
+            writer.writerow([p.barcode, p.name, round(p.price + n + 1, 2), p.cost, 0, p.min_stock, ""])
+        for i in range(BATCH - len(existing)):
+            writer.writerow([f"98{n:04d}{i:06d}", f"Importado {n}-{i}", 30, 18, 24, 5,
+                             category_names[i % len(category_names)]])
+        return out.getvalue().encode()
+
+    def upload(data):
+        r = client.post("/api/products/import-csv", files={"file": ("productos.csv", data, "text/csv")})
+        assert r.status_code == 200, r.text
+        assert not r.json()["errors"]
+
+    bench.run("import_csv", upload, rounds=7, ops=BATCH, setup=next_file)
@@ -0,0 +1,35 @@
+"""Volume promo pricing: the bundle_total() reference and a freshly built
+BundleTable, over every promo product in the dataset and cart sizes 1-48."""
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from app.models.product import Product, VolumePromo
+from app.services.pricing import BundleTable, bundle_total
+
+QUANTITIES = range(1, 49)
+
+
+def test_bundle_total(store, bench):
+    promos = defaultdict(list)
+    with store.Session() as db:
+        prices = dict(db.execute(select(Product.id, Product.price)).all())
+        for promo in db.scalars(select(VolumePromo).order_by(VolumePromo.product_id, VolumePromo.min_units)):
+            promos[promo.product_id].append(promo)
+            db.expunge(promo)
+    assert promos
+    ops = len(promos) * len(QUANTITIES)
+
+    def reference():
+        for pid, tiers in promos.items():
+            for q in QUANTITIES:
+                bundle_total(q, prices[pid], tiers)
+
+    def table():
+        for pid, tiers in promos.items():
+            bundle = BundleTable(prices[pid], tiers)
+            for q in QUANTITIES:
+                bundle.total(q)
+
+    bench.run("bundle_total", reference, rounds=10, ops=ops)
+    bench.run("bundle_table", table, rounds=10, ops=ops)
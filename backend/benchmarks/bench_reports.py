@@ -0,0 +1,19 @@
+"""Reports: the dashboard and product profitability over the default
+30-day range, with a cold and a warm report cache."""
+from app.services.report_cache import report_cache
+
+
+def _get(client, url):
+    r = client.get(url)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_dashboard(client, bench):
+    bench.run("dashboard", lambda: _get(client, "/api/reports/dashboard"), rounds=20)
+
+
+def test_product_profitability(client, bench):
+    url = "/api/reports/product-profitability"
+    bench.run("product_profitability[cold]", lambda _: _get(client, url), rounds=9, setup=report_cache.clear)
+    bench.run("product_profitability[warm]", lambda: _get(client, url), rounds=20)
@@ -0,0 +1,306 @@
+"""Benchmark harness for the backend hot paths.
+
+Each benchmark runs against a copy of a synthetic store (app.services.synthetic)
+at one or more data scales, and records per operation the median wall time
+and the number of SQL statements. Results are compared with a JSON baseline;
+a benchmark fails when it issues more statements than the baseline (plus
+--bench-query-tolerance) or its median time exceeds the baseline by more
+than --bench-time-tolerance. Everything runs locally on SQLite; the sync
+pull is served by an httpx MockTransport, no network.
+
+Usage (from backend/):
+    python -m pytest benchmarks --bench-save               # record a baseline
+    python -m pytest benchmarks                            # compare against it
+    python -m pytest benchmarks --bench-scale small,medium,large
+
+Generated datasets are cached under --bench-cache (keyed by scale, config,
+schema and generator), so only the first run at each scale pays for them.
+Wall times are machine-specific: record the baseline on the machine you
+compare on. Statement counts are not, and are the stricter check.
+"""
+import gc
+import hashlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from app.main import app
+from app.database import Base, get_db
+from app.models.user import User
+from app.services import synthetic
+from app.services.catalog import catalog
+from app.services.inventory import inventory
+from app.services.synthetic import SyntheticConfig, generate
+from app.services.timebucket import local_today
+
+SCALES = {
+    "small": SyntheticConfig(products=300, categories=10, recipes=5, days=7, sales_per_day=150),
+    "medium": SyntheticConfig(products=2000, days=30, sales_per_day=500),
+    "large": SyntheticConfig(products=8000, categories=30, recipes=50, days=180, sales_per_day=1200),
+}
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+RESULTS = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-scale", default="small", help=f"comma-separated scales: {', '.join(SCALES)}")
+    group.addoption("--bench-baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    group.addoption("--bench-save", action="store_true", help="write results to the baseline instead of comparing")
+    group.addoption("--bench-time-tolerance", type=float, default=0.50,
+                    help="allowed median slowdown vs. baseline, as a fraction (default 0.50)")
+    group.addoption("--bench-query-tolerance", type=int, default=0,
+                    help="allowed extra SQL statements per operation vs. baseline (default 0)")
+    group.addoption("--bench-cache", default=os.path.join(tempfile.gettempdir(), "tiendaos-bench"),
+                    help="directory for generated datasets")
+
+
+def pytest_generate_tests(metafunc):
+    if "scale" in metafunc.fixturenames:
+        scales = [s.strip() for s in metafunc.config.getoption("bench_scale").split(",") if s.strip()]
+        unknown = [s for s in scales if s not in SCALES]
+        if unknown:
+            raise pytest.UsageError(f"Unknown benchmark scale(s): {', '.join(unknown)}")
+        metafunc.parametrize("scale", scales, scope="session")
+
+
+# --- Datasets ---
+
+def _sqlite_engine(path: str, wal: bool = True):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        if wal:
+            dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    return engine
+
+
+def _dataset_key(scale: str, config: SyntheticConfig) -> str:
+    digest = hashlib.sha256(repr(config).encode())
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=sqlite.dialect())).encode())
+    digest.update(Path(synthetic.__file__).read_bytes())
+    return f"{scale}-{digest.hexdigest()[:12]}.db"
+
+
+@pytest.fixture(scope="session")
+def template(scale, request) -> str:
+    """Path to the generated dataset for this scale (built once, then cached)."""
+    # Ending today keeps the dashboard's "today" populated
+    config = replace(SCALES[scale], end=local_today())
+    cache = request.config.getoption("bench_cache")
+    os.makedirs(cache, exist_ok=True)
+    path = os.path.join(cache, _dataset_key(scale, config))
+    if not os.path.exists(path):
+        partial = f"{path}.partial"
+        if os.path.exists(partial):
+            os.unlink(partial)
+        engine = _sqlite_engine(partial, wal=False)
+        Base.metadata.create_all(engine)
+        with Session(bind=engine) as db:
+            generate(db, config)
+        engine.dispose()
+        os.replace(partial, path)
+    return path
+
+
+@dataclass
+class Store:
+    engine: object
+    Session: sessionmaker
+    path: str
+
+
+@pytest.fixture()
+def store(template, tmp_path):
+    """A private copy of the dataset; benchmarks are free to write to it."""
+    path = str(tmp_path / "store.db")
+    shutil.copyfile(template, path)
+    engine = _sqlite_engine(path)
+    yield Store(engine=engine, Session=sessionmaker(bind=engine), path=path)
+    engine.dispose()
+
+
+@pytest.fixture()
+def client(store, monkeypatch):
+    # Background freshness sweeps are time-driven; keep them out of the
+    # per-operation statement counts so those are deterministic
+    monkeypatch.setattr(catalog, "sweep_interval", 3600.0)
+    monkeypatch.setattr(inventory, "sweep_interval", 3600.0)
+
+    def override_get_db():
+        db = store.Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    with store.Session() as db:
+        manager_id = db.scalar(select(User.id).where(User.role == "manager"))
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id=manager_id, username="bench", hashed_password="x", pin_code="0000", full_name="Bench", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    with TestClient(app) as c:
+        yield c
+
+    app.dependency_overrides.clear()
+
+
+# --- Measurement ---
+
+@dataclass
+class Result:
+    key: str
+    rounds: int
+    ops: int
+    median_ms: float
+    best_ms: float
+    queries_per_op: float
+
+    def to_dict(self) -> dict:
+        return {
+            "median_ms": round(self.median_ms, 4),
+            "best_ms": round(self.best_ms, 4),
+            "queries_per_op": round(self.queries_per_op, 2),
+            "rounds": self.rounds,
+            "ops": self.ops,
+        }
+
+
+class Recorder:
+    def __init__(self, config, scale: str, engine=None):
+        self.config = config
+        self.scale = scale
+        self.engine = engine
+        self.statements = 0
+
+    def _count(self, *_args) -> None:
+        self.statements += 1
+
+    def run(self, name: str, fn, *, rounds: int = 20, ops: int = 1, warmup: int = 1, setup=None) -> Result:
+        """Time ``fn`` over ``rounds`` rounds of ``ops`` operations each.
+
+        ``setup`` (untimed, not counted) runs before every round and its
+        return value is passed to ``fn``. Warmup rounds are discarded; the
+        garbage collector is paused while a round is timed.
+        Fails the calling test on a regression against the baseline.
+        """
+        timings = []
+        statements = 0
+        if self.engine is not None:
+            event.listen(self.engine, "before_cursor_execute", self._count)
+        try:
+            for n in range(warmup + rounds):
+                args = (setup(),) if setup else ()
+                self.statements = 0
+                gc.disable()
+                try:
+                    started = time.perf_counter()
+                    fn(*args)
+                    elapsed = time.perf_counter() - started
+                finally:
+                    gc.enable()
+                if n >= warmup:
+                    timings.append(elapsed * 1000 / ops)
+                    statements += self.statements
+        finally:
+            if self.engine is not None:
+                event.remove(self.engine, "before_cursor_execute", self._count)
+
+        result = Result(
+            key=f"{self.scale}/{name}",
+            rounds=rounds,
+            ops=ops,
+            median_ms=statistics.median(timings),
+            best_ms=min(timings),
+            queries_per_op=statements / (rounds * ops),
+        )
+        self.config.stash.setdefault(RESULTS, {})[result.key] = result
+        self._check(result)
+        return result
+
+    def _check(self, result: Result) -> None:
+        if self.config.getoption("bench_save"):
+            return
+        base = _load_baseline(self.config.getoption("bench_baseline")).get(result.key)
+        if base is None:
+            return
+        problems = []
+        allowed_queries = base["queries_per_op"] + self.config.getoption("bench_query_tolerance")
+        if round(result.queries_per_op, 2) > allowed_queries:
+            problems.append(f"{result.queries_per_op:.2f} statements/op (baseline {base['queries_per_op']})")
+        allowed_ms = base["median_ms"] * (1 + self.config.getoption("bench_time_tolerance"))
+        if result.median_ms > allowed_ms:
+            problems.append(f"median {result.median_ms:.3f} ms/op (baseline {base['median_ms']:.3f}, "
+                            f"allowed {allowed_ms:.3f})")
+        if problems:
+            pytest.fail(f"{result.key} regressed: " + "; ".join(problems))
+
+
+@pytest.fixture()
+def bench(request, scale):
+    """Recorder for this test; counts statements on the store's engine when
+    the test uses the ``store`` fixture."""
+    engine = request.getfixturevalue("store").engine if "store" in request.fixturenames else None
+    return Recorder(request.config, scale, engine)
+
+
+def _load_baseline(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("results", {})
+    except FileNotFoundError:
+        return {}
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    results = config.stash.get(RESULTS, None)
+    if not results or not config.getoption("bench_save"):
+        return
+    path = config.getoption("bench_baseline")
+    merged = _load_baseline(path)
+    merged.update({key: r.to_dict() for key, r in results.items()})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"python": sys.version.split()[0], "results": dict(sorted(merged.items()))}, f, indent=2)
+        f.write("\n")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    results = config.stash.get(RESULTS, None)
+    if not results:
+        return
+    baseline = {} if config.getoption("bench_save") else _load_baseline(config.getoption("bench_baseline"))
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(f"{'benchmark':44} {'median ms/op':>13} {'best':>10} {'stmts/op':>9} {'vs base':>8}")
+    for key, r in sorted(results.items()):
+        base = baseline.get(key)
+        delta = f"{(r.median_ms / base['median_ms'] - 1) * 100:+.0f}%" if base and base["median_ms"] else ""
+        terminalreporter.write_line(
+            f"{key:44} {r.median_ms:>13.3f} {r.best_ms:>10.3f} {r.queries_per_op:>9.2f} {delta:>8}"
+        )
+    if config.getoption("bench_save"):
+        terminalreporter.write_line(f"baseline written to {config.getoption('bench_baseline')}")
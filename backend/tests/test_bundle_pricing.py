@@ -0,0 +1,57 @@
+"""Compiled bundle price tables: same optimum as bundle_total() for every
+quantity, and a micro-benchmark against it for bulk orders."""
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+
+from app.services.pricing import BundleTable, bundle_total
+
+
+def _promos(*tiers):
+    return [SimpleNamespace(min_units=m, promo_price=p) for m, p in tiers]
+
+
+def test_matches_reference_for_every_quantity():
+    rng = random.Random(7)
+    cases = [
+        (20.0, _promos((6, 105), (8, 135), (10, 170))),
+        (20.0, _promos((12, 250))),              # tier worse than singles
+        (13.5, _promos((3, 39), (5, 60), (7, 85))),
+        (9.9, []),
+    ]
+    for _ in range(20):
+        base = round(rng.uniform(5, 40), 2)
+        tiers = [(m, round(m * base * rng.uniform(0.7, 1.05), 2)) for m in rng.sample(range(2, 25), rng.randint(1, 4))]
+        cases.append((base, _promos(*tiers)))
+
+    for base, promos in cases:
+        table = BundleTable(base, promos)
+        # Out of order, so both lazy extension and the folded path are exercised
+        for qty in [500, 0, 1, 17, 240, 16, 3] + list(range(0, 130)):
+            assert table.total(qty) == pytest.approx(bundle_total(qty, base, promos)), (base, promos, qty)
+
+
+def test_bulk_order_benchmark():
+    promos = _promos((6, 105), (8, 135), (10, 170), (24, 390))
+    lines = [240, 120, 48, 36, 240, 18, 96] * 50
+    table = BundleTable(20.0, promos)
+    table.total(max(lines))  # compiled when the promo changed, not per sale
+
+    start = time.perf_counter()
+    expected = [bundle_total(q, 20.0, promos) for q in lines]
+    reference = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = [table.total(q) for q in lines]
+    compiled = time.perf_counter() - start
+
+    assert got == pytest.approx(expected)
+    print(f"\nbundle_total: {reference * 1e6 / len(lines):.1f} us/line, "
+          f"BundleTable: {compiled * 1e6 / len(lines):.2f} us/line ({reference / compiled:.0f}x)")
+    assert compiled * 5 < reference
@@ -0,0 +1,148 @@
+"""Hot catalog cache: scans and price checks are served from memory, and the
+promo/pack/product write endpoints invalidate exactly what they touch."""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product
+from app.models.user import User
+from app.models.store import Store
+from app.services.catalog import catalog
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(Product(id="beer", barcode="750100", name="Corona", description="", price=20.0,
+                   cost=12.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession, engine
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _count_statements(engine, fn):
+    count = 0
+
+    def _on_execute(*_args):
+        nonlocal count
+        count += 1
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    return count, result
+
+
+def test_scans_served_from_cache(client):
+    c, _TestSession, engine = client
+    assert c.get("/api/price-check/750100").status_code == 200  # warm
+
+    n, r = _count_statements(engine, lambda: c.get("/api/price-check/750100"))
+    assert r.status_code == 200 and r.json()["price"] == 20.0
+    assert n == 0
+
+    # barcode lookup only reads live stock (one query)
+    n, r = _count_statements(engine, lambda: c.get("/api/products/barcode/750100"))
+    assert r.status_code == 200 and r.json()["product"]["stock"] == 100
+    assert n == 1
+
+    stats = c.get("/api/admin/system/catalog-cache").json()
+    assert stats["hits"] >= 2 and stats["products"] == 1
+
+
+def test_write_endpoints_invalidate(client):
+    c, _TestSession, _engine = client
+    assert c.get("/api/price-check/750100").json()["volume_promos"] == []
+    version = catalog.version
+
+    assert c.post("/api/products/beer/promos", json={"min_units": 6, "promo_price": 105}).status_code == 200
+    body = c.get("/api/price-check/750100").json()
+    assert body["volume_promos"][0]["bundle_price"] == 105
+    assert catalog.version > version
+
+    # checkout prices from the refreshed tiers
+    r = c.post("/api/sales", json={"items": [{"product_id": "beer", "quantity": 6}], "cash_received": 200})
+    assert r.json()["total"] == 105.0
+
+    # A tier priced above two smaller bundles keeps its own price; the
+    # checkout total for that many units comes alongside
+    assert c.post("/api/products/beer/promos", json={"min_units": 12, "promo_price": 220}).status_code == 200
+    tier = c.get("/api/price-check/750100").json()["volume_promos"][1]
+    assert (tier["bundle_price"], tier["unit_price"], tier["bundle_total"]) == (220, 18.33, 210)
+
+    # new pack barcode is scannable right away and takes precedence
+    r = c.post("/api/products/beer/barcodes", json={"barcode": "PACK12", "units": 12, "pack_price": 200})
+    assert r.status_code == 200
+    body = c.get("/api/products/barcode/PACK12").json()
+    assert body["pack"]["units"] == 12 and body["product"]["stock"] == 94
+
+    assert c.patch("/api/products/beer", json={"price": 22.0}).status_code == 200
+    assert c.get("/api/price-check/750100").json()["price"] == 22.0
+
+    assert c.patch("/api/products/beer", json={"is_active": False}).status_code == 200
+    assert c.get("/api/price-check/750100").status_code == 404
+    assert c.get("/api/price-check/PACK12").status_code == 404
+
+
+def test_products_written_elsewhere_are_found(client):
+    c, TestSession, _engine = client
+    assert c.get("/api/price-check/750100").status_code == 200  # cache loaded
+
+    # e.g. sync pull or an import script writing straight to the DB
+    db = TestSession()
+    db.add(Product(id="chips", barcode="750200", name="Sabritas", description="", price=18.0,
+                   cost=10.0, stock=5, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.commit()
+    db.close()
+
+    misses = catalog.misses
+    assert c.get("/api/price-check/750200").json()["name"] == "Sabritas"
+    assert catalog.misses == misses + 1
+    assert c.get("/api/price-check/750200").status_code == 200
+    assert catalog.misses == misses + 1
+    assert c.get("/api/price-check/nope").status_code == 404
@@ -0,0 +1,140 @@
+"""Checkout resolves the whole cart in a fixed number of queries: the SQL
+statement count per sale must not grow with the number of cart lines.
+Also covers the catalog cache that serves scans and checkout pricing."""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product, ProductComponent, VolumePromo
+from app.models.user import User
+from app.models.store import Store
+
+# Ceiling for a single POST /api/sales, whatever the cart size
+MAX_STATEMENTS_PER_SALE = 12
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession, engine
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _seed_catalog(db, n):
+    """n simple products with promo tiers, plus a recipe that consumes two of them."""
+    for i in range(n):
+        db.add(Product(id=f"p{i}", barcode=f"bc-{i}", name=f"Prod {i}", description="", price=20.0,
+                       cost=10.0, stock=1000, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+        db.add(VolumePromo(product_id=f"p{i}", min_units=6, promo_price=105.0))
+        db.add(VolumePromo(product_id=f"p{i}", min_units=8, promo_price=135.0))
+    db.add(Product(id="mix", barcode="bc-mix", name="Mix", description="", price=65.0,
+                   cost=0, stock=0, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.add(ProductComponent(parent_id="mix", component_id="p0", quantity=1))
+    db.add(ProductComponent(parent_id="mix", component_id="p1", quantity=2))
+    db.commit()
+
+
+def _count_statements(engine, fn):
+    count = 0
+
+    def _on_execute(*_args):
+        nonlocal count
+        count += 1
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    return count, result
+
+
+def _sell(c, lines):
+    items = [{"product_id": pid, "quantity": qty} for pid, qty in lines]
+    return c.post("/api/sales", json={"items": items, "cash_received": 100000})
+
+
+def test_statement_count_independent_of_cart_size(client):
+    c, TestSession, engine = client
+    db = TestSession()
+    _seed_catalog(db, 30)
+    db.close()
+
+    # Warm the catalog cache; steady-state checkout is what we bound
+    assert _sell(c, [("p3", 1)]).status_code == 200
+
+    small, r = _count_statements(engine, lambda: _sell(c, [("p2", 1), ("mix", 1)]))
+    assert r.status_code == 200, r.text
+
+    big_cart = [(f"p{i}", 8) for i in range(30)] + [("mix", 2)]
+    big, r = _count_statements(engine, lambda: _sell(c, big_cart))
+    assert r.status_code == 200, r.text
+    assert len(r.json()["items"]) == 31
+
+    assert big == small
+    assert big <= MAX_STATEMENTS_PER_SALE
+
+
+def test_resolved_cart_prices_and_decrements(client):
+    c, TestSession, _engine = client
+    db = TestSession()
+    _seed_catalog(db, 3)
+    db.close()
+
+    # p2 split over two lines still prices as 8 units → one 8-pack promo
+    r = _sell(c, [("p2", 5), ("p2", 3), ("mix", 2)])
+    assert r.status_code == 200, r.text
+    assert r.json()["total"] == 135.0 + 130.0
+
+    db = TestSession()
+    assert db.query(Product).filter_by(id="p2").first().stock == 992
+    assert db.query(Product).filter_by(id="p0").first().stock == 998   # 1 per mix
+    assert db.query(Product).filter_by(id="p1").first().stock == 996   # 2 per mix
+    db.close()
+
+    r = _sell(c, [("missing", 1)])
+    assert r.status_code == 404
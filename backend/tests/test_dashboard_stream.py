@@ -0,0 +1,199 @@
+"""Live dashboard feed: snapshot on connect, deltas from the sale write
+path, resume by Last-Event-ID, and no double counting."""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product
+from app.models.sale import Sale, SaleItem
+from app.models.user import User
+from app.models.store import Store
+from app.routers.reports import dashboard_stream
+from app.services import live
+from app.services.live import dashboard_feed
+from app.services.rollup import record_sales
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")  # as in app.database: writers don't wait on readers
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store", sync_api_key="sync-key"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(Product(id="beer", barcode="750100", name="Corona", description="", price=20.0,
+                   cost=12.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.add(Product(id="chips", barcode="750200", name="Sabritas", description="", price=18.0,
+                   cost=10.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession, engine
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _sell(c, method="cash", beer=1, chips=0):
+    items = [{"product_id": "beer", "quantity": beer}]
+    if chips:
+        items.append({"product_id": "chips", "quantity": chips})
+    r = c.post("/api/sales", json={"items": items, "payment_method": method, "cash_received": 500})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _parse(messages):
+    events = []
+    for message in messages:
+        fields = dict(line.split(": ", 1) for line in message.strip().split("\n") if ": " in line)
+        if "event" in fields:
+            events.append((fields["id"], fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_snapshot_deltas_and_resume(client):
+    c, TestSession, _engine = client
+    _sell(c, beer=2)  # before anyone subscribes
+    db = TestSession()
+    try:
+        _cursor, first = dashboard_feed.connect(db)
+        [(snap_id, kind, snapshot)] = _parse(first)
+        assert kind == "snapshot"
+        assert snapshot == c.get("/api/reports/dashboard").json()
+
+        _sell(c, method="card", beer=1, chips=1)
+        _cursor, missed = dashboard_feed.connect(db, snap_id)
+        events = _parse(missed)
+        assert [kind for _, kind, _ in events] == ["sale", "hour", "top_products"]
+        kpis = events[0][2]["kpis"]
+        assert kpis["transaction_count"] == 2 and kpis["total_sales"] == 78.0
+        assert kpis["payment_breakdown"]["card"] == 38.0
+
+        # A void resumes from the last seen event, and the state matches polling
+        voided = _sell(c, beer=3)
+        assert c.post(f"/api/sales/{voided['id']}/void").status_code == 200
+        _cursor, missed = dashboard_feed.connect(db, events[-1][0])
+        kinds = [kind for _, kind, _ in _parse(missed)]
+        assert kinds[0] == "sale" and "void" in kinds
+        _cursor, first = dashboard_feed.connect(db)
+        assert _parse(first)[0][2] == c.get("/api/reports/dashboard").json()
+
+        # Unknown or stale ids get a fresh snapshot
+        for stale in ("garbage", "1:1", f"{snap_id.split(':')[0]}:99999"):
+            assert [kind for _, kind, _ in _parse(dashboard_feed.connect(db, stale)[1])] == ["snapshot"]
+    finally:
+        db.close()
+
+
+def test_sales_in_the_snapshot_are_not_counted_twice(client):
+    c, TestSession, _engine = client
+    sold = _sell(c, beer=2)
+    db = TestSession()
+    try:
+        cursor, _first = dashboard_feed.connect(db)
+        sale = db.query(Sale).options(selectinload(Sale.items)).filter(Sale.id == sold["id"]).one()
+        dashboard_feed.publish_sales(db, [sale])  # e.g. committed while the state was built
+        assert dashboard_feed.connect(db, f"{cursor[0]}:{cursor[1]}")[1] == []
+    finally:
+        db.close()
+
+
+def test_sale_committed_while_the_state_is_built(client, monkeypatch):
+    c, TestSession, _engine = client
+    _sell(c, beer=2)
+    late = {}
+
+    def commit_a_sale(*args, **kwargs):
+        # Between the totals and the counted ids: a sale commits, its
+        # publish arrives after the state is built
+        rows = top_products(*args, **kwargs)
+        if not late:
+            db = TestSession()
+            sale = Sale(store_id=get_settings().store_id, user_id="u1", subtotal=18.0, total=18.0,
+                        payment_method="card", status="completed")
+            sale.items.append(SaleItem(product_id="chips", product_name="Sabritas", quantity=1,
+                                       unit_price=18.0, line_total=18.0, unit_cost=10.0))
+            db.add(sale)
+            db.flush()
+            record_sales(db, [sale])
+            db.commit()
+            late["id"] = sale.id
+            db.close()
+        return rows
+
+    top_products = live.top_products
+    monkeypatch.setattr(live, "top_products", commit_a_sale)
+    db = TestSession()
+    try:
+        cursor, _first = dashboard_feed.connect(db)
+        sale = db.query(Sale).options(selectinload(Sale.items)).filter(Sale.id == late["id"]).one()
+        dashboard_feed.publish_sales(db, [sale])
+        _cursor, missed = dashboard_feed.connect(db, f"{cursor[0]}:{cursor[1]}")
+        kpis = _parse(missed)[0][2]["kpis"]
+        assert kpis["transaction_count"] == 2 and kpis["total_sales"] == 58.0
+        _cursor, first = dashboard_feed.connect(db)
+        assert _parse(first)[0][2] == c.get("/api/reports/dashboard").json()
+    finally:
+        db.close()
+
+
+def test_stream_endpoint_pushes_new_sales(client):
+    c, TestSession, _engine = client
+
+    async def follow():
+        db = TestSession()
+        try:
+            response = dashboard_stream(last_event_id=None, resume=None, db=db, _user=None)
+        finally:
+            db.close()
+        assert response.media_type == "text/event-stream"
+        body = response.body_iterator
+        assert (await body.__anext__()).startswith("retry:")
+        assert _parse([await body.__anext__()])[0][1] == "snapshot"
+        await asyncio.to_thread(_sell, c, "cash", 4)
+        event = _parse([await asyncio.wait_for(body.__anext__(), 5)])[0]
+        await body.aclose()
+        return event
+
+    _id, kind, data = asyncio.run(follow())
+    assert kind == "sale" and data["kpis"]["total_sales"] == 80.0
+    assert dashboard_feed.stats()["subscribers"] == 0
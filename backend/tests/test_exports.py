@@ -0,0 +1,126 @@
+"""CSV exports stream from one joined query (no per-row lookups), in
+chunks, optionally gzip-compressed."""
+import csv
+import gzip
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Category, Product
+from app.models.user import User
+from app.models.store import Store
+from app.services.export import CHUNK_BYTES, _csv_chunks
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(Product(id="beer", barcode="750100", name="Corona", description="", price=20.0,
+                   cost=12.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.add(Category(id="cat-snacks", name="Botanas"))
+    db.add(Product(id="chips", barcode="750200", name="Sabritas", description="", price=18.0,
+                   cost=10.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False,
+                   category_id="cat-snacks"))
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession, engine
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _count_statements(engine, fn):
+    count = 0
+
+    def _on_execute(*_args):
+        nonlocal count
+        count += 1
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    return count, result
+
+
+def test_sales_export_streams_joined_rows(client):
+    c, _TestSession, engine = client
+    for _ in range(5):
+        r = c.post("/api/sales", json={"items": [{"product_id": "beer", "quantity": 2},
+                                                 {"product_id": "chips", "quantity": 1, "pack_units": 3}],
+                                       "payment_method": "card", "cash_received": 0})
+        assert r.status_code == 200, r.text
+
+    n, r = _count_statements(engine, lambda: c.get("/api/reports/export/sales-csv"))
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/csv")
+    assert n == 1
+    rows = list(csv.reader(io.StringIO(r.text)))
+    assert rows[0][:4] == ["Fecha", "Hora", "ID Venta", "Producto"]
+    assert len(rows) == 1 + 10
+    assert {(row[3], row[4], row[8]) for row in rows[1:]} == {("Corona", "2.0", "card"), ("Sabritas", "3.0", "card")}
+
+    gz = c.get("/api/reports/export/sales-csv", params={"gzip": True})
+    assert gz.headers["content-type"] == "application/gzip"
+    assert gz.headers["content-disposition"].endswith(".csv.gz")
+    assert gzip.decompress(gz.content).decode() == r.text
+
+
+def test_products_export_joins_categories(client):
+    c, _TestSession, engine = client
+    n, r = _count_statements(engine, lambda: c.get("/api/products/export-csv"))
+    assert n == 1
+    rows = {row["name"]: row for row in csv.DictReader(io.StringIO(r.text))}
+    assert rows["Sabritas"]["category"] == "Botanas"
+    assert rows["Corona"]["category"] == ""
+
+    gz = c.get("/api/products/export-csv", params={"gzip": True})
+    assert gzip.decompress(gz.content).decode() == r.text
+
+
+def test_csv_is_written_in_chunks():
+    rows = ([i, "x" * 50] for i in range(10_000))
+    chunks = list(_csv_chunks(["n", "pad"], rows))
+    assert len(chunks) > 5
+    assert all(len(chunk) < CHUNK_BYTES + 1024 for chunk in chunks)
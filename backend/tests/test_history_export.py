@@ -0,0 +1,161 @@
+"""Columnar sales history export: one file per month, Parquet or CSV,
+incremental (closed months are not rewritten unless their sales change)."""
+import csv
+import os
+import sys
+import tempfile
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product
+from app.models.sale import Sale, SaleItem
+from app.models.user import User
+from app.models.store import Store
+from app.routers import reports
+from app.services.rollup import record_sales
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(reports, "ANALYTICS_DIR", str(tmp_path / "analytics"))
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store", sync_api_key="sync-key"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(Product(id="beer", barcode="750100", name="Corona", description="", price=20.0,
+                   cost=12.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.add(Product(id="chips", barcode="750200", name="Sabritas", description="", price=18.0,
+                   cost=10.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession, tmp_path / "analytics"
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _add_sale(TestSession, created_at, qty=2):
+    db = TestSession()
+    sale = Sale(store_id=get_settings().store_id, user_id="u1", subtotal=20.0 * qty, total=20.0 * qty,
+                payment_method="cash", created_at=created_at)
+    sale.items.append(SaleItem(product_id="beer", product_name="Corona", quantity=qty, unit_price=20.0,
+                               line_total=20.0 * qty, pack_units=1, unit_cost=12.0))
+    db.add(sale)
+    db.flush()
+    record_sales(db, [sale])
+    db.commit()
+    sale_id = sale.id
+    db.close()
+    return sale_id
+
+
+def _current_month():
+    return datetime.now(ZoneInfo(get_settings().timezone)).strftime("%Y-%m")
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_export_is_incremental(client):
+    c, TestSession, out = client
+    jan = _add_sale(TestSession, datetime(2026, 1, 10, 18))
+    _add_sale(TestSession, datetime(2026, 2, 1, 3), qty=3)  # Jan 31 21:00 in Monterrey
+    c.post("/api/sales", json={"items": [{"product_id": "beer", "quantity": 1}], "payment_method": "card"})
+
+    r = c.post("/api/reports/export/analytics", params={"format": "csv"})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["written"][:2] == ["2026-01", "2026-02"] and body["written"][-1] == _current_month()
+    assert body["skipped"] == []
+    january = body["partitions"]["2026-01"]
+    assert january["closed"] and january["rows"] == {"sales": 2, "sale_items": 2}
+    items = _read_csv(out / "sale_items" / "month=2026-01" / "part-0.csv")
+    assert [row["quantity"] for row in items] == ["2.0", "3.0"]
+    assert items[0]["product_name"] == "Corona" and items[0]["unit_cost"] == "12.0"
+    assert items[1]["created_at"] == "2026-02-01T03:00:00+00:00"
+    assert body["partitions"]["2026-02"]["rows"] == {"sales": 0, "sale_items": 0}
+
+    # Second run: closed months are skipped, the open month is rewritten
+    mtime = os.path.getmtime(out / "sales" / "month=2026-01" / "part-0.csv")
+    again = c.post("/api/reports/export/analytics", params={"format": "csv"}).json()
+    assert "2026-01" in again["skipped"] and again["written"] == [_current_month()]
+    assert os.path.getmtime(out / "sales" / "month=2026-01" / "part-0.csv") == mtime
+
+    # A void in a closed month changes its fingerprint, so it is exported again
+    assert c.post(f"/api/sales/{jan}/void").status_code == 200
+    after_void = c.post("/api/reports/export/analytics", params={"format": "csv"}).json()
+    assert "2026-01" in after_void["written"]
+    sales = _read_csv(out / "sales" / "month=2026-01" / "part-0.csv")
+    assert sorted(row["status"] for row in sales) == ["completed", "voided"]
+
+    r = c.get("/api/reports/export/analytics/sale_items/2026-01")
+    assert r.status_code == 200 and r.text.startswith("id,sale_id,created_at")
+    assert c.get("/api/reports/export/analytics/sale_items/2025-12").status_code == 404
+    assert c.get("/api/reports/export/analytics/..%2F_manifest.json/2026-01").status_code == 404
+
+
+def test_parquet_export_is_typed_and_dictionary_encoded(client):
+    pa = pytest.importorskip("pyarrow")
+    ds = pytest.importorskip("pyarrow.dataset")
+    c, TestSession, out = client
+    for day in range(1, 4):
+        _add_sale(TestSession, datetime(2026, 1, day, 18), qty=day)
+
+    body = c.post("/api/reports/export/analytics", params={"format": "parquet"}).json()
+    assert body["format"] == "parquet" and body["partitions"]["2026-01"]["rows"]["sale_items"] == 3
+
+    table = ds.dataset(str(out / "sale_items"), format="parquet", partitioning="hive").to_table()
+    assert table.schema.field("product_name").type == pa.dictionary(pa.int32(), pa.string())
+    assert table.schema.field("created_at").type == pa.timestamp("us", tz="UTC")
+    assert table.schema.field("pack_units").type == pa.int32()
+    assert sorted(table.column("quantity").to_pylist()) == [1.0, 2.0, 3.0]
+
+    # Switching format rewrites closed months in the new format
+    csv_run = c.post("/api/reports/export/analytics", params={"format": "csv"}).json()
+    assert "2026-01" in csv_run["written"]
+    assert not (out / "sale_items" / "month=2026-01" / "part-0.parquet").exists()
+    assert (out / "sale_items" / "month=2026-01" / "part-0.csv").exists()
+
+
+def test_unknown_format_is_rejected(client):
+    c, _TestSession, _out = client
+    assert c.post("/api/reports/export/analytics", params={"format": "xlsx"}).status_code == 400
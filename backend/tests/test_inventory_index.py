@@ -0,0 +1,199 @@
+"""Inventory index: running totals and below-minimum lists stay equal to a
+full scan through checkout, voids, adjustments, edits and out-of-process
+writes, and reads don't scan the catalog."""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product
+from app.models.user import User
+from app.models.store import Store
+from app.routers import chat
+from app.services.inventory import inventory
+from app.services.stock import set_product_stock
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store", sync_api_key="sync-key"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(Product(id="beer", barcode="750100", name="Corona", description="", price=20.0,
+                   cost=12.0, stock=0, min_stock=5, image_url="", is_active=True, sell_by_weight=False))
+    db.add(Product(id="chips", barcode="750200", name="Sabritas", description="", price=18.0,
+                   cost=10.0, stock=0, min_stock=3, image_url="", is_active=True, sell_by_weight=False))
+    for i in range(8):
+        db.add(Product(id=f"p{i}", barcode=f"7509{i:02d}", name=f"Producto {i}", description="", price=10.0 + i,
+                       cost=5.0 + i, stock=i, min_stock=4, image_url="", is_active=True, sell_by_weight=False))
+    db.flush()
+    set_product_stock(db, "beer", 8)
+    set_product_stock(db, "chips", 20)
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession, engine
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _scan(TestSession) -> dict:
+    """The old full-scan report, as reference."""
+    db = TestSession()
+    products = db.query(Product).filter(Product.is_active == True).all()
+    db.close()
+    stock_value = sum((p.cost or 0.0) * p.stock for p in products)
+    retail_value = sum(p.price * p.stock for p in products)
+    return {
+        "total_products": len(products),
+        "total_stock_value": round(stock_value, 2),
+        "total_retail_value": round(retail_value, 2),
+        "out_of_stock": sorted((p.stock, p.name) for p in products if p.stock <= 0),
+        "below_minimum": sorted((p.stock, p.name) for p in products if 0 < p.stock <= p.min_stock),
+    }
+
+
+def _report(c) -> dict:
+    r = c.get("/api/reports/inventory")
+    assert r.status_code == 200, r.text
+    body = r.json()
+    return {
+        "total_products": body["total_products"],
+        "total_stock_value": body["total_stock_value"],
+        "total_retail_value": body["total_retail_value"],
+        "out_of_stock": [(i["stock"], i["name"]) for i in body["out_of_stock"]],
+        "below_minimum": [(i["stock"], i["name"]) for i in body["below_minimum"]],
+    }
+
+
+def test_index_follows_every_write_path(client, monkeypatch):
+    c, TestSession, _engine = client
+    assert _report(c) == _scan(TestSession)
+
+    # Checkout takes Corona from 8 to 3: below its minimum of 5
+    r = c.post("/api/sales", json={"items": [{"product_id": "beer", "quantity": 5}], "cash_received": 200})
+    assert r.status_code == 200, r.text
+    report = _report(c)
+    assert report == _scan(TestSession) and (3, "Corona") in report["below_minimum"]
+
+    # Void puts it back
+    assert c.post(f"/api/sales/{r.json()['id']}/void").status_code == 200
+    assert _report(c) == _scan(TestSession)
+
+    # Adjustment, a cost/min_stock edit and a deactivation
+    assert c.post("/api/products/chips/adjust-stock", json={"quantity": -20, "reason": "shrinkage"}).status_code == 200
+    assert c.patch("/api/products/p6", json={"cost": 99.0, "min_stock": 10}).status_code == 200
+    assert c.patch("/api/products/p5", json={"is_active": False}).status_code == 200
+    report = _report(c)
+    assert report == _scan(TestSession)
+    assert (0, "Sabritas") in report["out_of_stock"] and (6, "Producto 6") in report["below_minimum"]
+
+    # Another process writes the database directly: picked up by the sweep
+    monkeypatch.setattr(inventory, "sweep_interval", 0.0)
+    db = TestSession()
+    db.get(Product, "p7").min_stock = 20
+    set_product_stock(db, "p1", 50)
+    db.commit()
+    db.close()
+    report = _report(c)
+    assert report == _scan(TestSession) and (7, "Producto 7") in report["below_minimum"]
+
+
+def test_index_follows_chat_edits(client, monkeypatch):
+    c, TestSession, _engine = client
+    monkeypatch.setattr(chat, "_pending", {})
+    monkeypatch.setattr(chat, "_action_counts", {})
+    assert _report(c) == _scan(TestSession)
+
+    # Confirmed chat actions: price, cost and stock changes
+    for pending in (
+        {"action": "price_change", "product_id": "p3", "new_value": 40.0},
+        {"action": "cost_change", "product_id": "p3", "new_value": 30.0},
+        {"action": "stock_change", "product_id": "p2", "qty": 10},
+    ):
+        chat._pending["u1"] = pending
+        r = c.post("/api/chat", data={"message": "si"})
+        assert r.json()["action"] == pending["action"], r.text
+        assert _report(c) == _scan(TestSession), pending["action"]
+
+
+def test_reads_do_not_scan_the_catalog(client, monkeypatch):
+    c, _TestSession, engine = client
+    monkeypatch.setattr(inventory, "sweep_interval", 3600.0)
+    _report(c)  # first read loads the index
+    assert inventory.stats()["full_loads"] == 1
+
+    statements: list[str] = []
+
+    def _on_execute(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        _report(c)
+        assert statements == []
+        c.post("/api/sales", json={"items": [{"product_id": "beer", "quantity": 1}], "cash_received": 200})
+        statements.clear()
+        _report(c)
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    # Only the touched product is re-read, by primary key
+    assert len(statements) == 1 and "products.id IN" in statements[0]
+    assert inventory.stats()["full_loads"] == 1
+
+
+def test_paging_and_sorting(client):
+    c, _TestSession, _engine = client
+    r = c.get("/api/reports/inventory/items", params={"status": "below_minimum", "sort": "stock", "limit": 2})
+    assert r.status_code == 200, r.text
+    first = r.json()
+    assert first["total"] == 4 and [i["stock"] for i in first["items"]] == [1, 2]
+    r = c.get("/api/reports/inventory/items", params={"status": "below_minimum", "sort": "stock", "offset": 2, "limit": 2})
+    assert [i["stock"] for i in r.json()["items"]] == [3, 4]
+
+    r = c.get("/api/reports/inventory/items", params={"status": "below_minimum", "sort": "reorder_qty", "order": "desc"})
+    assert [i["reorder_qty"] for i in r.json()["items"]] == [11, 10, 9, 8]
+
+    r = c.get("/api/reports/inventory", params={"limit": 1, "sort": "name", "order": "desc"})
+    body = r.json()
+    assert body["below_minimum_count"] == 4 and [i["name"] for i in body["below_minimum"]] == ["Producto 4"]
+
+    assert c.get("/api/reports/inventory/items", params={"sort": "margin"}).status_code == 400
+    assert c.get("/api/reports/inventory/items", params={"status": "everything"}).status_code == 400
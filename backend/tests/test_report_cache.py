@@ -0,0 +1,174 @@
+"""Report cache: range reports merge cached per-day partials for closed
+days with fresh ones, and voids / sync imports invalidate exactly the days
+they touch."""
+import os
+import sys
+import tempfile
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product
+from app.models.sale import Sale, SaleItem
+from app.models.user import User
+from app.models.store import Store
+from app.services.report_cache import report_cache
+from app.services.rollup import record_sales
+
+RANGE = {"start": "2026-03-01", "end": "2026-03-05"}
+REPORTS = ["product-profitability", "category-performance", "cashier-performance", "sales-summary"]
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store", sync_api_key="sync-key"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(User(id="u2", username="ana", hashed_password="x", pin_code="1111", full_name="Ana", role="cashier"))
+    db.add(Product(id="beer", barcode="750100", name="Corona", description="", price=20.0,
+                   cost=12.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.add(Product(id="chips", barcode="750200", name="Sabritas", description="", price=18.0,
+                   cost=10.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.commit()
+    db.close()
+
+    report_cache.clear()
+    with TestClient(app) as c:
+        yield c, TestSession, engine
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _add_sale(TestSession, created_at, user_id="u1", qty=2):
+    db = TestSession()
+    sale = Sale(store_id=get_settings().store_id, user_id=user_id, subtotal=20.0 * qty, total=20.0 * qty,
+                payment_method="cash", created_at=created_at)
+    sale.items.append(SaleItem(product_id="beer", product_name="Corona", quantity=qty, unit_price=20.0,
+                               line_total=20.0 * qty, pack_units=1, unit_cost=12.0))
+    db.add(sale)
+    db.flush()
+    record_sales(db, [sale])
+    db.commit()
+    sale_id = sale.id
+    db.close()
+    return sale_id
+
+
+def _reports(c):
+    return {name: c.get(f"/api/reports/{name}", params=RANGE).json() for name in REPORTS}
+
+
+def _cold(c):
+    """Same reports computed with an empty cache."""
+    report_cache.clear()
+    return _reports(c)
+
+
+def test_closed_days_are_cached_and_invalidated_by_day(client):
+    c, TestSession, _engine = client
+    monday = _add_sale(TestSession, datetime(2026, 3, 2, 18), qty=2)
+    _add_sale(TestSession, datetime(2026, 3, 3, 18), user_id="u2", qty=5)
+
+    first = _reports(c)
+    assert first["product-profitability"][0]["units_sold"] == 7.0
+    assert first["sales-summary"] == [
+        {"period": "2026-03-02", "total_sales": 40.0, "transactions": 1, "avg_ticket": 40.0},
+        {"period": "2026-03-03", "total_sales": 100.0, "transactions": 1, "avg_ticket": 100.0},
+    ]
+    assert {row["full_name"]: row["transactions"] for row in first["cashier-performance"]} == {"Test": 1, "Ana": 1}
+    misses = report_cache.stats()["misses"]
+
+    assert _reports(c) == first
+    stats = report_cache.stats()
+    assert stats["misses"] == misses and stats["hits"] >= 4 * 5 - 5  # category shares product partials
+
+    # Void on Mar 2: only that day is recomputed
+    assert c.post(f"/api/sales/{monday}/void").status_code == 200
+    after_void = _reports(c)
+    assert report_cache.stats()["misses"] > misses
+    assert after_void["product-profitability"][0]["units_sold"] == 5.0
+    assert {row["full_name"]: row["voided"] for row in after_void["cashier-performance"]} == {"Test": 1, "Ana": 0}
+    assert [row["period"] for row in after_void["sales-summary"]] == ["2026-03-03"]
+    assert after_void == _cold(c)
+
+    # Late sync import into Mar 4
+    body = {
+        "id": str(uuid.uuid4()), "store_id": get_settings().store_id, "user_id": "u2",
+        "subtotal": 60.0, "tax": 0.0, "total": 60.0, "payment_method": "card",
+        "created_at": "2026-03-04T18:30:00Z",
+        "items": [{"product_id": "beer", "product_name": "Corona", "quantity": 3, "unit_price": 20.0,
+                   "line_total": 60.0, "unit_cost": 12.0}],
+    }
+    _reports(c)
+    assert c.post("/api/sales/sync-import", json=body, headers={"X-Sync-API-Key": "sync-key"}).status_code == 201
+    after_import = _reports(c)
+    assert after_import["product-profitability"][0]["units_sold"] == 8.0
+    assert after_import["sales-summary"][-1]["period"] == "2026-03-04"
+    assert after_import == _cold(c)
+
+    stats = c.get("/api/admin/system/report-cache").json()
+    assert stats["invalidated_days"] >= 1 and 0 <= stats["hit_ratio"] <= 1
+
+
+def test_today_is_never_cached(client):
+    c, _TestSession, _engine = client
+    params = {"start": (date.today() - timedelta(days=1)).isoformat()}
+    assert c.get("/api/reports/product-profitability", params=params).json() == []
+    r = c.post("/api/sales", json={"items": [{"product_id": "beer", "quantity": 1}], "payment_method": "cash"})
+    assert r.status_code == 200, r.text
+    assert c.get("/api/reports/product-profitability", params=params).json()[0]["units_sold"] == 1.0
+
+
+def test_partial_racing_an_invalidation_is_not_stored(client):
+    _c, TestSession, _engine = client
+    day = datetime(2026, 3, 2)
+    calls = []
+
+    def compute(db, start, end):
+        calls.append(start)
+        report_cache.invalidate_days([day + timedelta(hours=18)])  # a void commits mid-compute
+        return {day.date(): "stale"}
+
+    db = TestSession()
+    try:
+        report_cache.partials(db, "race", day, day + timedelta(days=1), date(2026, 4, 1), compute)
+        report_cache.partials(db, "race", day, day + timedelta(days=1), date(2026, 4, 1), lambda *_: {})
+    finally:
+        db.close()
+    assert report_cache.stats()["hits"] == 0
@@ -0,0 +1,247 @@
+"""Profitability and cashier reports are single GROUP BY queries over the days not yet
+in the report cache: checked against a Python reference on a 100k sale item
+fixture, with query-count assertions (cold and cached) and timings."""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Category, Product
+from app.models.sale import Sale, SaleItem
+from app.models.user import User
+from app.models.store import Store
+from app.services.report_cache import report_cache
+from app.services.timebucket import python_bucket, utc_bounds
+
+SALES = 20_000
+ITEMS_PER_SALE = 5  # 100k sale items
+PRODUCTS = 300
+RANGE = {"start": "2026-01-01", "end": "2026-01-31"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    rng = random.Random(42)
+    store_id = get_settings().store_id
+    db = TestSession()
+    db.add(Store(id=store_id, name="Test Store"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(User(id="u2", username="ana", hashed_password="x", pin_code="1111", full_name="Ana", role="cashier"))
+    db.flush()
+    categories = [{"id": f"c{i}", "name": f"Categoria {i}"} for i in range(12)]
+    db.execute(Category.__table__.insert(), categories)
+    products = [
+        {
+            "id": f"p{i}", "barcode": f"75{i:06d}", "name": f"Producto {i}", "description": "",
+            "price": round(rng.uniform(8, 80), 2), "cost": round(rng.uniform(4, 40), 2), "stock": 0,
+            "min_stock": 0, "image_url": "", "is_active": True, "sell_by_weight": False,
+            "category_id": None if i % 10 == 0 else f"c{i % 12}",
+        }
+        for i in range(PRODUCTS)
+    ]
+    db.execute(Product.__table__.insert(), products)
+
+    sales, items = [], []
+    start = datetime(2025, 12, 25)
+    for n in range(SALES):
+        sale_id = f"s{n}"
+        sales.append({
+            "id": sale_id, "store_id": store_id, "user_id": "u2" if n % 3 == 0 else "u1",
+            "subtotal": 0, "tax": 0, "total": 0,
+            "payment_method": "cash", "cash_received": 0, "change_given": 0,
+            "status": "voided" if n % 25 == 0 else "completed",
+            "created_at": start + timedelta(minutes=3 * n),  # Dec 25 → Feb 4
+        })
+        for k in range(ITEMS_PER_SALE):
+            qty = rng.randint(1, 4)
+            pack = 6 if k == 4 and n % 7 == 0 else 1
+            items.append({
+                "id": f"{sale_id}-{k}", "sale_id": sale_id, "product_id": f"p{rng.randrange(PRODUCTS)}",
+                "product_name": "", "quantity": qty, "unit_price": 1.0, "discount_percent": 0.0,
+                "line_total": round(qty * rng.uniform(8, 80), 2), "pack_units": pack,
+            })
+    cost = {p["id"]: p["cost"] for p in products}
+    totals = {s["id"]: s for s in sales}
+    for item in items:
+        totals[item["sale_id"]]["total"] = round(totals[item["sale_id"]]["total"] + item["line_total"], 2)
+        item["product_name"] = f"Producto {item['product_id'][1:]}"
+        item["unit_cost"] = cost[item["product_id"]]  # snapshot, as checkout records it
+    db.execute(Sale.__table__.insert(), sales)
+    db.execute(SaleItem.__table__.insert(), items)
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, engine, {"products": products, "categories": categories, "sales": sales, "items": items}
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _sales_in_range(data):
+    lo, hi = utc_bounds(date(2026, 1, 1), date(2026, 2, 1))  # store-local January
+    return [s for s in data["sales"] if lo <= s["created_at"] < hi]
+
+
+def _in_range(data):
+    ok = {s["id"] for s in _sales_in_range(data) if s["status"] == "completed"}
+    return [i for i in data["items"] if i["sale_id"] in ok]
+
+
+def _timed(engine, fn):
+    count = 0
+
+    def _on_execute(*_args):
+        nonlocal count
+        count += 1
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    return count, elapsed, result
+
+
+def test_product_profitability_single_query(client):
+    c, engine, data = client
+    report_cache.clear()
+    n, elapsed, r = _timed(engine, lambda: c.get("/api/reports/product-profitability", params={**RANGE, "limit": 200}))
+    assert r.status_code == 200, r.text
+    assert n == 1
+    print(f"\nproduct-profitability over {len(data['items'])} items: {elapsed * 1000:.0f} ms")
+
+    # January is closed: the second run merges cached days without querying
+    n, elapsed, cached = _timed(engine, lambda: c.get("/api/reports/product-profitability", params={**RANGE, "limit": 200}))
+    assert n == 0 and cached.json() == r.json()
+    print(f"product-profitability from cache: {elapsed * 1000:.0f} ms")
+
+    cost = {p["id"]: p["cost"] for p in data["products"]}
+    expected: dict[str, dict] = {}
+    for item in _in_range(data):
+        e = expected.setdefault(item["product_id"], {"units": 0, "revenue": 0.0})
+        e["units"] += item["quantity"] * item["pack_units"]
+        e["revenue"] += item["line_total"]
+    ranked = sorted(expected.items(), key=lambda kv: kv[1]["revenue"] - kv[1]["units"] * cost[kv[0]], reverse=True)
+
+    body = r.json()
+    assert len(body) == 200
+    assert [row["product_id"] for row in body[:20]] == [pid for pid, _ in ranked[:20]]
+    top_id, top = ranked[0]
+    assert body[0]["units_sold"] == top["units"]
+    assert body[0]["revenue"] == pytest.approx(top["revenue"], abs=0.01)
+    assert body[0]["cost"] == pytest.approx(top["units"] * cost[top_id], abs=0.01)
+
+
+def test_category_performance_single_query(client):
+    c, engine, data = client
+    report_cache.clear()
+    assert c.get("/api/price-check/75000001").status_code == 200  # catalog cache loaded
+    n, elapsed, r = _timed(engine, lambda: c.get("/api/reports/category-performance", params=RANGE))
+    assert r.status_code == 200, r.text
+    assert n == 1  # daily product partials; categories come from the catalog cache
+    print(f"\ncategory-performance over {len(data['items'])} items: {elapsed * 1000:.0f} ms")
+
+    n, elapsed, cached = _timed(engine, lambda: c.get("/api/reports/category-performance", params=RANGE))
+    assert n == 0 and cached.json() == r.json()
+    print(f"category-performance from cache: {elapsed * 1000:.0f} ms")
+
+    names = {cat["id"]: cat["name"] for cat in data["categories"]}
+    category_of = {p["id"]: names.get(p["category_id"], "Sin Categoria") for p in data["products"]}
+    expected: dict[str, dict] = {}
+    for item in _in_range(data):
+        e = expected.setdefault(category_of[item["product_id"]], {"revenue": 0.0, "products": set()})
+        e["revenue"] += item["line_total"]
+        e["products"].add(item["product_id"])
+
+    body = r.json()
+    assert [row["category"] for row in body] == sorted(expected, key=lambda k: expected[k]["revenue"], reverse=True)
+    for row in body:
+        assert row["revenue"] == pytest.approx(expected[row["category"]]["revenue"], abs=0.01)
+        assert row["products_count"] == len(expected[row["category"]]["products"])
+
+    # Recategorizing moves the product's cached sales to its new category
+    revenue = {row["category"]: row["revenue"] for row in body}
+    product_revenue = sum(item["line_total"] for item in _in_range(data) if item["product_id"] == "p1")
+    assert c.patch("/api/products/p1", json={"category_id": "c2"}).status_code == 200
+    moved = {row["category"]: row["revenue"] for row in c.get("/api/reports/category-performance", params=RANGE).json()}
+    assert moved["Categoria 1"] == pytest.approx(revenue["Categoria 1"] - product_revenue, abs=0.01)
+    assert moved["Categoria 2"] == pytest.approx(revenue["Categoria 2"] + product_revenue, abs=0.01)
+    assert c.patch("/api/products/p1", json={"category_id": "c1"}).status_code == 200
+
+
+def test_cashier_performance_single_query(client):
+    c, engine, data = client
+    report_cache.clear()
+    n, elapsed, r = _timed(engine, lambda: c.get("/api/reports/cashier-performance", params=RANGE))
+    assert r.status_code == 200, r.text
+    assert n == 2  # daily cashier partials + names
+    print(f"\ncashier-performance over {len(data['sales'])} sales: {elapsed * 1000:.0f} ms")
+
+    n, elapsed, cached = _timed(engine, lambda: c.get("/api/reports/cashier-performance", params=RANGE))
+    assert n == 1 and cached.json() == r.json()
+
+    units: dict[str, float] = {}
+    for item in data["items"]:
+        units[item["sale_id"]] = units.get(item["sale_id"], 0) + item["quantity"] * item["pack_units"]
+    expected: dict[str, dict] = {}
+    for s in _sales_in_range(data):
+        e = expected.setdefault(s["user_id"], {"total": 0.0, "transactions": 0, "voided": 0, "units": 0, "hours": set()})
+        if s["status"] == "voided":
+            e["voided"] += 1
+            continue
+        e["total"] += s["total"]
+        e["transactions"] += 1
+        e["units"] += units[s["id"]]
+        e["hours"].add(python_bucket(s["created_at"], "hour"))
+
+    body = r.json()
+    assert [row["full_name"] for row in body] == ["Test", "Ana"]
+    for row in body:
+        e = expected[row["user_id"]]
+        assert row["total_sales"] == pytest.approx(e["total"], abs=0.01)
+        assert row["transactions"] == e["transactions"]
+        assert row["voided"] == e["voided"]
+        assert row["items_sold"] == e["units"]
+        assert row["active_hours"] == len(e["hours"])
+        assert row["transactions_per_hour"] == round(e["transactions"] / len(e["hours"]), 2)
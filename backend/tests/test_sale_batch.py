@@ -0,0 +1,129 @@
+"""Client-supplied sale ids: idempotent POST /api/sales retries, and batch
+submission (offline queue flush) in one transaction with original timestamps
+and per-sale created / duplicate / rejected results."""
+import os
+import sys
+import tempfile
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.user import User
+from app.models.store import Store
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(Product(id="beer", barcode="bc-beer", name="Corona", description="", price=20.0,
+                   cost=0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _queued(qty=1, product_id="beer", created_at="2026-03-01T18:30:00Z"):
+    return {
+        "id": str(uuid.uuid4()),
+        "items": [{"product_id": product_id, "quantity": qty}],
+        "payment_method": "cash",
+        "cash_received": 100,
+        "created_at": created_at,
+    }
+
+
+def test_batch_results_and_single_stock_decrement(client):
+    c, TestSession = client
+    a, b, bad = _queued(2), _queued(3), _queued(product_id="gone")
+    r = c.post("/api/sales/batch", json={"sales": [a, b, bad, a]})
+    assert r.status_code == 200, r.text
+    results = r.json()["results"]
+    assert [x["status"] for x in results] == ["created", "created", "rejected", "duplicate"]
+    assert results[0]["total"] == 40.0
+    assert "gone" in results[2]["detail"]
+
+    db = TestSession()
+    sale = db.query(Sale).filter(Sale.id == a["id"]).first()
+    assert sale.created_at.isoformat() == "2026-03-01T18:30:00"  # original (UTC) timestamp kept
+    assert db.query(Product.stock).filter(Product.id == "beer").scalar() == 95
+    db.close()
+
+    # Retrying the whole chunk after a lost response is harmless
+    r = c.post("/api/sales/batch", json={"sales": [a, b]})
+    assert [x["status"] for x in r.json()["results"]] == ["duplicate", "duplicate"]
+    db = TestSession()
+    assert db.query(Product.stock).filter(Product.id == "beer").scalar() == 95
+    assert db.query(Sale).count() == 2
+    db.close()
+
+
+def test_batch_validation(client):
+    c, _TestSession = client
+    r = c.post("/api/sales/batch", json={"sales": [dict(_queued(), id="not-a-uuid")]})
+    assert r.status_code == 422
+    r = c.post("/api/sales/batch", json={"sales": [dict(_queued(), items=[])]})
+    assert r.json()["results"][0]["status"] == "rejected"
+
+
+def test_retried_sale_id_returns_stored_sale(client):
+    c, TestSession = client
+    body = {"id": str(uuid.uuid4()), "items": [{"product_id": "beer", "quantity": 2}], "cash_received": 50}
+    first = c.post("/api/sales", json=body)
+    assert first.status_code == 200, first.text
+    assert first.json()["id"] == body["id"]
+
+    retry = c.post("/api/sales", json=body)
+    assert retry.status_code == 200, retry.text
+    assert retry.json() == first.json()
+
+    db = TestSession()
+    assert db.query(Sale).count() == 1
+    assert db.query(Product.stock).filter(Product.id == "beer").scalar() == 98
+    db.close()
+
+    # Without an id every POST is a new sale, as before
+    body.pop("id")
+    assert c.post("/api/sales", json=body).json()["id"] != first.json()["id"]
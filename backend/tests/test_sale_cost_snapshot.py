@@ -0,0 +1,116 @@
+"""Sale lines snapshot the product's unit cost at checkout (and through
+sync-import), so margins don't move when a cost is edited later."""
+import os
+import sys
+import tempfile
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product
+from app.models.sale import SaleItem
+from app.models.user import User
+from app.models.store import Store
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store", sync_api_key="sync-key"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(Product(id="beer", barcode="750100", name="Corona", description="", price=20.0,
+                   cost=12.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.add(Product(id="chips", barcode="750200", name="Sabritas", description="", price=18.0,
+                   cost=10.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession, engine
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _profit(c):
+    return {row["product_id"]: row for row in c.get("/api/reports/product-profitability").json()}
+
+
+def test_cost_edits_do_not_rewrite_history(client):
+    c, TestSession, _engine = client
+    r = c.post("/api/sales", json={"items": [{"product_id": "beer", "quantity": 2},
+                                             {"product_id": "chips", "quantity": 1, "pack_units": 3}],
+                                   "cash_received": 500})
+    assert r.status_code == 200, r.text
+    assert "unit_cost" not in r.json()["items"][0]  # cost stays internal
+
+    db = TestSession()
+    assert {i.product_id: i.unit_cost for i in db.query(SaleItem).all()} == {"beer": 12.0, "chips": 10.0}
+    db.close()
+
+    before = _profit(c)
+    assert before["beer"]["cost"] == 24.0 and before["chips"]["cost"] == 30.0
+    dash_profit = c.get("/api/reports/dashboard").json()["total_profit"]
+
+    assert c.patch("/api/products/beer", json={"cost": 15.0}).status_code == 200
+    assert _profit(c) == before
+    assert c.get("/api/reports/dashboard").json()["total_profit"] == dash_profit
+
+    # Voiding removes exactly the cost that was recorded
+    assert c.post(f"/api/sales/{r.json()['id']}/void").status_code == 200
+    assert c.get("/api/reports/dashboard").json()["total_profit"] == 0.0
+
+
+def test_sync_import_carries_cost(client):
+    c, TestSession, _engine = client
+    headers = {"X-Sync-API-Key": "sync-key"}
+
+    def payload(unit_cost):
+        item = {"product_id": "beer", "product_name": "Corona", "quantity": 1, "unit_price": 20.0, "line_total": 20.0}
+        if unit_cost is not None:
+            item["unit_cost"] = unit_cost
+        return {"id": str(uuid.uuid4()), "store_id": get_settings().store_id, "user_id": "u1",
+                "subtotal": 20.0, "tax": 0.0, "total": 20.0, "created_at": "2026-03-01T18:30:00Z", "items": [item]}
+
+    snapshot, legacy = payload(9.5), payload(None)
+    assert c.post("/api/sales/sync-import", json=snapshot, headers=headers).status_code == 201
+    assert c.post("/api/sales/sync-import", json=legacy, headers=headers).status_code == 201
+
+    db = TestSession()
+    costs = {i.sale_id: i.unit_cost for i in db.query(SaleItem).all()}
+    db.close()
+    assert costs == {snapshot["id"]: 9.5, legacy["id"]: 12.0}  # older instances: current cost
@@ -0,0 +1,155 @@
+"""Cart quote API: prices a cart exactly as checkout does (packs, volume
+promos, discounts, weight items), from the catalog cache, in full or compact
+incremental form."""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product, VolumePromo
+from app.models.user import User
+from app.models.store import Store
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(Product(id="beer", barcode="750100", name="Corona", description="", price=20.0,
+                   cost=12.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.add(Product(id="ham", barcode="750300", name="Jamón", description="", price=180.0,
+                   cost=100.0, stock=0, min_stock=0, image_url="", is_active=True, sell_by_weight=True))
+    db.add(VolumePromo(product_id="beer", min_units=6, promo_price=105.0))
+    db.add(VolumePromo(product_id="beer", min_units=8, promo_price=135.0))
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, engine
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+CART = [
+    {"product_id": "beer", "quantity": 10},
+    {"product_id": "beer", "quantity": 6},                     # same product: promo counts all its units
+    {"product_id": "beer", "quantity": 1, "pack_units": 12},   # pack line: no promo
+    {"product_id": "ham", "quantity": 0.25},                   # by weight
+    {"product_id": "beer", "quantity": 2, "unit_price": 15, "discount_percent": 10},
+]
+
+
+def test_quote_matches_checkout(client):
+    c, _engine = client
+    r = c.post("/api/sales/quote", json={"items": CART})
+    assert r.status_code == 200, r.text
+    quote = r.json()
+    lines = quote["lines"]
+    # Every beer unit in the cart (30, packs included) counts toward the tier,
+    # as at checkout: 8+8+8+6 = $510 → $17.00 per single unit
+    assert lines[0]["unit_price"] == 17.0
+    assert lines[0]["line_total"] + lines[1]["line_total"] == 272.0
+    assert lines[2]["line_total"] == 240.0 and lines[2]["savings"] == 0
+    assert lines[3]["line_total"] == 45.0 and lines[3]["sell_by_weight"] is True
+    assert lines[4]["line_total"] == 27.0
+    assert quote["savings"] == pytest.approx(48.0 + 3.0)
+
+    sale = c.post("/api/sales", json={"items": CART, "cash_received": 1000}).json()
+    assert quote["total"] == sale["total"]
+    assert [l["line_total"] for l in lines] == [i["line_total"] for i in sale["items"]]
+
+
+def test_tax_from_unrounded_subtotal(client, monkeypatch):
+    c, engine = client
+    db = sessionmaker(bind=engine)()
+    for pid, price in (("gum", 0.1), ("candy", 0.2)):
+        db.add(Product(id=pid, barcode=f"750-{pid}", name=pid, description="", price=price,
+                       cost=0.0, stock=10, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.commit()
+    db.close()
+    monkeypatch.setattr(get_settings(), "tax_rate", 0.05)
+
+    # 0.1 + 0.2 sums to 0.30000000000000004: 5% of that rounds up, of 0.30 down
+    items = [{"product_id": "gum", "quantity": 1}, {"product_id": "candy", "quantity": 1}]
+    quote = c.post("/api/sales/quote", json={"items": items}).json()
+    sale = c.post("/api/sales", json={"items": items, "cash_received": 1}).json()
+    assert (quote["subtotal"], quote["tax"], quote["total"]) == (0.3, 0.02, 0.32)
+    assert (sale["subtotal"], sale["tax"], sale["total"]) == (0.3, 0.02, 0.32)
+
+
+def test_quote_is_served_from_cache(client):
+    c, engine = client
+    assert c.post("/api/sales/quote", json={"items": CART}).status_code == 200  # warm
+
+    count = 0
+
+    def _on_execute(*_args):
+        nonlocal count
+        count += 1
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        r = c.post("/api/sales/quote", json={"items": CART})
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    assert r.status_code == 200
+    assert count == 0
+
+
+def test_compact_incremental_quote(client):
+    c, _engine = client
+    full = c.post("/api/sales/quote", json={"items": CART}).json()
+
+    rows = [["beer", 10], ["beer", 6], ["beer", 1, 12], ["ham", 0.25], ["beer", 2, 1, 15, 10]]
+    r = c.post("/api/sales/quote/compact", json={"items": rows})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["total"] == full["total"]
+    assert [line[2] for line in body["lines"]] == [l["line_total"] for l in full["lines"]]
+
+    # Another scan of ham: only ham's line comes back, totals cover the cart
+    rows[3] = ["ham", 0.5]
+    body = c.post("/api/sales/quote/compact", json={"items": rows, "changed": ["ham"]}).json()
+    assert body["lines"] == [[3, 180.0, 90.0]]
+    assert body["total"] == pytest.approx(full["total"] + 45.0)
+
+    assert c.post("/api/sales/quote/compact", json={"items": [["beer"]]}).status_code == 422
+    assert c.post("/api/sales/quote/compact", json={"items": [["nope", 1]]}).status_code == 404
+    assert c.post("/api/sales/quote", json={"items": []}).json()["total"] == 0
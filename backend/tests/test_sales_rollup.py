@@ -0,0 +1,155 @@
+"""Hourly sales rollup: kept in step by sales, voids and sync imports, read
+by the dashboard and summaries, and rebuildable from the sales table."""
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product
+from app.models.sale import SalesHourlyRollup
+from app.models.user import User
+from app.models.store import Store
+from app.services.rollup import rebuild_rollup
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store", sync_api_key="sync-key"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(Product(id="beer", barcode="750100", name="Corona", description="", price=20.0,
+                   cost=12.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.add(Product(id="chips", barcode="750200", name="Sabritas", description="", price=18.0,
+                   cost=10.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession, engine
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _rollup(TestSession):
+    db = TestSession()
+    try:
+        return {
+            (r.hour, r.payment_method): (r.sale_count, round(r.total, 2), r.units, round(r.cost, 2))
+            for r in db.query(SalesHourlyRollup).all()
+        }
+    finally:
+        db.close()
+
+
+def _sell(c, method="cash", beer=1, chips=0):
+    items = [{"product_id": "beer", "quantity": beer}]
+    if chips:
+        items.append({"product_id": "chips", "quantity": chips})
+    r = c.post("/api/sales", json={"items": items, "payment_method": method, "cash_received": 500})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_rollup_follows_sales_voids_and_imports(client):
+    c, TestSession, _engine = client
+    _sell(c, beer=2, chips=1)                 # 58, cost 34
+    _sell(c, method="card", beer=1)           # 20, cost 12
+    voided = _sell(c, beer=3)                 # 60, voided below
+    assert c.post(f"/api/sales/{voided['id']}/void").status_code == 200
+
+    hour = datetime.now(ZoneInfo(get_settings().timezone)).replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    rollup = _rollup(TestSession)
+    assert rollup[(hour, "cash")] == (1, 58.0, 3.0, 34.0)
+    assert rollup[(hour, "card")] == (1, 20.0, 1.0, 12.0)
+
+    dash = c.get("/api/reports/dashboard").json()
+    assert dash["total_sales"] == 78.0 and dash["transaction_count"] == 2
+    assert dash["total_profit"] == 78.0 - 46.0
+    assert dash["payment_breakdown"] == {"cash": 58.0, "card": 20.0, "mixed": 0.0}
+    assert dash["sales_by_hour"][hour.hour] == {"hour": hour.hour, "sales": 78.0, "transactions": 2}
+    assert dash["top_products"][0] == {"product_name": "Corona", "quantity_sold": 3.0, "revenue": 60.0}
+
+    daily = c.get("/api/sales/reports/daily").json()
+    assert daily["total_sales"] == 78.0 and daily["transaction_count"] == 2
+
+    # Sync import lands in the store-local hour (18:30Z is 12:30 in Monterrey)
+    body = {
+        "id": str(uuid.uuid4()), "store_id": get_settings().store_id, "user_id": "u1",
+        "subtotal": 36.0, "tax": 0.0, "total": 36.0, "payment_method": "cash",
+        "created_at": "2026-03-01T18:30:00Z",
+        "items": [{"product_id": "chips", "product_name": "Sabritas", "quantity": 2, "unit_price": 18.0, "line_total": 36.0}],
+    }
+    assert c.post("/api/sales/sync-import", json=body, headers={"X-Sync-API-Key": "sync-key"}).status_code == 201
+    assert c.post("/api/sales/sync-import", json=body, headers={"X-Sync-API-Key": "sync-key"}).status_code == 409
+    assert _rollup(TestSession)[(datetime(2026, 3, 1, 12), "cash")] == (1, 36.0, 2.0, 20.0)
+
+    summary = c.get("/api/reports/sales-summary", params={"start": "2026-03-01", "end": "2026-03-01"}).json()
+    assert summary == [{"period": "2026-03-01", "total_sales": 36.0, "transactions": 1, "avg_ticket": 36.0}]
+
+    # Rebuilding from the sales table gives the same rollup
+    incremental = _rollup(TestSession)
+    db = TestSession()
+    rebuild_rollup(db)
+    db.commit()
+    db.close()
+    assert _rollup(TestSession) == incremental
+    assert c.post("/api/admin/system/rebuild-sales-rollup").json()["rollup_rows"] == len(incremental)
+
+
+def test_dashboard_reads_rollup_not_sales(client):
+    c, _TestSession, engine = client
+    for _ in range(20):
+        _sell(c, beer=1, chips=1)
+
+    count = 0
+
+    def _on_execute(*_args):
+        nonlocal count
+        count += 1
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        dash = c.get("/api/reports/dashboard").json()
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    assert dash["transaction_count"] == 20
+    assert count == 2  # rollup rows + top products
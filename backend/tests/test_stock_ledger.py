@@ -0,0 +1,177 @@
+"""Stock ledger: sales, voids and adjustments are atomic relative updates
+recorded in stock_movements, and products.stock can be rebuilt from it."""
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product, ProductComponent, StockMovement
+from app.models.user import User
+from app.models.store import Store
+from app.services.stock import seed_opening_balances
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    for pid, stock in (("beer", 1000), ("vaso", 50), ("mix", 0)):
+        db.add(Product(id=pid, barcode=f"bc-{pid}", name=pid, description="", price=20.0,
+                       cost=0, stock=stock, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.add(ProductComponent(parent_id="mix", component_id="vaso", quantity=1))
+    db.add(ProductComponent(parent_id="mix", component_id="beer", quantity=2))
+    db.flush()
+    seed_opening_balances(db)
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _stock(TestSession, pid):
+    db = TestSession()
+    try:
+        return db.query(Product.stock).filter(Product.id == pid).scalar()
+    finally:
+        db.close()
+
+
+def _ledger(TestSession, pid):
+    db = TestSession()
+    try:
+        return db.query(func.sum(StockMovement.quantity)).filter(StockMovement.product_id == pid).scalar()
+    finally:
+        db.close()
+
+
+def test_concurrent_sales_do_not_lose_updates(client):
+    c, TestSession = client
+    threads, sales_each = 16, 10
+
+    def sell(_):
+        codes = []
+        for _ in range(sales_each):
+            r = c.post("/api/sales", json={"items": [{"product_id": "beer", "quantity": 1}], "cash_received": 20})
+            codes.append(r.status_code)
+        return codes
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        codes = [code for batch in pool.map(sell, range(threads)) for code in batch]
+
+    assert codes.count(200) == threads * sales_each
+    assert _stock(TestSession, "beer") == 1000 - threads * sales_each
+    assert _ledger(TestSession, "beer") == _stock(TestSession, "beer")
+
+
+def test_recipe_sale_and_void_are_ledgered(client):
+    c, TestSession = client
+    r = c.post("/api/sales", json={"items": [{"product_id": "mix", "quantity": 3}], "cash_received": 100})
+    sale_id = r.json()["id"]
+    assert _stock(TestSession, "vaso") == 47
+    assert _stock(TestSession, "beer") == 994
+
+    db = TestSession()
+    rows = db.query(StockMovement).filter(StockMovement.ref_id == sale_id).all()
+    assert {(m.product_id, m.quantity, m.kind, m.via_product_id) for m in rows} == {
+        ("vaso", -3, "sale", "mix"), ("beer", -6, "sale", "mix"),
+    }
+    db.close()
+
+    # Recipe edited after the sale: the void still reverses what was drawn
+    db = TestSession()
+    db.query(ProductComponent).filter(ProductComponent.component_id == "beer").delete()
+    db.commit()
+    db.close()
+
+    assert c.post(f"/api/sales/{sale_id}/void").status_code == 200
+    assert _stock(TestSession, "vaso") == 50
+    assert _stock(TestSession, "beer") == 1000
+
+
+def test_adjustments_clamp_and_rebuild(client):
+    c, TestSession = client
+    r = c.post("/api/products/vaso/adjust-stock", json={"quantity": -80, "reason": "damaged"})
+    assert r.status_code == 200, r.text
+    assert _stock(TestSession, "vaso") == 0
+    assert _ledger(TestSession, "vaso") == 0  # ledger records the -50 actually applied
+
+    assert c.patch("/api/products/vaso", json={"stock": 12}).status_code == 200
+    assert _stock(TestSession, "vaso") == 12
+
+    assert c.post("/api/products/nope/adjust-stock", json={"quantity": 1, "reason": "x"}).status_code == 404
+
+    # Corrupt the projection, then rebuild it from the ledger
+    db = TestSession()
+    db.query(Product).filter(Product.id.in_(["vaso", "beer"])).update({"stock": 999}, synchronize_session=False)
+    db.commit()
+    db.close()
+    jobs = c.get("/api/admin/system/write-coordinator").json()["jobs"]
+    r = c.post("/api/admin/system/rebuild-stock")
+    assert r.json()["products_corrected"] == 2
+    assert _stock(TestSession, "vaso") == 12
+    assert _stock(TestSession, "beer") == 1000
+    # Serialized with the sales' stock updates on the writer
+    assert c.get("/api/admin/system/write-coordinator").json()["jobs"] == jobs + 1
+
+
+def test_stock_changes_are_not_catalog_edits(client):
+    c, TestSession = client
+
+    def stamps():
+        db = TestSession()
+        try:
+            return dict(db.query(Product.id, Product.updated_at).all())
+        finally:
+            db.close()
+
+    before = stamps()
+    r = c.post("/api/sales", json={"items": [{"product_id": "mix", "quantity": 1}, {"product_id": "beer", "quantity": 1}],
+                                   "cash_received": 100})
+    assert c.post(f"/api/sales/{r.json()['id']}/void").status_code == 200
+    assert c.post("/api/products/vaso/adjust-stock", json={"quantity": 5, "reason": "restock"}).status_code == 200
+    assert c.post("/api/admin/system/rebuild-stock").status_code == 200
+    # updated_at drives the sync change feed and the catalog cache sweep
+    assert stamps() == before
+    assert _stock(TestSession, "vaso") == 55
@@ -0,0 +1,166 @@
+"""Child rows in catalog sync: the change feed carries each product's pack
+barcodes, volume promos and recipe components, and the local pull diffs
+them by natural key, so after a pull the store's rows match the cloud's
+(supplier links included, where the store has the supplier)."""
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product, ProductBarcode, ProductComponent, VolumePromo
+from app.models.store import Store
+from app.models.supplier import Supplier
+from app.routers import sync as sync_router
+from app.services import sync
+
+HEADERS = {"X-Sync-API-Key": "sync-key"}
+AsyncClient = httpx.AsyncClient
+T0 = datetime(2026, 3, 1, 12)
+
+
+def _database():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(Store(id=get_settings().store_id, name="Test Store", sync_api_key="sync-key"))
+    db.add(Supplier(id="modelo", name="Grupo Modelo"))
+    db.commit()
+    db.close()
+    return path, Session
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    cloud_path, CloudSession = _database()
+    local_path, LocalSession = _database()
+
+    db = CloudSession()
+    db.add(Supplier(id="costco", name="Costco"))  # cloud only
+    db.add(Product(id="beer", barcode="750100", name="Corona", price=20.0, supplier_id="modelo", updated_at=T0))
+    db.add(Product(id="michelada", barcode="750200", name="Michelada", price=45.0, supplier_id="costco",
+                   updated_at=T0 + timedelta(minutes=1)))
+    # Edited after the recipe that uses it: reaches the store on a later page
+    db.add(Product(id="clamato", barcode="750300", name="Clamato", price=30.0, updated_at=T0 + timedelta(minutes=2)))
+    db.flush()
+    db.add(ProductBarcode(product_id="beer", barcode="750100-6", units=6, pack_price=110.0))
+    db.add(ProductBarcode(product_id="beer", barcode="750100-24", units=24, pack_price=400.0))
+    db.add(VolumePromo(product_id="beer", min_units=3, promo_price=18.0))
+    db.add(VolumePromo(product_id="beer", min_units=12, promo_price=17.0))
+    db.add(ProductComponent(parent_id="michelada", component_id="beer", quantity=1))
+    db.add(ProductComponent(parent_id="michelada", component_id="clamato", quantity=0.5))
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        db = CloudSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    monkeypatch.setattr(sync_router, "FEED_SETTLE_SECONDS", 0.0)
+
+    with TestClient(app) as c:
+        def forward(request: httpx.Request) -> httpx.Response:
+            r = c.get(request.url.path, params=dict(request.url.params), headers=HEADERS)
+            return httpx.Response(r.status_code, content=r.content)
+
+        transport = httpx.MockTransport(forward)
+        monkeypatch.setattr(sync.httpx, "AsyncClient", lambda **kw: AsyncClient(transport=transport, **kw))
+        monkeypatch.setattr(get_settings(), "sync_api_key", "sync-key")
+        monkeypatch.setattr(get_settings(), "cloud_api_url", "http://cloud.test/api")
+        yield c, CloudSession, LocalSession
+
+    app.dependency_overrides.clear()
+    sync._waiting_recipes.clear()
+    os.unlink(cloud_path)
+    os.unlink(local_path)
+
+
+def _pull(LocalSession) -> str:
+    db = LocalSession()
+    try:
+        return asyncio.run(sync.pull_products(db))
+    finally:
+        db.close()
+
+
+def _children(Session) -> dict:
+    """Child rows by natural key, comparable across databases."""
+    db = Session()
+    try:
+        return {
+            "packs": set(db.execute(select(ProductBarcode.product_id, ProductBarcode.barcode,
+                                           ProductBarcode.units, ProductBarcode.pack_price)).all()),
+            "promos": set(db.execute(select(VolumePromo.product_id, VolumePromo.min_units,
+                                            VolumePromo.promo_price)).all()),
+            "components": set(db.execute(select(ProductComponent.parent_id, ProductComponent.component_id,
+                                                ProductComponent.quantity)).all()),
+        }
+    finally:
+        db.close()
+
+
+def test_pull_copies_child_rows(client, monkeypatch):
+    _c, CloudSession, LocalSession = client
+    # One product per page: michelada's recipe waits for clamato's page
+    monkeypatch.setattr(sync, "PULL_PAGE_SIZE", 1)
+    result = _pull(LocalSession)
+    assert result.startswith("ok: 3 nuevos, 0 actualizados, 0 sin cambios, 0 categorías en 3 página(s);"), result
+    assert _children(LocalSession) == _children(CloudSession)
+    assert len(_children(LocalSession)["components"]) == 2
+
+    db = LocalSession()
+    assert db.get(Product, "beer").supplier_id == "modelo"
+    assert db.get(Product, "michelada").supplier_id is None  # the store doesn't have that supplier
+    db.close()
+
+
+def test_pull_diffs_child_rows(client):
+    _c, CloudSession, LocalSession = client
+    _pull(LocalSession)
+
+    # Change, drop and add rows of every kind; move a pack to another product
+    cloud = CloudSession()
+    now = datetime.utcnow()
+    cloud.execute(select(ProductBarcode).where(ProductBarcode.barcode == "750100-6")).scalar_one().pack_price = 105.0
+    cloud.execute(select(ProductBarcode).where(ProductBarcode.barcode == "750100-24")).scalar_one().product_id = "clamato"
+    cloud.delete(cloud.execute(select(VolumePromo).where(VolumePromo.min_units == 12)).scalar_one())
+    cloud.add(VolumePromo(product_id="beer", min_units=6, promo_price=17.5))
+    cloud.execute(select(ProductComponent).where(ProductComponent.component_id == "clamato")).scalar_one().quantity = 0.75
+    cloud.add(ProductComponent(parent_id="michelada", component_id="sal", quantity=1))
+    cloud.add(Product(id="sal", barcode="750400", name="Sal de grano", price=5.0, updated_at=now))
+    for pid in ("beer", "michelada", "clamato"):
+        cloud.get(Product, pid).updated_at = now
+    cloud.commit()
+    cloud.close()
+
+    assert _pull(LocalSession).startswith("ok: 1 nuevos, 3 actualizados, 0 sin cambios")
+    local = _children(LocalSession)
+    assert local == _children(CloudSession)
+    assert ("clamato", "750100-24", 24, 400.0) in local["packs"]
+    assert ("beer", 12, 17.0) not in local["promos"]
+
+    # Unchanged products are skipped, child rows and all
+    assert _pull(LocalSession).startswith("ok: 0 nuevos, 0 actualizados, 0 sin cambios")
@@ -0,0 +1,181 @@
+"""Catalog change feed (GET /api/sync/products): keyset pages over
+(updated_at, id) never skip or repeat rows that share a timestamp, resume
+from a saved cursor, and the local pull follows the pages until caught up."""
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Category, Product
+from app.models.store import Store
+from app.models.user import User
+from app.models.sync import SyncMeta
+from app.routers import sync as sync_router
+from app.services import sync
+
+HEADERS = {"X-Sync-API-Key": "sync-key"}
+AsyncClient = httpx.AsyncClient
+T0 = datetime(2026, 3, 1, 12)
+
+
+def _database():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(Store(id=get_settings().store_id, name="Test Store", sync_api_key="sync-key"))
+    db.commit()
+    db.close()
+    return path, Session
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    cloud_path, CloudSession = _database()
+    local_path, LocalSession = _database()
+
+    db = CloudSession()
+    db.add(Category(id="bebidas", name="Bebidas", updated_at=T0))
+    db.add(Category(id="botanas", name="Botanas", updated_at=T0))
+    # 35 products, in runs of 5 sharing a timestamp
+    for n in range(35):
+        db.add(Product(id=f"p{n:02d}", barcode=f"750{n:05d}", name=f"Producto {n}", price=10.0, cost=5.0,
+                       stock=3, category_id="bebidas", updated_at=T0 + timedelta(minutes=n // 5)))
+    db.add(Product(id="old", barcode="7509999", name="Descontinuado", price=1.0, is_active=False, updated_at=T0))
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        db = CloudSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    monkeypatch.setattr(sync_router, "FEED_SETTLE_SECONDS", 0.0)
+
+    with TestClient(app) as c:
+        yield c, CloudSession, LocalSession
+
+    app.dependency_overrides.clear()
+    os.unlink(cloud_path)
+    os.unlink(local_path)
+
+
+def _page(c, **params) -> dict:
+    r = c.get("/api/sync/products", params=params, headers=HEADERS)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _drain(c, cursor=None, limit=10) -> tuple[list[str], list[str], str, int]:
+    """Follow the feed to the end: (product ids, category ids, last cursor, pages)."""
+    products, categories, pages = [], [], 0
+    while True:
+        page = _page(c, limit=limit, **({"cursor": cursor} if cursor else {}))
+        products += [p["id"] for p in page["products"]]
+        categories += [cat["id"] for cat in page["categories"]]
+        cursor = page["next_cursor"]
+        pages += 1
+        if not page["has_more"]:
+            return products, categories, cursor, pages
+
+
+def test_pages_cover_every_row_once(client):
+    c, CloudSession, _LocalSession = client
+    products, categories, cursor, pages = _drain(c, limit=7)  # pages split runs of equal timestamps
+    assert products == ["old"] + [f"p{n:02d}" for n in range(35)]  # inactive ones too
+    assert categories == ["bebidas", "botanas"]
+    assert pages == 6
+
+    # Caught up: nothing until something changes
+    assert _drain(c, cursor)[:2] == ([], [])
+    db = CloudSession()
+    db.get(Product, "p07").price = 12.0
+    db.get(Category, "botanas").color = "#000000"
+    db.commit()
+    db.close()
+    products, categories, cursor, _pages = _drain(c, cursor)
+    assert (products, categories) == (["p07"], ["botanas"])
+    assert _drain(c, cursor)[:2] == ([], [])
+
+    # Legacy clients: a start time, first page only
+    page = _page(c, updated_since=(T0 + timedelta(minutes=6)).isoformat())
+    assert [p["id"] for p in page["products"]][:2] == ["p30", "p31"]
+    assert c.get("/api/sync/products", params={"cursor": "garbage"}, headers=HEADERS).status_code == 400
+
+
+def test_child_row_edits_put_the_product_back_in_the_feed(client):
+    c, _CloudSession, _LocalSession = client
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+    cursor = _drain(c)[2]
+
+    for path, body in (("barcodes", {"barcode": "750-six", "units": 6, "pack_price": 55.0}),
+                       ("promos", {"min_units": 3, "promo_price": 27.0}),
+                       ("components", {"component_id": "p02", "quantity": 1}),
+                       ("ticket-aliases", {"alias": "PROD 1"})):
+        row = c.post(f"/api/products/p01/{path}", json=body)
+        assert row.status_code == 200, row.text
+        products, _categories, cursor, _pages = _drain(c, cursor)
+        assert products == ["p01"], path
+        assert c.delete(f"/api/products/p01/{path}/{row.json()['id']}").status_code == 200
+        products, _categories, cursor, _pages = _drain(c, cursor)
+        assert products == ["p01"], path
+
+
+def test_local_pull_follows_pages(client, monkeypatch):
+    c, CloudSession, LocalSession = client
+
+    def forward(request: httpx.Request) -> httpx.Response:
+        r = c.get(request.url.path, params=dict(request.url.params), headers=HEADERS)
+        return httpx.Response(r.status_code, content=r.content)
+
+    transport = httpx.MockTransport(forward)
+    monkeypatch.setattr(sync.httpx, "AsyncClient", lambda **kw: AsyncClient(transport=transport, **kw))
+    monkeypatch.setattr(get_settings(), "sync_api_key", "sync-key")
+    monkeypatch.setattr(get_settings(), "cloud_api_url", "http://cloud.test/api")
+    monkeypatch.setattr(sync, "PULL_PAGE_SIZE", 10)
+
+    db = LocalSession()
+    result = asyncio.run(sync.pull_products(db))
+    assert result.startswith("ok: 36 nuevos, 0 actualizados, 0 sin cambios, 2 categorías en 4 página(s)"), result
+    assert db.scalar(select(func.count(Product.id))) == 36
+    assert db.get(Product, "old").is_active is False
+    cursor = db.get(SyncMeta, "pull_products").cursor
+    assert cursor
+
+    # Next sync starts from the saved cursor: one empty page
+    assert asyncio.run(sync.pull_products(db)).startswith("ok: 0 nuevos, 0 actualizados, 0 sin cambios, 0 categorías en 1 página(s)")
+    cloud = CloudSession()
+    cloud.get(Product, "p34").name = "Renombrado"
+    cloud.commit()
+    cloud.close()
+    assert asyncio.run(sync.pull_products(db)).startswith("ok: 0 nuevos, 1 actualizados, 0 sin cambios")
+    db.expire_all()
+    assert db.get(Product, "p34").name == "Renombrado"
+    db.close()
@@ -0,0 +1,155 @@
+"""Catalog pull (cloud → local): products and categories are applied with
+set-based upserts in chunks, unchanged rows are skipped by the cloud's
+updated_at, and the outcome is recorded in SyncMeta."""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.config import get_settings
+from app.models.product import Category, Product, StockMovement
+from app.models.store import Store
+from app.models.sync import SyncMeta
+from app.services import sync
+from app.services.stock import set_product_stock
+
+AsyncClient = httpx.AsyncClient
+T0 = datetime(2026, 3, 1, 12)
+
+
+@pytest.fixture()
+def local(monkeypatch):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(Store(id=get_settings().store_id, name="Test Store"))
+    db.commit()
+    db.close()
+
+    cloud = {"categories": [], "products": []}
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=cloud)
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(sync.httpx, "AsyncClient", lambda **kw: AsyncClient(transport=transport, **kw))
+    monkeypatch.setattr(get_settings(), "sync_api_key", "sync-key")
+    monkeypatch.setattr(get_settings(), "cloud_api_url", "http://cloud.test/api")
+    monkeypatch.setattr(sync, "PULL_CHUNK_ROWS", 25)
+
+    yield Session, engine, cloud
+    engine.dispose()
+    os.unlink(path)
+
+
+def _product(n: int, updated_at: datetime = T0, **fields) -> dict:
+    return {
+        "id": f"p{n}", "barcode": f"750{n:05d}", "name": f"Producto {n}", "description": "", "brand": None,
+        "category_id": "bebidas", "price": 10.0 + n, "cost": 5.0, "stock": 7, "min_stock": 2, "image_url": "",
+        "is_active": True, "is_favorite": False, "sell_by_weight": False, "updated_at": updated_at.isoformat(),
+        **fields,
+    }
+
+
+def _pull(Session) -> str:
+    db = Session()
+    try:
+        return asyncio.run(sync.pull_products(db))
+    finally:
+        db.close()
+
+
+def test_pull_upserts_and_skips_unchanged(local):
+    Session, engine, cloud = local
+    cloud["categories"] = [{"id": "bebidas", "name": "Bebidas", "color": "#FF0000"}]
+    cloud["products"] = [_product(n) for n in range(60)]
+
+    result = _pull(Session)
+    assert result.startswith("ok: 60 nuevos, 0 actualizados, 0 sin cambios, 1 categorías"), result
+    db = Session()
+    assert db.scalar(select(func.count(Product.id))) == 60
+    assert db.get(Product, "p3").price == 13.0 and db.get(Product, "p3").stock == 7
+    assert db.scalar(select(func.sum(StockMovement.quantity))) == 60 * 7  # initial stock via the ledger
+    assert db.get(SyncMeta, "pull_products").last_result == result
+    db.close()
+
+    # Nothing changed in the cloud: every row is skipped, no writes
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda _c, _cur, stmt, *_a: statements.append(stmt))
+    assert _pull(Session).startswith("ok: 0 nuevos, 0 actualizados, 60 sin cambios, 0 categorías")
+    assert not [s for s in statements if s.lstrip().upper().startswith(("INSERT INTO PRODUCTS", "INSERT INTO CATEGORIES"))]
+
+    # A local sale bumps the local updated_at; the cloud's later price change
+    # still applies, and local stock is kept
+    db = Session()
+    set_product_stock(db, "p5", 2)
+    db.commit()
+    db.close()
+    cloud["categories"][0]["color"] = "#00FF00"
+    cloud["products"][5] = _product(5, T0 + timedelta(minutes=5), price=99.0, stock=500)
+    statements.clear()
+    assert _pull(Session).startswith("ok: 0 nuevos, 1 actualizados, 59 sin cambios, 1 categorías")
+    db = Session()
+    p5 = db.get(Product, "p5")
+    assert (p5.price, p5.stock) == (99.0, 2)
+    assert db.get(Category, "bebidas").color == "#00FF00"
+    db.close()
+    # Set-based: one upsert per chunk, not one query per product
+    upserts = [s for s in statements if s.lstrip().upper().startswith("INSERT INTO PRODUCTS")]
+    assert len(upserts) == 1 and "ON CONFLICT" in upserts[0]
+
+
+def test_pull_statement_count_does_not_grow_per_product(local):
+    Session, engine, cloud = local
+    cloud["categories"] = [{"id": "bebidas", "name": "Bebidas"}]
+    counts = []
+    for first, size in ((0, 50), (50, 200)):
+        cloud["products"] = [_product(n) for n in range(first, first + size)]
+        statements: list[str] = []
+        listener = lambda _c, _cur, stmt, *_a: statements.append(stmt)  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        assert _pull(Session).startswith(f"ok: {size} nuevos")
+        event.remove(engine, "before_cursor_execute", listener)
+        counts.append(len(statements))
+    db = Session()
+    assert db.scalar(select(func.count(Product.id))) == 250
+    db.close()
+    # 25-row chunks: 2 vs 8 chunks, a few statements each, none per row
+    assert counts[1] - counts[0] <= 6 * 4
+
+
+def test_pull_applies_pages_off_the_event_loop(local, monkeypatch):
+    Session, _engine, cloud = local
+    cloud["categories"] = [{"id": "bebidas", "name": "Bebidas"}]
+    cloud["products"] = [_product(n) for n in range(3)]
+    apply_page = sync._apply_page
+    threads = []
+
+    def recording(db, payload):
+        threads.append(threading.current_thread())
+        return apply_page(db, payload)
+
+    monkeypatch.setattr(sync, "_apply_page", recording)
+    assert _pull(Session).startswith("ok: 3 nuevos")
+    # A worker thread with its own session, so SSE streams and checkouts keep being served
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,217 @@
+"""Sale push (local → cloud): the gzip batch import endpoint is idempotent
+and transactional, and push_sales sends bounded chunks, marking synced_at
+per chunk. The cloud is this app on a second database, reached through an
+httpx MockTransport."""
+import asyncio
+import gzip
+import json
+import os
+import sys
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product
+from app.models.sale import Sale, SaleItem, SalesHourlyRollup
+from app.models.user import User
+from app.models.store import Store
+from app.services import sync
+
+HEADERS = {"X-Sync-API-Key": "sync-key"}
+AsyncClient = httpx.AsyncClient
+
+
+def _database():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(Store(id=get_settings().store_id, name="Test Store", sync_api_key="sync-key"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(User(id="sync", username="sync", hashed_password="x", pin_code="9998", full_name="Sync", role="cashier"))
+    db.add(Product(id="beer", barcode="750100", name="Corona", description="", price=20.0,
+                   cost=12.0, stock=100, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.commit()
+    db.close()
+    return path, Session
+
+
+@pytest.fixture()
+def client():
+    cloud_path, CloudSession = _database()
+    local_path, LocalSession = _database()
+
+    def override_get_db():
+        db = CloudSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    with TestClient(app) as c:
+        yield c, CloudSession, LocalSession
+
+    app.dependency_overrides.clear()
+    os.unlink(cloud_path)
+    os.unlink(local_path)
+
+
+def _payload(n: int = 1, created_at: str = "2026-03-01T18:30:00") -> dict:
+    return {
+        "id": str(uuid.uuid4()), "store_id": get_settings().store_id,
+        "subtotal": 20.0 * n, "tax": 0.0, "total": 20.0 * n, "payment_method": "cash", "created_at": created_at,
+        "items": [{"product_id": "beer", "product_name": "Corona", "quantity": n, "unit_price": 20.0,
+                   "line_total": 20.0 * n, "unit_cost": 12.0}],
+    }
+
+
+def _post_batch(c, sales: list[dict]):
+    body = gzip.compress(json.dumps({"sales": sales}).encode())
+    return c.post("/api/sales/sync-import/batch", content=body,
+                  headers={**HEADERS, "Content-Type": "application/json", "Content-Encoding": "gzip"})
+
+
+def test_batch_import(client):
+    c, CloudSession, _LocalSession = client
+    first, second = _payload(1), _payload(2)
+    assert c.post("/api/sales/sync-import", json=first, headers=HEADERS).status_code == 201
+
+    # Already imported, repeated within the batch, new
+    r = _post_batch(c, [first, second, second])
+    assert r.status_code == 200, r.text
+    assert r.json() == {"created": 1, "duplicate": 2}
+    r = _post_batch(c, [first, second])
+    assert r.json() == {"created": 0, "duplicate": 2}
+
+    db = CloudSession()
+    assert db.scalar(select(func.count(Sale.id))) == 2
+    assert db.scalar(select(func.sum(SaleItem.quantity))) == 3
+    assert db.scalar(select(func.sum(SalesHourlyRollup.total))) == 60.0
+    db.close()
+
+    # Plain JSON is accepted too; bad bodies are rejected whole
+    assert c.post("/api/sales/sync-import/batch", json={"sales": [_payload(3)]}, headers=HEADERS).json()["created"] == 1
+    bad = c.post("/api/sales/sync-import/batch", content=b"not gzip", headers={**HEADERS, "Content-Encoding": "gzip"})
+    assert bad.status_code == 400
+    assert _post_batch(c, [_payload(4), {"id": "x"}]).status_code == 422
+    assert c.post("/api/sales/sync-import/batch", json={"sales": []}).status_code == 401
+
+
+def _forward(c, requests: list[str], fail_after: int | None = None):
+    """MockTransport handler that forwards to the cloud app."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if fail_after is not None and len(requests) > fail_after:
+            return httpx.Response(503)
+        headers = {k: v for k, v in request.headers.items()
+                   if k in ("content-type", "content-encoding", "x-sync-api-key")}
+        r = c.post(request.url.path, content=request.content, headers=headers)
+        return httpx.Response(r.status_code, content=r.content)
+
+    return handler
+
+
+def _seed_local(LocalSession, count: int) -> None:
+    db = LocalSession()
+    start = datetime(2026, 3, 1, 15)
+    for n in range(count):
+        sale = Sale(id=str(uuid.uuid4()), store_id=get_settings().store_id, user_id="u1", subtotal=20.0, tax=0.0,
+                    total=20.0, payment_method="cash", status="completed", created_at=start + timedelta(minutes=n))
+        sale.items.append(SaleItem(product_id="beer", product_name="Corona", quantity=1, unit_price=20.0,
+                                   line_total=20.0, unit_cost=12.0))
+        db.add(sale)
+    db.commit()
+    db.close()
+
+
+def _use_cloud(monkeypatch, handler) -> None:
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(sync.httpx, "AsyncClient", lambda **kw: AsyncClient(transport=transport, **kw))
+    monkeypatch.setattr(get_settings(), "sync_api_key", "sync-key")
+    monkeypatch.setattr(get_settings(), "cloud_api_url", "http://cloud.test/api")
+    monkeypatch.setattr(sync, "PUSH_CHUNK_SALES", 40)
+
+
+def _unsynced(LocalSession) -> int:
+    db = LocalSession()
+    try:
+        return db.scalar(select(func.count(Sale.id)).where(Sale.synced_at == None))  # noqa
+    finally:
+        db.close()
+
+
+def test_push_sales_in_chunks(client, monkeypatch):
+    c, CloudSession, LocalSession = client
+    _seed_local(LocalSession, 100)
+
+    # The cloud goes away after the first chunk: that chunk stays synced
+    requests: list[str] = []
+    _use_cloud(monkeypatch, _forward(c, requests, fail_after=1))
+    db = LocalSession()
+    assert asyncio.run(sync.push_sales(db)) == "ok: 40 pushed, 40 errors"
+    db.close()
+    assert _unsynced(LocalSession) == 60
+
+    requests.clear()
+    _use_cloud(monkeypatch, _forward(c, requests))
+    db = LocalSession()
+    assert asyncio.run(sync.push_sales(db)) == "ok: 60 pushed, 0 errors"
+    assert asyncio.run(sync.push_sales(db)) == "ok: nothing to sync"
+    db.close()
+    assert requests == ["/api/sales/sync-import/batch"] * 2
+    assert _unsynced(LocalSession) == 0
+
+    cloud = CloudSession()
+    assert cloud.scalar(select(func.count(Sale.id))) == 100
+    assert cloud.scalar(select(func.sum(SalesHourlyRollup.sale_count))) == 100
+    cloud.close()
+
+
+def test_push_falls_back_without_batch_endpoint(client, monkeypatch):
+    c, CloudSession, LocalSession = client
+    _seed_local(LocalSession, 5)
+    requests: list[str] = []
+    forward = _forward(c, requests)
+
+    def old_cloud(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/batch"):
+            requests.append(request.url.path)
+            return httpx.Response(404)
+        return forward(request)
+
+    _use_cloud(monkeypatch, old_cloud)
+    threads = []
+    for name in ("_unsynced_chunk", "_mark_synced"):
+        def recording(*args, _fn=getattr(sync, name)):
+            threads.append(threading.current_thread())
+            return _fn(*args)
+        monkeypatch.setattr(sync, name, recording)
+    db = LocalSession()
+    assert asyncio.run(sync.push_sales(db)) == "ok: 5 pushed, 0 errors"
+    db.close()
+    assert requests == ["/api/sales/sync-import/batch"] + ["/api/sales/sync-import"] * 5
+    assert _unsynced(LocalSession) == 0
+    # Reads and synced_at updates run in worker threads, off the event loop
+    assert len(threads) == 3 and threading.main_thread() not in threads
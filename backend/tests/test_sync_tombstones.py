@@ -0,0 +1,211 @@
+"""Deletions in catalog sync: deleting a product, category, pack barcode,
+promo or recipe component in the cloud leaves a tombstone in the change
+feed, and the local pull applies it by natural key (deactivating products
+the store has sold instead of deleting them)."""
+import asyncio
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Category, Product, ProductBarcode, ProductComponent, StockMovement, VolumePromo
+from app.models.sale import Sale, SaleItem
+from app.models.store import Store
+from app.models.sync import CatalogTombstone
+from app.models.user import User
+from app.routers import sync as sync_router
+from app.services import sync
+
+HEADERS = {"X-Sync-API-Key": "sync-key"}
+AsyncClient = httpx.AsyncClient
+
+
+def _database():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(Store(id=get_settings().store_id, name="Test Store", sync_api_key="sync-key"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.commit()
+    db.close()
+    return path, Session
+
+
+def _children(db) -> None:
+    db.add(ProductBarcode(id="six", product_id="beer", barcode="750100-6", units=6, pack_price=110.0))
+    db.add(ProductBarcode(id="box", product_id="beer", barcode="750100-24", units=24, pack_price=400.0))
+    db.add(VolumePromo(id="p3", product_id="beer", min_units=3, promo_price=18.0))
+    db.add(ProductComponent(id="c1", parent_id="michelada", component_id="beer", quantity=1))
+    db.add(ProductComponent(id="c2", parent_id="michelada", component_id="clamato", quantity=1))
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    cloud_path, CloudSession = _database()
+    local_path, LocalSession = _database()
+
+    db = CloudSession()
+    db.add(Category(id="bebidas", name="Bebidas"))
+    db.add(Category(id="temporada", name="Temporada"))
+    for pid, name, category in (("beer", "Corona", "bebidas"), ("clamato", "Clamato", "bebidas"),
+                                ("michelada", "Michelada", "bebidas"), ("ponche", "Ponche", "temporada"),
+                                ("sold", "Rompope", "temporada")):
+        db.add(Product(id=pid, barcode=f"750-{pid}", name=name, price=20.0, stock=10, category_id=category))
+    db.flush()
+    _children(db)
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        db = CloudSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+    monkeypatch.setattr(sync_router, "FEED_SETTLE_SECONDS", 0.0)
+
+    with TestClient(app) as c:
+        def forward(request: httpx.Request) -> httpx.Response:
+            r = c.get(request.url.path, params=dict(request.url.params), headers=HEADERS)
+            return httpx.Response(r.status_code, content=r.content)
+
+        transport = httpx.MockTransport(forward)
+        monkeypatch.setattr(sync.httpx, "AsyncClient", lambda **kw: AsyncClient(transport=transport, **kw))
+        monkeypatch.setattr(get_settings(), "sync_api_key", "sync-key")
+        monkeypatch.setattr(get_settings(), "cloud_api_url", "http://cloud.test/api")
+        yield c, CloudSession, LocalSession
+
+    app.dependency_overrides.clear()
+    os.unlink(cloud_path)
+    os.unlink(local_path)
+
+
+def _pull(LocalSession) -> str:
+    db = LocalSession()
+    try:
+        return asyncio.run(sync.pull_products(db))
+    finally:
+        db.close()
+
+
+def test_cloud_deletions_reach_the_store(client):
+    c, CloudSession, LocalSession = client
+    assert _pull(LocalSession).startswith("ok: 5 nuevos")
+    db = LocalSession()
+    # The store has sold "sold": it can't disappear from its history
+    sale = Sale(id="s1", store_id=get_settings().store_id, user_id="u1", subtotal=20.0, tax=0.0, total=20.0,
+                payment_method="cash", status="completed")
+    sale.items.append(SaleItem(product_id="sold", product_name="Rompope", quantity=1, unit_price=20.0, line_total=20.0))
+    db.add(sale)
+    db.commit()
+    db.close()
+
+    assert c.delete("/api/products/beer/barcodes/six").status_code == 200
+    assert c.delete("/api/products/beer/promos/p3").status_code == 200
+    assert c.delete("/api/products/michelada/components/c2").status_code == 200
+    assert c.delete("/api/products/ponche").status_code == 200
+    assert c.delete("/api/products/sold").status_code == 200
+    assert c.delete("/api/products/categories/temporada").status_code == 200
+    assert c.patch("/api/products/clamato", json={"is_active": False}).status_code == 200
+    cloud = CloudSession()
+    entities = sorted(cloud.scalars(select(CatalogTombstone.entity)))
+    cloud.close()
+    assert entities == ["barcode", "category", "component", "product", "product", "promo"]
+
+    result = _pull(LocalSession)
+    # beer and michelada come back without the deleted children (their
+    # tombstones find nothing left to delete), clamato deactivated
+    assert result.startswith("ok: 0 nuevos, 3 actualizados, 0 sin cambios, 0 categorías en 1 página(s), 3 eliminados"), result
+
+    db = LocalSession()
+    assert db.scalars(select(ProductBarcode.barcode)).all() == ["750100-24"]
+    assert db.scalar(select(func.count(VolumePromo.id))) == 0
+    assert db.scalars(select(ProductComponent.component_id)).all() == ["beer"]
+    assert db.get(Product, "ponche") is None
+    assert db.scalar(select(func.count(StockMovement.id)).where(StockMovement.product_id == "ponche")) == 0
+    assert db.get(Product, "sold").is_active is False
+    assert db.get(Product, "sold").category_id is None
+    assert db.get(Category, "temporada") is None
+    assert db.get(Product, "clamato").is_active is False
+    db.close()
+
+    # Caught up
+    assert _pull(LocalSession).startswith("ok: 0 nuevos, 0 actualizados, 0 sin cambios, 0 categorías en 1 página(s);")
+
+
+def test_tombstones_page_with_the_feed(client):
+    c, _CloudSession, _LocalSession = client
+    for pid in ("ponche", "sold", "michelada"):
+        assert c.delete(f"/api/products/{pid}").status_code == 200
+
+    deleted, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = c.get("/api/sync/products", params=params, headers=HEADERS).json()
+        deleted += [(t["entity"], t["key"]) for t in page["deleted"]]
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+    # The recipe's components went with it
+    assert sorted(deleted) == [("component", "beer"), ("component", "clamato"),
+                               ("product", "michelada"), ("product", "ponche"), ("product", "sold")]
+    page = c.get("/api/sync/products", params={"cursor": cursor}, headers=HEADERS).json()
+    assert page["deleted"] == [] and page["products"] == []
+
+
+# Bulk deletes of catalog rows (Core delete(Model), query(...).delete()) and
+# where they are allowed: the local pull, applying the cloud's tombstones
+BULK_DELETE = re.compile(r"\bdelete\((?:Product|Category|ProductBarcode|VolumePromo|ProductComponent)\)|\.delete\((?:synchronize_session=\w+)?\)")
+ALLOWED_BULK_DELETES = {
+    ("services/sync.py", "delete(ProductBarcode)"),
+    ("services/sync.py", "delete(Product)"),
+    ("services/sync.py", "delete(Category)"),
+}
+
+
+def test_bulk_deletes_leave_no_tombstone(client):
+    _c, CloudSession, _LocalSession = client
+    db = CloudSession()
+    db.execute(delete(VolumePromo).where(VolumePromo.id == "p3"))
+    db.query(ProductBarcode).filter(ProductBarcode.id == "six").delete()
+    db.commit()
+    assert db.scalar(select(func.count(CatalogTombstone.id))) == 0
+    db.close()
+
+    app_dir = os.path.join(os.path.dirname(__file__), "..", "app")
+    found = set()
+    for root, _dirs, files in os.walk(app_dir):
+        for name in files:
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                with open(path, encoding="utf-8") as f:
+                    rel = os.path.relpath(path, app_dir).replace(os.sep, "/")
+                    found.update((rel, m.group(0)) for m in BULK_DELETE.finditer(f.read()))
+    assert found <= ALLOWED_BULK_DELETES, f"bulk deletes record no tombstone, use session.delete: {found - ALLOWED_BULK_DELETES}"
@@ -0,0 +1,109 @@
+"""Store-local time buckets: SQL (SQLite) against the Python reference on
+synthetic sales around local midnight, week/month/year ends and DST
+changes; PostgreSQL expressions checked by compilation."""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from sqlalchemy import create_engine, create_mock_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.config import get_settings
+from app.models.sale import Sale
+from app.models.user import User
+from app.models.store import Store
+from app.services.timebucket import GRAINS, bucket, bucket_key, bucket_label, part, python_bucket, to_local
+
+# (first, last) naive-UTC windows; sales every 23 minutes in each
+WINDOWS = [
+    (datetime(2026, 2, 27, 20), datetime(2026, 3, 3, 8)),     # month end, local midnight ≠ UTC midnight
+    (datetime(2020, 12, 30, 20), datetime(2021, 1, 5, 8)),    # ISO week 53 → week 1
+    (datetime(2021, 4, 3, 20), datetime(2021, 4, 5, 8)),      # Monterrey DST start (2021)
+    (datetime(2021, 10, 30, 20), datetime(2021, 11, 1, 8)),   # DST end
+    (datetime(2022, 10, 29, 20), datetime(2022, 10, 31, 8)),  # last DST end before abolition
+]
+
+
+@pytest.fixture()
+def db():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    store_id = get_settings().store_id
+    session.add(Store(id=store_id, name="Test Store"))
+    session.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    session.flush()
+    rows = []
+    for first, last in WINDOWS:
+        t = first
+        while t <= last:
+            rows.append({"id": f"s{len(rows)}", "store_id": store_id, "user_id": "u1", "total": 1.0,
+                         "payment_method": "cash", "status": "completed", "created_at": t})
+            t += timedelta(minutes=23)
+    session.execute(Sale.__table__.insert(), rows)
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+    os.unlink(path)
+
+
+def _check_parity(db, start=None, end=None):
+    columns = [bucket(db, Sale.created_at, grain, start, end) for grain in GRAINS]
+    columns += [part(db, Sale.created_at, "hour", start, end), part(db, Sale.created_at, "weekday", start, end)]
+    query = select(Sale.created_at, *columns)
+    if start is not None:
+        query = query.where(Sale.created_at >= start, Sale.created_at < end)
+    rows = db.execute(query).all()
+    assert rows
+    for created_at, *values in rows:
+        local = to_local(created_at)
+        for grain, value in zip(GRAINS, values):
+            assert bucket_key(value, grain) == python_bucket(created_at, grain), (created_at, grain, value)
+        assert values[4] == local.hour
+        assert values[5] == (local.weekday() + 1) % 7  # 0 = Sunday
+
+
+def test_sql_buckets_match_python(db):
+    _check_parity(db)
+    for first, last in WINDOWS:
+        _check_parity(db, first, last + timedelta(minutes=1))  # short CASE: only this window's offsets
+
+
+def test_sql_buckets_match_python_in_a_dst_zone(db, monkeypatch):
+    monkeypatch.setattr(get_settings(), "timezone", "America/New_York")
+    _check_parity(db)
+
+
+def test_grouping_happens_in_sql(db):
+    day = bucket(db, Sale.created_at, "day")
+    counts = {bucket_key(d, "day"): n for d, n in db.execute(select(day, func.count(Sale.id)).group_by(day))}
+    # 20:00 UTC on Feb 27 is still Feb 27 in Monterrey; 06:00 UTC opens the local day
+    expected: dict = {}
+    for (created_at,) in db.execute(select(Sale.created_at)):
+        key = python_bucket(created_at, "day")
+        expected[key] = expected.get(key, 0) + 1
+    assert counts == expected
+
+
+def test_labels():
+    assert bucket_label(python_bucket(datetime(2021, 1, 3, 12), "week"), "week") == "2020-W53"
+    assert bucket_label(python_bucket(datetime(2021, 1, 4, 12), "week"), "week") == "2021-W01"
+    assert bucket_label(python_bucket(datetime(2026, 3, 1, 5), "month"), "month") == "2026-02"  # 23:00 local
+    assert bucket_label(python_bucket(datetime(2026, 3, 1, 5), "hour"), "hour") == "2026-02-28 23:00"
+
+
+def test_postgresql_expressions():
+    session = Session(bind=create_mock_engine("postgresql://", lambda *a, **k: None))
+    query = select(bucket(session, Sale.created_at, "week"), part(session, Sale.created_at, "hour"))
+    sql = str(query.compile(dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    tz = get_settings().timezone
+    assert f"date_trunc('week', timezone('{tz}', timezone('UTC', sales.created_at)))" in sql
+    assert "EXTRACT(hour FROM timezone(" in sql
@@ -0,0 +1,136 @@
+"""Group commit: concurrent sale/void/adjustment writes share one transaction
+per commit window, and a write that fails is rolled back on its own."""
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.config import get_settings
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.user import User
+from app.models.store import Store
+from app.services.stock import seed_opening_balances
+from app.services.writer import WriteCoordinator
+
+
+@pytest.fixture()
+def client():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _fk_on(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+
+    TestSession = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    fake_admin = User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin")
+    for route in app.routes:
+        if hasattr(route, "dependant"):
+            for d in route.dependant.dependencies:
+                if d.call and getattr(d.call, "__qualname__", "").startswith(("require_role", "get_current_user")):
+                    app.dependency_overrides[d.call] = lambda: fake_admin
+
+    db = TestSession()
+    db.add(Store(id=get_settings().store_id, name="Test Store"))
+    db.add(User(id="u1", username="test", hashed_password="x", pin_code="0000", full_name="Test", role="admin"))
+    db.add(Product(id="beer", barcode="bc-beer", name="Corona", description="", price=20.0,
+                   cost=0, stock=500, min_stock=0, image_url="", is_active=True, sell_by_weight=False))
+    db.flush()
+    seed_opening_balances(db)
+    db.commit()
+    db.close()
+
+    with TestClient(app) as c:
+        yield c, TestSession, engine
+
+    app.dependency_overrides.clear()
+    os.unlink(path)
+
+
+def _product(pid):
+    return Product(id=pid, barcode=f"bc-{pid}", name=pid, description="", price=1.0,
+                   cost=0, stock=0, min_stock=0, image_url="", is_active=True, sell_by_weight=False)
+
+
+def test_failed_write_is_isolated_within_group(client):
+    _c, TestSession, engine = client
+    coord = WriteCoordinator(engine, window_ms=200)
+    start = threading.Barrier(6)
+
+    def job(i):
+        def write(session):
+            if i == 3:
+                session.add(_product("p3"))
+                session.flush()
+                raise HTTPException(status_code=400, detail="bad cart")
+            session.add(_product(f"p{i}"))
+            return i
+
+        start.wait()
+        try:
+            return coord.submit(write)
+        except HTTPException as e:
+            return e.status_code
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(job, range(6)))
+
+    assert results == [0, 1, 2, 400, 4, 5]
+    db = TestSession()
+    ids = {pid for (pid,) in db.query(Product.id).filter(Product.id.like("p%")).all()}
+    db.close()
+    assert ids == {"p0", "p1", "p2", "p4", "p5"}
+    stats = coord.stats()
+    assert stats["jobs"] == 5
+    assert stats["commits"] < 5  # writes were coalesced
+
+
+def test_concurrent_checkouts_share_commits(client):
+    c, TestSession, _engine = client
+    terminals, sales_each = 8, 10
+
+    def sell(t):
+        codes = []
+        for i in range(sales_each):
+            product = "missing" if (t, i) == (0, 5) else "beer"
+            r = c.post("/api/sales", json={"items": [{"product_id": product, "quantity": 1}], "cash_received": 20})
+            codes.append(r.status_code)
+        return codes
+
+    with ThreadPoolExecutor(max_workers=terminals) as pool:
+        codes = [code for batch in pool.map(sell, range(terminals)) for code in batch]
+
+    assert codes.count(404) == 1
+    assert codes.count(200) == terminals * sales_each - 1
+    db = TestSession()
+    assert db.query(Sale).count() == terminals * sales_each - 1
+    assert db.query(Product.stock).filter(Product.id == "beer").scalar() == 500 - (terminals * sales_each - 1)
+    db.close()
+
+    stats = c.get("/api/admin/system/write-coordinator").json()
+    assert stats["jobs"] == terminals * sales_each - 1
+    assert stats["commits"] <= stats["jobs"]
@@ -1,6 +1,6 @@
 import { useState, useEffect } from "react";
-import { getDashboard } from "@/services/api";
-import type { DashboardData } from "@/types";
+import { streamDashboard } from "@/services/api";
+import type { DashboardData, DashboardEvent } from "@/types";
 
 let dashStyleInjected = false;
 function injectDashStyles() {
@@ -27,19 +27,19 @@ export default function Dashboard() {
 
   useEffect(() => {
     injectDashStyles();
-    loadDashboard();
-    const interval = setInterval(loadDashboard, 60000); // refresh every minute
-    return () => clearInterval(interval);
+    // Live feed: a snapshot on connect, then deltas as sales commit
+    const controller = new AbortController();
+    streamDashboard((event) => {
+      setData((d) => applyDashboardEvent(d, event));
+      if (event.type === "snapshot") setLoading(false);
+    }, controller.signal);
+    const giveUp = setTimeout(() => setLoading(false), 10000);
+    return () => {
+      controller.abort();
+      clearTimeout(giveUp);
+    };
   }, []);
 
-  async function loadDashboard() {
-    try {
-      const d = await getDashboard();
-      setData(d);
-    } catch { /* ignore */ }
-    setLoading(false);
-  }
-
   if (loading) return <p style={{ textAlign: "center", color: "#94a3b8", marginTop: 40 }}>Cargando...</p>;
   if (!data) return <p style={{ textAlign: "center", color: "#94a3b8", marginTop: 40 }}>Error al cargar dashboard</p>;
 
@@ -112,6 +112,20 @@ export default function Dashboard() {
   );
 }
 
+function applyDashboardEvent(d: DashboardData | null, event: DashboardEvent): DashboardData | null {
+  if (event.type === "snapshot") return event.data;
+  if (!d) return d;
+  switch (event.type) {
+    case "sale":
+    case "void":
+      return { ...d, ...event.data.kpis };
+    case "hour":
+      return { ...d, sales_by_hour: d.sales_by_hour.map((h) => (h.hour === event.data.hour ? event.data : h)) };
+    case "top_products":
+      return { ...d, top_products: event.data };
+  }
+}
+
 function KpiCard({ label, value, sub, subColor }: { label: string; value: string; sub?: string; subColor?: string }) {
   return (
     <div style={styles.kpiCard}>
@@ -1,6 +1,6 @@
 import { useState, useEffect } from "react";
-import { searchProducts, adjustStock, getInventoryReport } from "@/services/api";
-import type { Product, InventoryReport } from "@/types";
+import { searchProducts, adjustStock, getInventoryReport, getInventoryItems } from "@/services/api";
+import type { Product, InventoryReport, InventoryListStatus } from "@/types";
 import toast from "react-hot-toast";
 
 type InvView = "overview" | "adjust";
@@ -23,6 +23,14 @@ export default function InventoryManager() {
     try { setReport(await getInventoryReport()); } catch { /* ignore */ }
   }
 
+  async function loadMore(status: InventoryListStatus) {
+    if (!report) return;
+    try {
+      const page = await getInventoryItems(status, report[status].length);
+      setReport({ ...report, [status]: [...report[status], ...page.items] });
+    } catch { /* ignore */ }
+  }
+
   async function loadProducts() {
     try {
       const all = await searchProducts("", 200);
@@ -125,6 +133,11 @@ export default function InventoryManager() {
                   ))}
                 </tbody>
               </table>
+              {report.out_of_stock.length < report.out_of_stock_count && (
+                <button style={styles.moreBtn} onClick={() => loadMore("out_of_stock")}>
+                  Cargar más ({report.out_of_stock.length} de {report.out_of_stock_count})
+                </button>
+              )}
             </div>
           )}
 
@@ -156,6 +169,11 @@ export default function InventoryManager() {
                   ))}
                 </tbody>
               </table>
+              {report.below_minimum.length < report.below_minimum_count && (
+                <button style={styles.moreBtn} onClick={() => loadMore("below_minimum")}>
+                  Cargar más ({report.below_minimum.length} de {report.below_minimum_count})
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -251,6 +269,10 @@ const styles: Record<string, React.CSSProperties> = {
   th: { fontSize: 11, fontWeight: 600, color: "#64748b", padding: "8px 6px", borderBottom: "1px solid #e2e8f0", textAlign: "left" },
   tr: { borderBottom: "1px solid #f8fafc" },
   td: { fontSize: 13, color: "#0f172a", padding: "8px 6px" },
+  moreBtn: {
+    marginTop: 8, padding: "6px 12px", borderRadius: 6, border: "1px solid #e2e8f0",
+    background: "#fff", color: "#334155", fontSize: 12, cursor: "pointer",
+  },
   list: { display: "flex", flexDirection: "column", gap: 4 },
   row: {
     display: "flex",
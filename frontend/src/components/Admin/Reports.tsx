@@ -180,6 +180,7 @@ function CashierReport({ start, end }: { start: string; end: string }) {
             <th style={{ ...styles.th, textAlign: "right" }}>Transacciones</th>
             <th style={{ ...styles.th, textAlign: "right" }}>Ticket Prom.</th>
             <th style={{ ...styles.th, textAlign: "right" }}>Articulos</th>
+            <th style={{ ...styles.th, textAlign: "right" }} title="Transacciones por hora activa">Trans./Hora</th>
             <th style={{ ...styles.th, textAlign: "right" }}>Anuladas</th>
           </tr>
         </thead>
@@ -191,6 +192,7 @@ function CashierReport({ start, end }: { start: string; end: string }) {
               <td style={{ ...styles.td, textAlign: "right" }}>{c.transactions}</td>
               <td style={{ ...styles.td, textAlign: "right" }}>${c.avg_ticket.toFixed(2)}</td>
               <td style={{ ...styles.td, textAlign: "right" }}>{c.items_sold}</td>
+              <td style={{ ...styles.td, textAlign: "right" }} title={`${c.active_hours} h activas`}>{c.transactions_per_hour.toFixed(1)}</td>
               <td style={{ ...styles.td, textAlign: "right", color: c.voided > 0 ? "#dc2626" : "#64748b" }}>{c.voided}</td>
             </tr>
           ))}
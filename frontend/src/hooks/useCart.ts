@@ -1,7 +1,10 @@
-import { useState, useCallback, useMemo } from "react";
+import { useState, useCallback, useMemo, useEffect, useRef } from "react";
 import type { Product, CartItem, SaleItemCreate, VolumePromo } from "@/types";
+import { quoteCart } from "@/services/api";
 
 const TAX_RATE = 0;
+// Re-price on the server once scanning pauses for this long
+const QUOTE_DEBOUNCE_MS = 150;
 
 /**
  * Effective unit price for totalQty units, choosing the CHEAPEST combination of
@@ -9,6 +12,7 @@ const TAX_RATE = 0;
  * overcharges, e.g. tiers 6/$105 + 8/$135 + 10/$170 price 16 units as 10+6=$275
  * instead of 8+8=$270). promo_price = total bundle price.
  * Mirrors backend app/services/pricing.py (bundle_total) — keep both in sync.
+ * Used for the instant/offline estimate; online, the server quote wins.
  */
 function calcBundleUnitPrice(totalQty: number, basePrice: number, promos: VolumePromo[]): number {
   if (!promos.length || totalQty <= 0 || !Number.isInteger(totalQty)) return basePrice;
@@ -87,25 +91,69 @@ export function useCart() {
 
   const clearCart = useCallback(() => setItems([]), []);
 
+  const toSaleItems = useCallback((): SaleItemCreate[] => items.map(toSaleItem), [items]);
+
+  // The server quote (same pricing code as checkout) is authoritative. Local
+  // prices above are the instant estimate and the offline fallback; once
+  // scanning pauses, the cart is re-quoted and the server's line totals and
+  // tax are adopted. Only lines of products changed since the last quote are
+  // sent back.
+  const pricingKey = useMemo(() => JSON.stringify(items.map(toSaleItem)), [items]);
+  const latestKey = useRef(pricingKey);
+  const quotedRows = useRef<Map<string, string>>(new Map());
+  const [serverTotals, setServerTotals] = useState<{ key: string; tax: number; total: number } | null>(null);
+
+  useEffect(() => {
+    latestKey.current = pricingKey;
+    if (!items.length) {
+      quotedRows.current = new Map();
+      return;
+    }
+    const saleItems: SaleItemCreate[] = JSON.parse(pricingKey);
+    const timer = setTimeout(async () => {
+      const rows = new Map<string, string>();
+      for (const i of saleItems) rows.set(i.product_id, (rows.get(i.product_id) ?? "") + JSON.stringify(i));
+      const changed = [...rows.keys()].filter((pid) => quotedRows.current.get(pid) !== rows.get(pid));
+      try {
+        const quote = await quoteCart(saleItems, quotedRows.current.size ? changed : undefined);
+        if (latestKey.current !== pricingKey) return; // cart changed meanwhile
+        quotedRows.current = rows;
+        setItems((prev) => {
+          const next = [...prev];
+          for (const [idx, , lineTotal] of quote.lines) {
+            if (next[idx] && next[idx].line_total !== lineTotal) next[idx] = { ...next[idx], line_total: lineTotal };
+          }
+          return next;
+        });
+        setServerTotals({ key: pricingKey, tax: quote.tax, total: quote.total });
+      } catch {
+        // Offline or server busy: keep the local prices
+      }
+    }, QUOTE_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [pricingKey]);
+
+  const quoted = serverTotals?.key === pricingKey ? serverTotals : null;
   const subtotal = useMemo(() => items.reduce((sum, i) => sum + i.line_total, 0), [items]);
-  const tax = useMemo(() => Math.round(subtotal * TAX_RATE * 100) / 100, [subtotal]);
-  const total = useMemo(() => Math.round((subtotal + tax) * 100) / 100, [subtotal, tax]);
-
-  const toSaleItems = useCallback(
-    (): SaleItemCreate[] =>
-      items.map((i) => ({
-        product_id: i.product.id,
-        quantity: i.quantity,
-        discount_percent: i.discount_percent,
-        pack_units: i.pack_units,
-        ...(i.pack_price !== null ? { unit_price: i.pack_price } : {}),
-      })),
-    [items]
+  const tax = useMemo(
+    () => quoted?.tax ?? Math.round(subtotal * TAX_RATE * 100) / 100,
+    [quoted, subtotal]
   );
+  const total = useMemo(() => quoted?.total ?? Math.round((subtotal + tax) * 100) / 100, [quoted, subtotal, tax]);
 
   return { items, addProduct, updateQuantity, removeItem, clearCart, subtotal, tax, total, toSaleItems };
 }
 
+function toSaleItem(i: CartItem): SaleItemCreate {
+  return {
+    product_id: i.product.id,
+    quantity: i.quantity,
+    discount_percent: i.discount_percent,
+    pack_units: i.pack_units,
+    ...(i.pack_price !== null ? { unit_price: i.pack_price } : {}),
+  };
+}
+
 /**
  * Recalculate line_total for single-unit items that have volume promos.
  * Groups by product_id to get total quantity, then applies greedy bundle pricing.
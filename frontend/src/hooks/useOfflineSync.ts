@@ -1,6 +1,10 @@
 import { useState, useEffect, useCallback } from "react";
 import { getPendingSales, removePendingSale } from "@/services/offlineDB";
-import { createSale, searchProducts } from "@/services/api";
+import { createSalesBatch, searchProducts } from "@/services/api";
+import type { SaleBatchResult } from "@/types";
+
+// Sales per POST /sales/batch request (server accepts up to 200)
+const FLUSH_CHUNK_SIZE = 50;
 
 export interface OfflineSyncState {
   isOnline: boolean;
@@ -25,12 +29,25 @@ export function useOfflineSync(): OfflineSyncState {
     if (!pending.length) return;
 
     setIsSyncing(true);
-    for (const sale of pending) {
+    // Oldest first, in chunks: one request + one server transaction per chunk
+    pending.sort((a, b) => a.created_at.localeCompare(b.created_at));
+    for (let i = 0; i < pending.length; i += FLUSH_CHUNK_SIZE) {
+      const chunk = pending.slice(i, i + FLUSH_CHUNK_SIZE);
+      let results: SaleBatchResult[];
       try {
-        await createSale(sale.items, sale.payment_method, sale.cash_received);
-        await removePendingSale(sale.id);
+        results = await createSalesBatch(chunk);
       } catch {
-        // Leave in queue if sync fails (e.g. server error) — try next session
+        // Network/server error — leave the rest queued and try next session
+        break;
+      }
+      for (const r of results) {
+        if (r.status === "rejected") {
+          // Can't be priced (e.g. product deleted) — keep it queued for review
+          console.warn(`Venta pendiente ${r.id} rechazada: ${r.detail}`);
+          continue;
+        }
+        // created, or already on the server from an earlier attempt
+        await removePendingSale(r.id);
       }
     }
     const remaining = await getPendingSales().catch(() => []);
@@ -5,16 +5,21 @@ import type {
   Sale,
   DailySummary,
   SaleItemCreate,
+  SaleBatchResult,
+  CartQuoteCompact,
   BarcodeLookupResult,
   User,
   StockAdjustment,
   PriceCheckResult,
   DashboardData,
+  DashboardEvent,
   SalesPeriod,
   ProductProfit,
   CategoryPerf,
   CashierPerf,
   InventoryReport,
+  InventoryItemsPage,
+  InventoryListStatus,
   FinanceEntry,
   FinanceSummary,
   FinanceCategories,
@@ -345,15 +350,18 @@ export async function createSale(
   payment_method: string,
   cash_received: number
 ): Promise<Sale> {
+  // Client-generated id: request() retries and the offline queue reuse it, so
+  // a sale whose response was lost is never recorded twice
+  const id = crypto.randomUUID();
   try {
     return await request<Sale>("/sales", {
       method: "POST",
-      body: JSON.stringify({ items, payment_method, cash_received }),
+      body: JSON.stringify({ id, items, payment_method, cash_received }),
     });
   } catch (err) {
     if (!navigator.onLine) {
       const pending: PendingSale = {
-        id: crypto.randomUUID(),
+        id,
         items,
         payment_method,
         cash_received,
@@ -402,6 +410,26 @@ export async function createSale(
   }
 }
 
+/** Submit queued offline sales in one request. Each keeps its client id and
+ *  original timestamp; the server answers created / duplicate / rejected per sale. */
+export async function createSalesBatch(sales: PendingSale[]): Promise<SaleBatchResult[]> {
+  const res = await request<{ results: SaleBatchResult[] }>("/sales/batch", {
+    method: "POST",
+    body: JSON.stringify({ sales }),
+  });
+  return res.results;
+}
+
+/** Price the cart server-side (compact rows). `changed` limits the returned
+ *  lines to products touched since the last quote; totals cover the cart. */
+export function quoteCart(items: SaleItemCreate[], changed?: string[]) {
+  const rows = items.map((i) => [i.product_id, i.quantity, i.pack_units, i.unit_price ?? null, i.discount_percent]);
+  return request<CartQuoteCompact>("/sales/quote/compact", {
+    method: "POST",
+    body: JSON.stringify({ items: rows, ...(changed ? { changed } : {}) }),
+  }, false);
+}
+
 export function getDailySummary(date?: string) {
   const params = date ? `?date=${date}` : "";
   return request<DailySummary>(`/sales/reports/daily${params}`);
@@ -447,6 +475,56 @@ export function getDashboard() {
   return request<DashboardData>("/reports/dashboard");
 }
 
+/**
+ * Follow the live dashboard feed (server-sent events) until `signal` aborts.
+ * Sent over fetch so it can carry the bearer token; reconnects on its own
+ * and resumes from the last event id, so nothing is missed or re-counted.
+ */
+export async function streamDashboard(onEvent: (event: DashboardEvent) => void, signal: AbortSignal) {
+  let lastId = "";
+  while (!signal.aborted) {
+    let retryMs = 3000;
+    try {
+      const headers: Record<string, string> = { Accept: "text/event-stream" };
+      const token = getToken();
+      if (token) headers["Authorization"] = `Bearer ${token}`;
+      if (lastId) headers["Last-Event-ID"] = lastId;
+      const res = await fetch(`${BASE}/reports/dashboard/stream`, { headers, signal });
+      if (res.status === 401 && !(await tryRefreshToken())) {
+        onAuthExpired?.();
+        return;
+      }
+      if (!res.ok || !res.body) throw new Error(res.statusText);
+
+      const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = "";
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+        let end: number;
+        while ((end = buffer.indexOf("\n\n")) >= 0) {
+          const block = buffer.slice(0, end);
+          buffer = buffer.slice(end + 2);
+          let id = "", type = "message", data = "";
+          for (const line of block.split("\n")) {
+            if (line.startsWith("id: ")) id = line.slice(4);
+            else if (line.startsWith("event: ")) type = line.slice(7);
+            else if (line.startsWith("data: ")) data += line.slice(6);
+            else if (line.startsWith("retry: ")) retryMs = Number(line.slice(7)) || retryMs;
+          }
+          if (!data) continue; // keep-alive
+          if (id) lastId = id;
+          onEvent({ type, data: JSON.parse(data) } as DashboardEvent);
+        }
+      }
+    } catch {
+      if (signal.aborted) return;
+    }
+    await new Promise((r) => setTimeout(r, retryMs));
+  }
+}
+
 export function getSalesSummary(start?: string, end?: string, groupBy = "day") {
   const params = new URLSearchParams({ group_by: groupBy });
   if (start) params.set("start", start);
@@ -479,6 +557,11 @@ export function getInventoryReport() {
   return request<InventoryReport>("/reports/inventory");
 }
 
+export function getInventoryItems(status: InventoryListStatus, offset = 0, limit = 50, sort = "stock", order: "asc" | "desc" = "asc") {
+  const params = new URLSearchParams({ status, offset: String(offset), limit: String(limit), sort, order });
+  return request<InventoryItemsPage>(`/reports/inventory/items?${params}`);
+}
+
 export function exportSalesCsv(start?: string, end?: string) {
   const token = getToken();
   const params = new URLSearchParams();
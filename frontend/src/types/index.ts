@@ -121,6 +121,20 @@ export interface SaleItem {
   pack_units: number;
 }
 
+export interface CartQuoteCompact {
+  lines: [index: number, unit_price: number, line_total: number][];
+  subtotal: number;
+  tax: number;
+  total: number;
+}
+
+export interface SaleBatchResult {
+  id: string;
+  status: "created" | "duplicate" | "rejected";
+  total?: number | null;
+  detail?: string | null;
+}
+
 export interface Sale {
   id: string;
   store_id: string;
@@ -183,7 +197,7 @@ export interface PriceCheckResult {
   image_url: string;
   sell_by_weight: boolean;
   pack: { barcode: string; units: number; pack_price: number } | null;
-  volume_promos?: { min_units: number; bundle_price: number; unit_price: number }[];
+  volume_promos?: { min_units: number; bundle_price: number; unit_price: number; bundle_total: number }[];
 }
 
 // Reports
@@ -199,6 +213,16 @@ export interface DashboardData {
   payment_breakdown: { cash: number; card: number; mixed: number };
 }
 
+// /reports/dashboard/stream events: a snapshot, then deltas as sales commit
+export type DashboardKpis = Pick<DashboardData,
+  "date" | "total_sales" | "transaction_count" | "avg_ticket" | "total_profit" | "yesterday_total" | "payment_breakdown">;
+
+export type DashboardEvent =
+  | { type: "snapshot"; data: DashboardData }
+  | { type: "sale" | "void"; data: { sale_id: string; total: number; payment_method: string; kpis: DashboardKpis } }
+  | { type: "hour"; data: DashboardData["sales_by_hour"][number] }
+  | { type: "top_products"; data: TopProduct[] };
+
 export interface SalesPeriod {
   period: string;
   total_sales: number;
@@ -231,6 +255,8 @@ export interface CashierPerf {
   avg_ticket: number;
   voided: number;
   items_sold: number;
+  active_hours: number;
+  transactions_per_hour: number;
 }
 
 export interface InventoryReport {
@@ -255,6 +281,14 @@ export interface InventoryItem {
   reorder_qty: number;
 }
 
+export type InventoryListStatus = "out_of_stock" | "below_minimum";
+
+export interface InventoryItemsPage {
+  total: number;
+  offset: number;
+  items: InventoryItem[];
+}
+
 // Finance
 export interface FinanceEntry {
   id: string;
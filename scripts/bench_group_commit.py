@@ -0,0 +1,125 @@
+"""Benchmark checkout throughput with and without group commit.
+
+Simulates N cashier terminals ringing up sales concurrently against a fresh
+SQLite database (WAL, default synchronous=FULL, like the store PCs) and
+reports sales/second for 1, 4 and 16 terminals:
+
+- "per-request": each sale commits in its own transaction (the old path)
+- "group":       sales go through the write coordinator, which commits
+                 everything arriving within the window together
+
+Each sale is priced and written exactly like POST /api/sales.
+
+Usage (from repo root, using the backend venv):
+    backend/.venv/bin/python scripts/bench_group_commit.py
+    backend/.venv/bin/python scripts/bench_group_commit.py --sales 300 --window-ms 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.config import get_settings  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models import Store, User  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.routers.sales import _build_sale  # noqa: E402
+from app.schemas.sale import SaleCreate  # noqa: E402
+from app.services.catalog import CatalogCache  # noqa: E402
+from app.services.stock import SALE, apply_movements, seed_opening_balances  # noqa: E402
+from app.services.writer import WriteCoordinator  # noqa: E402
+
+PRODUCTS = 50
+
+
+def make_db():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 60})
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+    db.add(Store(id=get_settings().store_id, name="Bench"))
+    db.add(User(id="bench", username="bench", hashed_password="x", pin_code="0000", full_name="Bench", role="cashier"))
+    for i in range(PRODUCTS):
+        db.add(Product(id=f"p{i}", barcode=f"75000{i:04d}", name=f"Producto {i}", description="",
+                       price=10.0 + i, cost=5.0, stock=1_000_000, min_stock=0, image_url="",
+                       is_active=True, sell_by_weight=False))
+    db.flush()
+    seed_opening_balances(db)
+    db.commit()
+    db.close()
+    return path, engine, Session
+
+
+def run(terminals: int, total_sales: int, group: bool, window_ms: float) -> float:
+    path, engine, Session = make_db()
+    catalog = CatalogCache()
+    coord = WriteCoordinator(engine, window_ms=window_ms) if group else None
+    per_terminal = max(total_sales // terminals, 1)
+    start = threading.Barrier(terminals + 1)
+
+    def terminal(t: int):
+        db = Session()
+        start.wait()
+        for i in range(per_terminal):
+            items = [{"product_id": f"p{(t * 7 + i + k) % PRODUCTS}", "quantity": 1 + k} for k in range(3)]
+            data = SaleCreate(items=items, cash_received=500)
+            entries = catalog.get_many(db, (item.product_id for item in data.items))
+
+            def write(session):
+                sale, moves = _build_sale(data, entries, "bench")
+                session.add(sale)
+                session.flush()
+                apply_movements(session, SALE, moves, ref_id=sale.id, user_id="bench")
+                return sale.id
+
+            if coord:
+                coord.submit(write)
+            else:
+                write(db)
+                db.commit()
+        db.close()
+
+    threads = [threading.Thread(target=terminal, args=(t,)) for t in range(terminals)]
+    for th in threads:
+        th.start()
+    start.wait()
+    began = time.perf_counter()
+    for th in threads:
+        th.join()
+    elapsed = time.perf_counter() - began
+
+    engine.dispose()
+    os.unlink(path)
+    return per_terminal * terminals / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sales", type=int, default=400, help="sales per run (split across terminals)")
+    parser.add_argument("--window-ms", type=float, default=get_settings().group_commit_window_ms)
+    args = parser.parse_args()
+
+    print(f"{'terminals':>9}  {'per-request':>12}  {'group':>12}  {'speedup':>7}")
+    for terminals in (1, 4, 16):
+        before = run(terminals, args.sales, group=False, window_ms=args.window_ms)
+        after = run(terminals, args.sales, group=True, window_ms=args.window_ms)
+        print(f"{terminals:>9}  {before:>10.1f}/s  {after:>10.1f}/s  {after / before:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Export sales history as columnar files for offline analysis.
+
+Writes sales and sale items one file per store-local month (Parquet when
+pyarrow is installed, CSV otherwise) under backend/data/analytics — the same
+directory POST /api/reports/export/analytics writes to. Incremental: closed
+months already exported are skipped unless their sales changed.
+
+    import pyarrow.dataset as ds
+    items = ds.dataset("backend/data/analytics/sale_items", partitioning="hive").to_table()
+
+Usage (from repo root, using the backend venv):
+    backend/.venv/bin/python scripts/export_sales_history.py [--out DIR] [--format parquet|csv] [--force]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.routers.reports import ANALYTICS_DIR  # noqa: E402
+from app.services.history_export import export_sales_history  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=ANALYTICS_DIR, help=f"output directory (default: {ANALYTICS_DIR})")
+    parser.add_argument("--format", choices=("parquet", "csv"), help="default: parquet if pyarrow is installed")
+    parser.add_argument("--force", action="store_true", help="rewrite closed months too")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = export_sales_history(db, args.out, fmt=args.format, force=args.force)
+    except ValueError as e:
+        sys.exit(str(e))
+    finally:
+        db.close()
+    print(
+        f"{result['format']}: wrote {len(result['written'])} month(s) {' '.join(result['written'])}, "
+        f"skipped {len(result['skipped'])} closed month(s) in {time.perf_counter() - started:.2f}s -> {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
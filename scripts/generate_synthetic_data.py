@@ -0,0 +1,83 @@
+"""Generate a deterministic synthetic store dataset for load and benchmark work.
+
+Fills an empty database with categories, products (brands, pack barcodes,
+volume promos, recipes), cashiers, sales shaped by hourly and weekday
+traffic curves, voids and finance entries — see app/services/synthetic.py.
+Rows go in with bulk INSERTs; the stock ledger and the hourly sales rollup
+are left consistent. The same options and --seed give the same data.
+
+Writes to the configured database (DATABASE_URL) unless --database-url is
+given; refuses a database that already has products.
+
+Usage (from repo root, using the backend venv):
+    backend/.venv/bin/python scripts/generate_synthetic_data.py --database-url sqlite:///bench.db
+    backend/.venv/bin/python scripts/generate_synthetic_data.py --database-url sqlite:///big.db \\
+        --products 5000 --days 365 --sales-per-day 1500     # ≈ 1.6M sale items
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import Base, init_db, SessionLocal  # noqa: E402
+from app.services.synthetic import SyntheticConfig, generate  # noqa: E402
+
+
+def main():
+    defaults = SyntheticConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="target database (default: the configured one)")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--products", type=int, default=defaults.products)
+    parser.add_argument("--categories", type=int, default=defaults.categories)
+    parser.add_argument("--pack-share", type=float, default=defaults.pack_share, help="share of products with pack barcodes")
+    parser.add_argument("--promo-share", type=float, default=defaults.promo_share, help="share of products with volume promos")
+    parser.add_argument("--recipes", type=int, default=defaults.recipes)
+    parser.add_argument("--cashiers", type=int, default=defaults.cashiers)
+    parser.add_argument("--days", type=int, default=defaults.days, help="days of history")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day, YYYY-MM-DD (default: today)")
+    parser.add_argument("--sales-per-day", type=int, default=defaults.sales_per_day)
+    parser.add_argument("--items-per-sale", type=float, default=defaults.items_per_sale)
+    parser.add_argument("--void-rate", type=float, default=defaults.void_rate)
+    parser.add_argument("--finance-per-day", type=float, default=defaults.finance_per_day)
+    args = parser.parse_args()
+
+    config = SyntheticConfig(
+        seed=args.seed, products=args.products, categories=args.categories, pack_share=args.pack_share,
+        promo_share=args.promo_share, recipes=args.recipes, cashiers=args.cashiers, days=args.days, end=args.end,
+        sales_per_day=args.sales_per_day, items_per_sale=args.items_per_sale, void_rate=args.void_rate,
+        finance_per_day=args.finance_per_day,
+    )
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+        if engine.dialect.name == "sqlite":
+            @event.listens_for(engine, "connect")
+            def _pragmas(dbapi_conn, _):
+                dbapi_conn.execute("PRAGMA journal_mode=WAL")
+                dbapi_conn.execute("PRAGMA foreign_keys=ON")
+        Base.metadata.create_all(engine)
+        db = Session(bind=engine)
+    else:
+        init_db()
+        db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        counts = generate(db, config, progress=print)
+    except ValueError as e:
+        sys.exit(str(e))
+    finally:
+        db.close()
+    print(f"Generated in {time.perf_counter() - started:.1f}s:")
+    for table, count in sorted(counts.items()):
+        print(f"  {table:22} {count:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Rebuild the hourly sales rollup (sales_hourly_rollup) from the sales table.
+
+The rollup is maintained on every sale, void and sync import, and built
+automatically on startup for databases that predate it. Run this after
+editing sales by hand or importing them with a script that bypasses the API.
+
+Usage (from repo root, using the backend venv; stop the server first):
+    backend/.venv/bin/python scripts/rebuild_sales_rollup.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.services.rollup import rebuild_rollup  # noqa: E402
+
+
+def main():
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rows = rebuild_rollup(db)
+        db.commit()
+        print(f"Rebuilt {rows} rollup rows in {time.perf_counter() - started:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()